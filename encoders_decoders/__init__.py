@@ -1,7 +1,40 @@
-from .bwt import BWT
-from .huffman import Huffman
-from .lzw import LZW
-from .rle import RLE
-from .lzss import LZSS
-from .mtf import MTF
-from .blockProcessor import BlockProcessor
\ No newline at end of file
+import importlib
+
+# Модули импортируются при первом обращении к имени: CLI и пайплайны загружают
+# только нужные кодеки, а NumPy — только если он действительно используется
+_MODULES = {
+    'BWT': '.bwt',
+    'Huffman': '.huffman',
+    'LZW': '.lzw',
+    'RLE': '.rle',
+    'LZSS': '.lzss',
+    'MTF': '.mtf',
+    'ZRLE': '.zrle',
+    'LZH': '.lzh',
+    'Predictor': '.predictor',
+    'BitPack': '.bitpack',
+    'LDM': '.ldm',
+    'BlockProcessor': '.blockProcessor',
+    'BlockCache': '.cache',
+    'DictionaryStore': '.dictionary',
+    'train_dictionary': '.dictionary',
+    'Archive': '.archive',
+    'CompressionAlgorithm': '.pipeline',
+    'CompressionPipeline': '.pipeline',
+    'CompressionError': '.pipeline',
+}
+
+__all__ = list(_MODULES)
+
+
+def __getattr__(name):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,245 @@
+"""
+Командная строка: python -m encoders_decoders {compress,decompress,bench,estimate,train} ...
+
+Тяжёлые зависимости не импортируются заранее: загружаются только модули
+выбранного пайплайна (NumPy — лишь для стадий, которым он нужен).
+'-' вместо пути означает stdin/stdout, что удобно в конвейерах оболочки.
+"""
+import sys
+import time
+import argparse
+
+SUFFIX = '.enc'
+
+
+def _open_input(path):
+    return sys.stdin.buffer if path == '-' else open(path, 'rb')
+
+
+def _open_output(path):
+    return sys.stdout.buffer if path == '-' else open(path, 'wb')
+
+
+def _close(f):
+    if f not in (sys.stdin.buffer, sys.stdout.buffer):
+        f.close()
+
+
+def _parse_params(items) -> dict:
+    """['Predictor.width=800', ...] -> {'Predictor': {'width': 800}}"""
+    import json
+
+    params = {}
+    for item in items or []:
+        key, eq, raw = item.partition('=')
+        stage, dot, name = key.partition('.')
+        if not (eq and dot and stage and name):
+            raise SystemExit(f"Ожидается параметр вида Стадия.имя=значение, получено: {item}")
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            value = raw
+        params.setdefault(stage, {})[name] = value
+    return params
+
+
+def _read_file(path) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _load_dictionaries(paths) -> dict:
+    """Файлы словарей -> {идентификатор: словарь}"""
+    from .dictionary import dictionary_id
+
+    dictionaries = {}
+    for path in paths or []:
+        data = _read_file(path)
+        dictionaries[dictionary_id(data)] = data
+    return dictionaries
+
+
+def compress(args) -> int:
+    from .pipeline import CompressionPipeline
+    from .archive import Archive
+
+    cache = None
+    if args.cache_dir:
+        from .cache import BlockCache
+        cache = BlockCache(cache_dir=args.cache_dir)
+    pipeline = CompressionPipeline(args.encoder, block_size=args.block_size, level=args.level,
+                                   params=_parse_params(args.param), cache=cache,
+                                   dictionary=_read_file(args.dictionary) if args.dictionary else None)
+    output = args.output or ('-' if args.input == '-' else args.input + SUFFIX)
+    f_in, f_out = _open_input(args.input), _open_output(output)
+    try:
+        Archive.write(f_in, f_out, pipeline, dedup=args.dedup, bypass=args.bypass,
+                      chunk_size=args.chunk_size, read_size=args.read_size,
+                      workers=args.workers, processes=args.processes)
+    finally:
+        _close(f_in)
+        _close(f_out)
+    return 0
+
+
+def decompress(args) -> int:
+    from .archive import Archive
+
+    if args.output:
+        output = args.output
+    elif args.input == '-':
+        output = '-'
+    else:
+        output = args.input[:-len(SUFFIX)] if args.input.endswith(SUFFIX) else args.input + '.out'
+
+    f_in = _open_input(args.input)
+    try:
+        data = Archive.read(f_in, dictionaries=_load_dictionaries(args.dictionary))
+    finally:
+        _close(f_in)
+
+    f_out = _open_output(output)
+    try:
+        f_out.write(data)
+    finally:
+        _close(f_out)
+    return 0
+
+
+def bench(args) -> int:
+    from .pipeline import CompressionPipeline
+
+    f_in = _open_input(args.input)
+    try:
+        data = f_in.read()
+    finally:
+        _close(f_in)
+
+    status = 0
+    print("{:<25} | {:>10} | {:>10} | {:>8} | {:>10} | {:>10}".format(
+        "Algorithm", "Input", "Output", "Ratio", "Enc Time", "Dec Time"))
+    print("-" * 88)
+    for name in args.encoder or CompressionPipeline.COMPRESSORS:
+        pipeline = CompressionPipeline(name, block_size=args.block_size, level=args.level,
+                                       params=_parse_params(args.param))
+        start = time.perf_counter()
+        encoded = pipeline.encode(data)
+        enc_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        decoded = pipeline.decode(encoded)
+        dec_time = time.perf_counter() - start
+
+        if decoded != data:
+            print(f"Ошибка в {name}: декодирование не соответствует оригиналу", file=sys.stderr)
+            status = 1
+        ratio = len(data) / len(encoded) if encoded else 0.0
+        print("{:<25} | {:>10} | {:>10} | {:>8.3f} | {:>10.5f} | {:>10.5f}".format(
+            name, f"{len(data)}B", f"{len(encoded)}B", ratio, enc_time, dec_time))
+    return status
+
+
+def estimate(args) -> int:
+    from .pipeline import CompressionPipeline
+
+    f_in = _open_input(args.input)
+    try:
+        data = f_in.read()
+    finally:
+        _close(f_in)
+
+    print("{:<25} | {:>10} | {:>10} | {:>8} | {:>10}".format("Algorithm", "Input", "Estimate", "Ratio", "Time"))
+    print("-" * 75)
+    for name in args.encoder or CompressionPipeline.COMPRESSORS:
+        pipeline = CompressionPipeline(name, block_size=args.block_size, level=args.level,
+                                       params=_parse_params(args.param))
+        start = time.perf_counter()
+        size = pipeline.estimate_size(data)
+        elapsed = time.perf_counter() - start
+        ratio = len(data) / size if size else 0.0
+        print("{:<25} | {:>10} | {:>10} | {:>8.3f} | {:>10.5f}".format(
+            name, f"{len(data)}B", f"{size}B", ratio, elapsed))
+    return 0
+
+
+def train(args) -> int:
+    from .dictionary import train_dictionary, dictionary_id
+
+    dictionary = train_dictionary((_read_file(path) for path in args.samples), size=args.size)
+    f_out = _open_output(args.output)
+    try:
+        f_out.write(dictionary)
+    finally:
+        _close(f_out)
+    print(f"{dictionary_id(dictionary)} {len(dictionary)}B", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    # Модуль пайплайна лёгкий (кодеки в нём загружаются лениво): имена пайплайнов проверяет argparse
+    from .pipeline import CompressionPipeline
+
+    encoders = sorted(CompressionPipeline.COMPRESSORS)
+    parser = argparse.ArgumentParser(prog='python -m encoders_decoders',
+                                     description='Сжатие и распаковка файлов пайплайнами encoders_decoders')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def add_pipeline_options(p):
+        p.add_argument('-b', '--block-size', type=int, default=None, help='размер блока пайплайна')
+        p.add_argument('-l', '--level', type=int, default=None, choices=range(1, 10), help='пресет 1..9')
+        p.add_argument('-p', '--param', action='append', metavar='STAGE.NAME=VALUE',
+                       help='параметр стадии, например Predictor.width=800')
+
+    p = sub.add_parser('compress', help='сжать файл в архив')
+    p.add_argument('input', help="входной файл или '-'")
+    p.add_argument('-o', '--output', help=f"выходной архив (по умолчанию <input>{SUFFIX})")
+    p.add_argument('-e', '--encoder', default='BWT+MTF+RLE+HA', choices=encoders, metavar='ENCODER',
+                   help=f"имя пайплайна: {', '.join(encoders)}")
+    p.add_argument('--dedup', action='store_true', help='хранить повторяющиеся блоки ссылками')
+    p.add_argument('--bypass', action='store_true', help='не сжимать несжимаемые блоки')
+    p.add_argument('-j', '--workers', type=int, default=0,
+                   help='число вычислителей; >0 — чтение, сжатие и запись идут параллельно')
+    p.add_argument('--processes', action='store_true', help='вычислители — процессы, а не потоки')
+    p.add_argument('--chunk-size', type=int, default=None, help='порция кодирования (по умолчанию — блок)')
+    p.add_argument('--read-size', type=int, default=None, help='объём одного чтения входа')
+    p.add_argument('-D', '--dictionary', help='файл словаря (см. train); в архив пишется только его идентификатор')
+    p.add_argument('--cache-dir', help='каталог кэша блоков: уже сжатые блоки берутся оттуда при повторных запусках')
+    add_pipeline_options(p)
+    p.set_defaults(func=compress)
+
+    p = sub.add_parser('decompress', help='распаковать архив')
+    p.add_argument('input', help="архив или '-'")
+    p.add_argument('-o', '--output', help='выходной файл')
+    p.add_argument('-D', '--dictionary', action='append', help='файл словаря (можно несколько)')
+    p.set_defaults(func=decompress)
+
+    p = sub.add_parser('bench', help='замер пайплайнов в памяти')
+    p.add_argument('input', help="входной файл или '-'")
+    p.add_argument('-e', '--encoder', action='append', choices=encoders, metavar='ENCODER',
+                   help='пайплайн (можно несколько; по умолчанию все)')
+    add_pipeline_options(p)
+    p.set_defaults(func=bench)
+
+    p = sub.add_parser('estimate', help='оценка размера без полного кодирования (по выборке блоков)')
+    p.add_argument('input', help="входной файл или '-'")
+    p.add_argument('-e', '--encoder', action='append', choices=encoders, metavar='ENCODER',
+                   help='пайплайн (можно несколько; по умолчанию все)')
+    add_pipeline_options(p)
+    p.set_defaults(func=estimate)
+
+    p = sub.add_parser('train', help='обучить словарь для маленьких блоков по образцам')
+    p.add_argument('samples', nargs='+', help='файлы-образцы')
+    p.add_argument('-o', '--output', required=True, help="файл словаря или '-'")
+    p.add_argument('--size', type=int, default=16 * 1024, help='размер словаря в байтах')
+    p.set_defaults(func=train)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
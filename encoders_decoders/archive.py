@@ -0,0 +1,299 @@
+import os
+import json
+import struct
+import hashlib
+import tempfile
+from io import BytesIO
+from functools import partial
+from typing import Dict, List, Optional
+
+from .pipeline import CompressionPipeline, CompressionError
+from .overlap import run_overlapped
+
+
+class Archive:
+    """
+    Формат архива: 4 байта длины метаданных, JSON с метаданными, затем тело.
+    В обычном режиме тело — склеенные закодированные блоки. В режиме 'framed'
+    тело состоит из записей (тип, значение[, данные]), что позволяет
+    хранить повторяющиеся блоки ссылками на уже записанные.
+    После JSON оставляется META_SLACK пробелов: append обновляет метаданные на месте.
+    """
+    META_HEADER = struct.Struct('>I')
+    RECORD = struct.Struct('>BI')
+    META_SLACK = 32
+
+    ENCODED = 0  # значение — длина закодированных данных, следом идут сами данные
+    REF = 1      # значение — номер ранее записанного уникального блока
+    STORED = 2   # как ENCODED, но данные записаны без сжатия
+
+    @classmethod
+    def write_header(cls, f, metadata: dict, size: Optional[int] = None):
+        """size — занимаемое место под JSON; по умолчанию длина JSON плюс META_SLACK"""
+        meta = json.dumps(metadata).encode()
+        size = len(meta) + cls.META_SLACK if size is None else size
+        f.write(cls.META_HEADER.pack(size))
+        f.write(meta.ljust(size))
+
+    @classmethod
+    def read_header(cls, f) -> dict:
+        meta_len = cls.META_HEADER.unpack(f.read(cls.META_HEADER.size))[0]
+        return json.loads(f.read(meta_len))
+
+    @classmethod
+    def pack_record(cls, kind: int, value: int, payload: bytes = b'') -> bytes:
+        return cls.RECORD.pack(kind, value) + payload
+
+    @classmethod
+    def iter_records(cls, data: bytes):
+        ptr = 0
+        while ptr + cls.RECORD.size <= len(data):
+            kind, value = cls.RECORD.unpack_from(data, ptr)
+            ptr += cls.RECORD.size
+            if kind == cls.REF:
+                yield kind, value, b''
+            else:
+                yield kind, value, data[ptr:ptr + value]
+                ptr += value
+
+    @staticmethod
+    def make_metadata(pipeline: CompressionPipeline, dedup: bool = False, bypass: bool = False) -> dict:
+        metadata = {'encoder': pipeline.encoder}
+        if pipeline.level is not None:
+            metadata['level'] = pipeline.level
+        if pipeline.params:
+            metadata['params'] = pipeline.params
+        if pipeline.dictionary:
+            # Сам словарь в архив не пишется: декодеру его передают отдельно по идентификатору
+            metadata['dictionary'] = pipeline.dictionary_id
+        if dedup or bypass:
+            metadata.update(framed=True, dedup=dedup, bypass=bypass)
+        return metadata
+
+    @staticmethod
+    def pipeline_for(metadata: dict, cache=None, dictionaries=None) -> CompressionPipeline:
+        """dictionaries — отображение идентификатор -> словарь (dict или DictionaryStore)"""
+        encoder = metadata.get("encoder")
+        if encoder is None:
+            raise CompressionError("В метаданных отсутствует информация о кодировщике.")
+        dictionary = None
+        dict_id = metadata.get("dictionary")
+        if dict_id is not None:
+            if dictionaries is None or dict_id not in dictionaries:
+                raise CompressionError(f"Архив сжат со словарём {dict_id}, но словарь не передан.")
+            dictionary = dictionaries[dict_id]
+        return CompressionPipeline(encoder, cache=cache, level=metadata.get("level"),
+                                   params=metadata.get("params"), dictionary=dictionary)
+
+    READ_SIZE = 1 << 20  # порция чтения по умолчанию, кратная размеру порции кодирования
+    TASK_SIZE = 128 << 10  # объём одного задания вычислителю в перекрытом режиме
+
+    @classmethod
+    def write(cls, f_in, f_out, pipeline: CompressionPipeline, dedup: bool = False,
+              bypass: bool = False, chunk_size: Optional[int] = None, read_size: Optional[int] = None,
+              workers: int = 0, queue_size: int = 8, processes: bool = False) -> dict:
+        """
+        Кодирует поток f_in в архив f_out порциями chunk_size (по умолчанию — pipeline.chunk_size).
+        dedup — повторяющиеся порции записываются ссылками; bypass — несжимаемые хранятся как есть.
+
+        Файл читается крупнее — по read_size байт (по умолчанию ~READ_SIZE), порции кодирования
+        нарезаются из прочитанного, так что результат не зависит от read_size.
+        workers > 0 — чтение, кодирование и запись перекрываются: поток чтения, пул из workers
+        вычислителей (процессов при processes=True) и поток записи с очередями длины queue_size.
+        """
+        metadata = cls.make_metadata(pipeline, dedup, bypass)
+        start = f_out.tell() if f_out.seekable() else None
+        cls.write_header(f_out, metadata)
+        meta_size = len(json.dumps(metadata).encode()) + cls.META_SLACK
+        unique = cls.write_body(f_in, f_out, pipeline, dedup, bypass, chunk_size, read_size,
+                                workers, queue_size, processes)
+        if dedup:
+            # Число уникальных блоков нужно append; в несмещаемый поток (канал) его не дописать —
+            # тогда append один раз посчитает его по заголовкам записей
+            metadata['unique'] = unique
+            if start is not None:
+                end = f_out.tell()
+                cls._update_header(f_out, start, metadata, meta_size)
+                f_out.seek(end)
+        return metadata
+
+    @classmethod
+    def write_body(cls, f_in, f_out, pipeline: CompressionPipeline, dedup: bool = False, bypass: bool = False,
+                   chunk_size: Optional[int] = None, read_size: Optional[int] = None, workers: int = 0,
+                   queue_size: int = 8, processes: bool = False, first_index: int = 0) -> int:
+        """
+        Тело архива для write и append. first_index — число уникальных блоков, уже
+        записанных в архив: новые ссылки нумеруются после них.
+        Возвращает число уникальных блоков вместе с новыми.
+        """
+        chunk_size = chunk_size or pipeline.chunk_size
+        read_size = read_size or chunk_size * max(1, cls.READ_SIZE // chunk_size)
+        task = partial(cls.encode_batch, pipeline, dedup or bypass, bypass)
+        seen: Dict[bytes, int] = {}
+
+        if workers:
+            # Прочитанное делится на несколько заданий, чтобы загрузить все вычислители
+            task_size = max(chunk_size, min(read_size, cls.TASK_SIZE) // chunk_size * chunk_size)
+            batches = cls.iter_batches(f_in, chunk_size, read_size, dedup, task_size, seen, first_index)
+            run_overlapped(batches, task, f_out.write, workers=workers, queue_size=queue_size,
+                           processes=processes)
+        else:
+            for batch in cls.iter_batches(f_in, chunk_size, read_size, dedup, seen=seen, first_index=first_index):
+                f_out.write(task(batch))
+        return first_index + len(seen)
+
+    @classmethod
+    def append(cls, archive_path, new_data, dictionaries=None, **options) -> dict:
+        """
+        Дописывает new_data (bytes или поток) в конец архива: кодируются только новые байты,
+        декодирование даёт склейку старого и нового содержимого. options — как у write_body.
+        Дедупликация работает внутри дописываемых данных; число уникальных блоков хранится
+        в метаданных ('unique') и обновляется на месте. У архива без этого поля оно один раз
+        считается по заголовкам записей (данные записей пропускаются).
+        """
+        if isinstance(new_data, (bytes, bytearray, memoryview)):
+            new_data = BytesIO(new_data)
+
+        with open(archive_path, 'r+b') as f:
+            metadata = cls.read_header(f)
+            meta_size = f.tell() - cls.META_HEADER.size
+            pipeline = cls.pipeline_for(metadata, dictionaries=dictionaries)
+            dedup = metadata.get('dedup', False)
+            unique = metadata.get('unique')
+            if dedup and unique is None:
+                unique = cls.count_unique(f)
+
+            f.seek(0, os.SEEK_END)
+            unique = cls.write_body(new_data, f, pipeline, dedup, metadata.get('bypass', False),
+                                    first_index=unique or 0, **options)
+            if not dedup:
+                return metadata
+
+            metadata['unique'] = unique
+            if cls._update_header(f, 0, metadata, meta_size):
+                return metadata
+
+        cls._rewrite_header(archive_path, metadata, cls.META_HEADER.size + meta_size)
+        return metadata
+
+    @classmethod
+    def _update_header(cls, f, start: int, metadata: dict, meta_size: int) -> bool:
+        """Перезаписывает метаданные на месте, если они помещаются в meta_size байт"""
+        if len(json.dumps(metadata).encode()) > meta_size:
+            return False
+        f.seek(start)
+        cls.write_header(f, metadata, meta_size)
+        return True
+
+    @classmethod
+    def count_unique(cls, f) -> int:
+        """Число уникальных (ENCODED/STORED) записей тела, начиная с текущей позиции f"""
+        count = 0
+        while header := f.read(cls.RECORD.size):
+            if len(header) < cls.RECORD.size:
+                break
+            kind, value = cls.RECORD.unpack(header)
+            if kind != cls.REF:
+                count += 1
+                f.seek(value, os.SEEK_CUR)
+        return count
+
+    @classmethod
+    def _rewrite_header(cls, archive_path, metadata: dict, body_start: int):
+        """Метаданные переросли запас: архив копируется с новым заголовком и заменяет старый"""
+        directory = os.path.dirname(os.path.abspath(archive_path))
+        with open(archive_path, 'rb') as f_old, tempfile.NamedTemporaryFile(dir=directory, delete=False) as f_new:
+            cls.write_header(f_new, metadata)
+            f_old.seek(body_start)
+            while chunk := f_old.read(cls.READ_SIZE):
+                f_new.write(chunk)
+        os.replace(f_new.name, archive_path)
+
+    @staticmethod
+    def _read_full(f, size: int) -> bytes:
+        """Читает size байт или до конца потока: каналы и сокеты отдают данные частями"""
+        data = f.read(size)
+        while data and len(data) < size:
+            more = f.read(size - len(data))
+            if not more:
+                break
+            data += more
+        return data
+
+    @classmethod
+    def iter_batches(cls, f_in, chunk_size: int, read_size: int, dedup: bool = False,
+                     batch_size: Optional[int] = None, seen: Optional[Dict[bytes, int]] = None,
+                     first_index: int = 0):
+        """
+        Пакеты порций для кодирования: список пар (нужно_кодировать, данные) на каждые
+        batch_size байт (по умолчанию — на каждое чтение read_size). Дедупликация решается здесь,
+        последовательно, поэтому ссылки приходят уже готовыми записями REF.
+        seen (хэш -> номер блока) заполняется по ходу; номера начинаются с first_index.
+        """
+        seen = {} if seen is None else seen
+        batch_size = batch_size or read_size
+        while buf := cls._read_full(f_in, read_size):
+            batch = []
+            for i in range(0, len(buf), chunk_size):
+                if batch and i % batch_size == 0:
+                    yield batch
+                    batch = []
+                chunk = buf[i:i + chunk_size]
+                if dedup:
+                    digest = hashlib.sha256(chunk).digest()
+                    if digest in seen:
+                        batch.append((False, cls.pack_record(cls.REF, seen[digest])))
+                        continue
+                    seen[digest] = first_index + len(seen)
+                batch.append((True, chunk))
+            yield batch
+
+    @classmethod
+    def encode_batch(cls, pipeline: CompressionPipeline, framed: bool, bypass: bool, batch) -> bytes:
+        out = []
+        for to_encode, data in batch:
+            if not to_encode:
+                out.append(data)
+            elif framed:
+                out.append(cls.encode_record(pipeline, data, bypass))
+            else:
+                out.append(pipeline.encode(data))
+        return b''.join(out)
+
+    @classmethod
+    def encode_record(cls, pipeline: CompressionPipeline, chunk: bytes, bypass: bool) -> bytes:
+        """Запись одного уникального блока: закодированного или, при bypass, хранимого как есть"""
+        if bypass and pipeline.is_incompressible(chunk):
+            return cls.pack_record(cls.STORED, len(chunk), chunk)
+
+        encoded = pipeline.encode(chunk)
+        if bypass and len(encoded) >= len(chunk):
+            return cls.pack_record(cls.STORED, len(chunk), chunk)
+        return cls.pack_record(cls.ENCODED, len(encoded), encoded)
+
+    @classmethod
+    def read(cls, f, cache=None, dictionaries=None) -> bytes:
+        """Декодирует архив из потока f целиком"""
+        metadata = cls.read_header(f)
+        pipeline = cls.pipeline_for(metadata, cache, dictionaries)
+        return cls.decode_body(pipeline, metadata, f.read())
+
+    @classmethod
+    def decode_body(cls, pipeline: CompressionPipeline, metadata: dict, encoded_data: bytes) -> bytes:
+        if not metadata.get("framed"):
+            return pipeline.decode(encoded_data)
+
+        unique: List[bytes] = []
+        decoded = bytearray()
+        for kind, value, payload in cls.iter_records(encoded_data):
+            if kind == cls.REF:
+                if value >= len(unique):
+                    raise CompressionError(f"Ссылка на несуществующий блок: {value}")
+                decoded.extend(unique[value])
+            elif kind == cls.STORED:
+                unique.append(payload)
+                decoded.extend(payload)
+            else:
+                unique.append(pipeline.decode(payload))
+                decoded.extend(unique[-1])
+        return bytes(decoded)
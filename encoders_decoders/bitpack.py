@@ -0,0 +1,85 @@
+from .blockProcessor import *
+import numpy as np
+
+"""
+Упаковка двухуровневых (ч/б) RAW-изображений по 1 биту на пиксель.
+RawConverter пишет тег BW и по байту на пиксель (0/1 или 0/255 в зависимости от версии),
+поэтому запоминаются оба значения, а пиксель кодируется битом «равен старшему».
+Продолжения файла без тега тоже упаковываются, если в них не больше двух значений.
+
+Блок: [режим 1 байт][тег 2 байта][младшее, старшее значение][число пикселей 4 байта][биты]
+Режим RAW — данные не подошли и хранятся как есть.
+"""
+
+
+class BitPack(BufferCodec):
+    BLOCKWISE = False
+    HEADER = struct.Struct('>B2sBBI')
+    RAW = 0
+    PACKED = 1
+    TAG = b'BW'
+    NO_TAG = b'\x00\x00'
+
+    def __init__(self, block_size):
+        self.block_size = block_size
+
+    def max_encoded_size(self, size: int) -> int:
+        if not size:
+            return 0
+        return size + BlockProcessor.BLOCK_HEADER.size + self.HEADER.size + 1
+
+    def estimate_size(self, data) -> int:
+        """Точный размер: решение «упаковывать или нет» требует только гистограммы"""
+        if not data:
+            return 0
+        tag = bytes(data[:2])
+        raw = BlockProcessor.BLOCK_HEADER.size + 1 + len(data)
+        if tag in (b'GR', b'CL'):
+            return raw
+        body = data[2:] if tag == self.TAG else data
+        if np.count_nonzero(np.bincount(np.frombuffer(body, dtype=np.uint8), minlength=256)) > 2:
+            return raw
+        return BlockProcessor.BLOCK_HEADER.size + self.HEADER.size + (len(body) + 7) // 8
+
+    def encode(self, data: bytes) -> bytes:
+        if not data:
+            return b''
+
+        tag = bytes(data[:2])
+        if tag == self.TAG:
+            body = data[2:]
+        elif tag in (b'GR', b'CL'):
+            return BlockProcessor.add_block_header(bytes([self.RAW]) + data)
+        else:
+            tag, body = self.NO_TAG, data
+
+        pixels = np.frombuffer(body, dtype=np.uint8)
+        values = np.flatnonzero(np.bincount(pixels, minlength=256)) if len(pixels) else []
+        if len(values) > 2:
+            return BlockProcessor.add_block_header(bytes([self.RAW]) + data)
+
+        low = int(values[0]) if len(values) else 0
+        high = int(values[-1]) if len(values) else 0
+        header = self.HEADER.pack(self.PACKED, tag, low, high, len(pixels))
+        return BlockProcessor.add_block_header(header + np.packbits(pixels == high).tobytes())
+
+    def decode(self, data: bytes) -> bytes:
+        decoded = bytearray()
+        ptr = 0
+
+        while ptr < len(data):
+            block, ptr = BlockProcessor.read_block(data, ptr)
+            if not block:
+                break
+
+            if block[0] == self.RAW:
+                decoded.extend(block[1:])
+                continue
+
+            _, tag, low, high, count = self.HEADER.unpack_from(block)
+            if tag != self.NO_TAG:
+                decoded.extend(tag)
+            bits = np.unpackbits(np.frombuffer(block, dtype=np.uint8, offset=self.HEADER.size), count=count)
+            decoded.extend(np.where(bits, high, low).astype(np.uint8).tobytes())
+
+        return bytes(decoded)
@@ -28,3 +28,91 @@ class BlockProcessor:
             return data[ptr:ptr + block_len], ptr + block_len
         else:
             return data[ptr:], len(data)
+
+    @classmethod
+    def reserve_header(cls, pos: int) -> int:
+        """Позиция тела блока, если заголовок будет дописан на месте pos после кодирования"""
+        return pos + cls.BLOCK_HEADER.size if cls.use_header else pos
+
+    @classmethod
+    def close_block(cls, dst, start: int, end: int):
+        """Дописывает заголовок блока, занимающего dst[start:end] вместе с заголовком"""
+        if cls.use_header:
+            cls.BLOCK_HEADER.pack_into(dst, start, end - start - cls.BLOCK_HEADER.size)
+
+    @classmethod
+    def block_count(cls, size: int, block_size: int) -> int:
+        if not size:
+            return 0
+        return -(-size // block_size) if cls.use_header else 1
+
+
+def ensure_capacity(dst, size: int):
+    """
+    Буфер вызывающего должен вмещать size байт: bytearray дорастает до нужного
+    размера (переиспользуемый буфер перестаёт расти после первых вызовов),
+    memoryview фиксированного размера — ValueError.
+    """
+    if len(dst) >= size:
+        return
+    if isinstance(dst, bytearray):
+        dst.extend(bytes(size - len(dst)))
+    else:
+        raise ValueError(f"Буфер мал: нужно {size} байт, доступно {len(dst)}")
+
+
+def sample_blocks(data, block_size: int, count: int) -> list:
+    """До count блоков, равномерно взятых по data; если блоков не больше count — все"""
+    total = BlockProcessor.block_count(len(data), block_size)
+    if total <= count:
+        return BlockProcessor.split_blocks(data, block_size)
+    return [data[k * block_size:(k + 1) * block_size] for k in (i * total // count for i in range(count))]
+
+
+def write_into(dst, data) -> int:
+    """Копирует data в начало dst (с проверкой места) и возвращает длину"""
+    ensure_capacity(dst, len(data))
+    dst[:len(data)] = data
+    return len(data)
+
+
+class BufferCodec:
+    """
+    encode_into(src, dst) / decode_into(src, dst): результат пишется в буфер
+    вызывающего, возвращается число записанных байт. src — bytes или memoryview,
+    dst — bytearray или записываемый memoryview (см. ensure_capacity).
+    max_encoded_size(n) — худший случай размера кодирования n байт.
+    Здесь — запасной путь через encode/decode; горячие кодеки пишут в dst напрямую.
+
+    estimate_size(data) — размер encode(data) без построения результата: оцениваются
+    ESTIMATE_BLOCKS блоков, равномерно взятых по входу, и сумма масштабируется на весь вход
+    (не больше max_encoded_size). Если все блоки попали в выборку, ответ точный.
+    Кодеки переопределяют _estimate_block дешёвым подсчётом, а с точной формулой
+    для всего входа — сам estimate_size.
+    """
+    ESTIMATE_BLOCKS = 16
+    # False — кодек видит весь вход одним блоком (фильтры изображений): выборка блоков ему не подходит
+    BLOCKWISE = True
+
+    def max_encoded_size(self, size: int) -> int:
+        raise NotImplementedError
+
+    def estimate_size(self, data) -> int:
+        if not data:
+            return 0
+        blocks = sample_blocks(data, self.block_size, self.ESTIMATE_BLOCKS)
+        sampled = sum(len(block) for block in blocks)
+        estimate = sum(self._estimate_block(block) for block in blocks)
+        if sampled == len(data):
+            return estimate
+        return min(self.max_encoded_size(len(data)), round(estimate * len(data) / sampled))
+
+    def _estimate_block(self, block) -> int:
+        """Размер кодирования одного блока вместе с заголовком; здесь — честным кодированием"""
+        return len(self.encode(bytes(block)))
+
+    def encode_into(self, src, dst) -> int:
+        return write_into(dst, self.encode(bytes(src)))
+
+    def decode_into(self, src, dst) -> int:
+        return write_into(dst, self.decode(bytes(src)))
@@ -32,16 +32,25 @@ class _Sorting:
         return result
 
 
-class BWT:
+class BWT(BufferCodec):
     def __init__(self, block_size):
         self.block_size = block_size
 
+    def max_encoded_size(self, size: int) -> int:
+        # Индекс строки и длина блока (8 байт) плюс последний столбец той же длины
+        return size + (BlockProcessor.BLOCK_HEADER.size + 8) * BlockProcessor.block_count(size, self.block_size)
+
+    def estimate_size(self, data) -> int:
+        return self.max_encoded_size(len(data))
+
     def encode(self, data: bytes) -> bytes:
 
         encoded = bytearray()
         for block in BlockProcessor.split_blocks(data, self.block_size):
             if not block:
                 continue
+            # Вход может быть memoryview (например, над общей памятью): копируется только блок
+            block = bytes(block)
 
             rotations = [block[i:] + block[:i] for i in range(len(block))]
             sa = _Sorting().sort_indices(rotations)
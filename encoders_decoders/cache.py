@@ -0,0 +1,112 @@
+import os
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+
+class BlockCache:
+    """
+    Контентно-адресуемый кэш закодированных блоков.
+    Ключ — (имя пайплайна, размер блока, хэш блока). В памяти хранится LRU
+    с ограничением по суммарному объёму, опционально — второй уровень на диске.
+    Безопасен для использования из нескольких потоков.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, cache_dir=None):
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(name: str, block_size: int, block: bytes) -> tuple:
+        return name, block_size, hashlib.sha256(block).hexdigest()
+
+    def _disk_path(self, key: tuple) -> Path:
+        name, block_size, digest = key
+        tag = hashlib.sha1(f"{name}:{block_size}".encode()).hexdigest()[:12]
+        return self.cache_dir / f"{tag}_{digest}.bin"
+
+    def get(self, key: tuple):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            if path.exists():
+                value = path.read_bytes()
+                self._remember(key, value)
+                with self._lock:
+                    self.disk_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: tuple, value: bytes):
+        self._remember(key, value)
+        if self.cache_dir:
+            path = self._disk_path(key)
+            if not path.exists():
+                # Пишем через временный файл, чтобы параллельные запуски не видели обрезанных записей
+                fd, tmp = tempfile.mkstemp(dir=self.cache_dir)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(value)
+                os.replace(tmp, path)
+
+    def _remember(self, key: tuple, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __getstate__(self):
+        # Замок не сериализуется; копия кэша в другом процессе получает свой.
+        # Уровень в памяти не пересылается (иначе каждое задание пула везёт до max_bytes):
+        # копия начинает с пустого LRU и делит с исходным кэшем только диск
+        state = self.__dict__.copy()
+        del state['_lock']
+        state.update(_entries=OrderedDict(), size=0)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.size,
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+        }
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,88 @@
+import hashlib
+import heapq
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+"""
+Обучаемые словари для маленьких блоков: общий «разгон» для LZSS/LZH (окно,
+заполненное словарём до начала блока) и LZW (записи, построенные по словарю).
+Архив хранит только идентификатор словаря — хэш его содержимого.
+"""
+
+DEFAULT_SIZE = 16 * 1024
+
+
+def dictionary_id(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def train_dictionary(samples: Iterable[bytes], size: int = DEFAULT_SIZE, k: int = 8,
+                     segment_size: int = 64) -> bytes:
+    """
+    Словарь из фрагментов образцов, покрывающих самые частые k-граммы.
+    Вес k-граммы — число образцов, где она встречается (встречающиеся в одном образце не учитываются).
+    Фрагменты выбираются жадно по сумме весов ещё не покрытых k-грамм; самые ценные
+    ставятся в конец словаря — ближе всего к началу блока.
+    """
+    samples = [bytes(s) for s in samples if s]
+    df = Counter()
+    for s in samples:
+        df.update({s[i:i + k] for i in range(len(s) - k + 1)})
+
+    def grams(segment):
+        return {segment[i:i + k] for i in range(len(segment) - k + 1) if df[segment[i:i + k]] > 1}
+
+    segments = [s[start:start + segment_size] for s in samples for start in range(0, len(s), segment_size)]
+    # Ленивая жадная выборка: оценка фрагмента может только уменьшаться по мере покрытия
+    heap = [(-sum(df[g] for g in grams(seg)), i) for i, seg in enumerate(segments)]
+    heapq.heapify(heap)
+    covered = set()
+    chosen = []
+    total = 0
+    while heap and total < size:
+        score, i = heapq.heappop(heap)
+        fresh = grams(segments[i]) - covered
+        current = -sum(df[g] for g in fresh)
+        if current == 0:
+            break
+        if current != score:
+            heapq.heappush(heap, (current, i))
+            continue
+        covered |= fresh
+        chosen.append(segments[i])
+        total += len(segments[i])
+
+    return b''.join(reversed(chosen))[-size:] if chosen else b''
+
+
+class DictionaryStore:
+    """Каталог словарей <id>.dict; поддерживает store[id] и id in store, как словарь Python"""
+
+    SUFFIX = '.dict'
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, dict_id: str) -> Path:
+        return self.directory / f"{dict_id}{self.SUFFIX}"
+
+    def save(self, data: bytes) -> str:
+        dict_id = dictionary_id(data)
+        path = self.path(dict_id)
+        if not path.exists():
+            path.write_bytes(data)
+        return dict_id
+
+    def __contains__(self, dict_id) -> bool:
+        return self.path(dict_id).exists()
+
+    def __getitem__(self, dict_id: str) -> bytes:
+        path = self.path(dict_id)
+        if not path.exists():
+            raise KeyError(dict_id)
+        return path.read_bytes()
+
+    def get(self, dict_id: str, default=None):
+        return self[dict_id] if dict_id in self else default
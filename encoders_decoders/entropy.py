@@ -0,0 +1,54 @@
+import numpy as np
+
+
+def _as_array(data) -> np.ndarray:
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def _entropy_from_counts(counts: np.ndarray) -> float:
+    total = counts.sum()
+    if not total:
+        return 0.0
+    p = counts[counts > 0] / total
+    return float(-(p * np.log2(p)).sum())
+
+
+def entropy_order0(data: bytes) -> float:
+    """Энтропия нулевого порядка, бит/байт"""
+    if not data:
+        return 0.0
+    return _entropy_from_counts(np.bincount(_as_array(data), minlength=256))
+
+
+def entropy_order1(data: bytes) -> float:
+    """Условная энтропия H(X_i | X_{i-1}) по парам соседних байтов, бит/байт"""
+    arr = _as_array(data)
+    if len(arr) < 2:
+        return 0.0
+    pairs = arr[:-1].astype(np.int64) * 256 + arr[1:]
+    joint = np.bincount(pairs, minlength=256 * 256).reshape(256, 256)
+    prev = joint.sum(axis=1)
+    # H(X|Y) = H(X, Y) - H(Y)
+    return _entropy_from_counts(joint.ravel()) - _entropy_from_counts(prev)
+
+
+def block_entropies(data: bytes, block_size: int) -> np.ndarray:
+    """Энтропия нулевого порядка каждого блока (последний блок может быть неполным)"""
+    arr = _as_array(data)
+    full = len(arr) // block_size
+    result = []
+
+    if full:
+        blocks = arr[:full * block_size].reshape(full, block_size).astype(np.int64)
+        # Гистограммы всех блоков одним bincount: смещаем значения на 256 * номер блока
+        counts = np.bincount((blocks + 256 * np.arange(full)[:, None]).ravel(),
+                             minlength=256 * full).reshape(full, 256)
+        p = counts / block_size
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terms = np.where(counts > 0, p * np.log2(p), 0.0)
+        result.append(-terms.sum(axis=1))
+
+    if len(arr) % block_size:
+        result.append(np.array([entropy_order0(arr[full * block_size:].tobytes())]))
+
+    return np.concatenate(result) if result else np.zeros(0)
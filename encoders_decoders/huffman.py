@@ -3,9 +3,122 @@ from collections import defaultdict
 from heapq import heappop, heapify, heappush
 
 
-class Huffman:
-    def __init__(self, block_size):
+def code_lengths(freq: dict, max_length: int = None) -> dict:
+    """
+    Длины кодов Хаффмана по частотам символов (минимум 1 бит).
+    max_length ограничивает длину кода: частоты сглаживаются делением пополам,
+    пока самый длинный код не уложится в предел.
+    """
+    while True:
+        lengths = _code_lengths(freq)
+        if max_length is None or max(lengths.values()) <= max_length:
+            return lengths
+        freq = {sym: max(1, wt >> 1) for sym, wt in freq.items()}
+
+
+def _code_lengths(freq: dict) -> dict:
+    if len(freq) == 1:
+        return {sym: 1 for sym in freq}
+
+    # Узлы дерева хранятся ссылками на родителя: слияние без копирования списков символов
+    heap = [(wt, i) for i, wt in enumerate(freq.values())]
+    heapify(heap)
+    parent = [0] * (2 * len(heap) - 1)
+    counter = len(heap)
+    while len(heap) > 1:
+        lo = heappop(heap)
+        hi = heappop(heap)
+        parent[lo[1]] = parent[hi[1]] = counter
+        heappush(heap, (lo[0] + hi[0], counter))
+        counter += 1
+    # Родитель всегда создан позже потомка: глубины считаются одним проходом от корня
+    depth = [0] * counter
+    for node in range(counter - 2, -1, -1):
+        depth[node] = depth[parent[node]] + 1
+    return {sym: depth[i] for i, sym in enumerate(freq)}
+
+
+def canonical_codes(lengths: dict) -> dict:
+    """Канонические коды: sym -> (код, длина). Зависят только от длин"""
+    codes = {}
+    code = 0
+    prev_len = 0
+    for sym, length in sorted(lengths.items(), key=lambda item: (item[1], item[0])):
+        code <<= length - prev_len
+        codes[sym] = (code, length)
+        code += 1
+        prev_len = length
+    return codes
+
+
+class Huffman(BufferCodec):
+    FREQ = 'freq'
+    CANONICAL = 'canonical'
+    CANONICAL_FLAG = 0x80  # старший бит байта padding: таблица хранится длинами кодов
+    STREAMS_FLAG = 0x40    # блок разбит на несколько чередующихся битовых потоков
+    STREAMS_MAX_CODE = 12  # предел длины кода в многопоточном режиме: таблица декодера 2^12
+    # Полосы NumPy обгоняют последовательный декодер лишь от ~32 потоков (шаг стоит одинаково
+    # при любом их числе); при меньшем числе потоки декодируются по очереди
+    STREAMS_VECTOR_MIN = 32
+
+    def __init__(self, block_size, table=FREQ, streams=1):
         self.block_size = block_size
+        if table not in (self.FREQ, self.CANONICAL):
+            raise ValueError(f"Неизвестная стратегия таблицы Хаффмана: {table}")
+        if not 1 <= streams <= 255:
+            raise ValueError(f"Число потоков Хаффмана должно быть от 1 до 255, получено: {streams}")
+        self.table = table
+        # streams > 1: символ i пишется в поток i % streams, все потоки декодируются одновременно
+        self.streams = streams
+
+    def max_encoded_size(self, size: int) -> int:
+        """
+        Код Хаффмана не длиннее равномерного, то есть не больше 8 бит на символ;
+        в многопоточном режиме коды ограничены STREAMS_MAX_CODE битами.
+        Заголовок — не больше таблицы частот на 256 символов и таблицы переходов.
+        """
+        blocks = BlockProcessor.block_count(size, self.block_size)
+        header = BlockProcessor.BLOCK_HEADER.size + 3 + 5 * 256 + 5 + 5 * self.streams
+        payload = (size * self.STREAMS_MAX_CODE + 7) // 8 if self.streams > 1 else size
+        return blocks * (header + 1) + payload
+
+    def _estimate_block(self, block) -> int:
+        """
+        Точный размер блока без упаковки битов: длины кодов по одной гистограмме блока.
+        Все деревья Хаффмана для одних частот дают одну и ту же сумму бит, поэтому
+        порядок символов не важен. В многопоточном режиме дерево должно совпасть с encode —
+        важны биты каждого потока, — и символы берутся в порядке первого появления.
+        """
+        import numpy as np
+
+        values = np.frombuffer(block, dtype=np.uint8)
+        counts = np.bincount(values, minlength=256)
+        header = BlockProcessor.BLOCK_HEADER.size + 3
+
+        if self.streams > 1:
+            syms, first = np.unique(values, return_index=True)
+            freq = {int(sym): int(counts[sym]) for sym in syms[np.argsort(first)]}
+            lens = np.zeros(256, dtype=np.int64)
+            lengths = code_lengths(freq, self.STREAMS_MAX_CODE)
+            lens[list(lengths)] = list(lengths.values())
+            payload = sum((int(lens[values[lane::self.streams]].sum()) + 7) // 8 for lane in range(self.streams))
+            return header + 2 * len(lengths) + 5 + 4 * self.streams + payload
+
+        syms = np.flatnonzero(counts)
+        header += (2 if self.table == self.CANONICAL else 5) * len(syms)
+        if len(syms) == 1:
+            # Единственный символ: 1 бит на символ в режиме canonical, пустой код в режиме freq
+            bits = int(counts[syms[0]]) if self.table == self.CANONICAL else 0
+            return header + (bits + 7) // 8
+        # Сумма бит кода Хаффмана — сумма весов всех внутренних узлов дерева
+        heap = counts[syms].tolist()
+        heapify(heap)
+        bits = 0
+        while len(heap) > 1:
+            merged = heappop(heap) + heappop(heap)
+            bits += merged
+            heappush(heap, merged)
+        return header + (bits + 7) // 8
 
     def encode(self, data: bytes) -> bytes:
         bp = BlockProcessor()
@@ -16,6 +129,13 @@ class Huffman:
             for b in block:
                 freq[b] += 1
 
+            if self.streams > 1:
+                encoded.extend(bp.add_block_header(self._encode_streams(block, freq)))
+                continue
+            if self.table == self.CANONICAL:
+                encoded.extend(bp.add_block_header(self._encode_canonical(block, freq)))
+                continue
+
             heap = [[wt, [sym, ""]] for sym, wt in freq.items()]
             heapify(heap)
 
@@ -30,7 +150,7 @@ class Huffman:
 
             codes = {sym: code for sym, code in heap[0][1:]}
             bit_str = ''.join(codes[b] for b in block)
-            padding = (8 - (len(bit_str) % 8) % 8)
+            padding = -len(bit_str) % 8
             bit_str += '0' * padding
             header = struct.pack('>BH', padding, len(freq))
             for sym, count in freq.items():
@@ -44,6 +164,42 @@ class Huffman:
 
         return bytes(encoded)
 
+    def _encode_canonical(self, block, freq) -> bytes:
+        lengths = code_lengths(freq)
+        codes = {sym: format(code, f'0{length}b') for sym, (code, length) in canonical_codes(lengths).items()}
+        bit_str = ''.join(codes[b] for b in block)
+        padding = -len(bit_str) % 8
+        bit_str += '0' * padding
+        header = struct.pack('>BH', padding | self.CANONICAL_FLAG, len(lengths))
+        for sym, length in sorted(lengths.items()):
+            header += struct.pack('>BB', sym, length)
+
+        block_enc = bytearray()
+        for i in range(0, len(bit_str), 8):
+            block_enc.append(int(bit_str[i:i + 8], 2))
+        return header + block_enc
+
+    def _encode_streams(self, block, freq) -> bytes:
+        """
+        Блок из чередующихся потоков с общей канонической таблицей:
+        [флаги][число символов 2 байта][(символ, длина)...][число потоков 1 байт]
+        [число символов блока 4 байта][длины потоков по 4 байта — таблица переходов][потоки]
+        """
+        lengths = code_lengths(freq, self.STREAMS_MAX_CODE)
+        codes = {sym: format(code, f'0{length}b') for sym, (code, length) in canonical_codes(lengths).items()}
+        header = struct.pack('>BH', self.CANONICAL_FLAG | self.STREAMS_FLAG, len(lengths))
+        for sym, length in sorted(lengths.items()):
+            header += struct.pack('>BB', sym, length)
+        header += struct.pack('>BI', self.streams, len(block))
+
+        payloads = []
+        for lane in range(self.streams):
+            bit_str = ''.join(codes[b] for b in block[lane::self.streams])
+            bit_str += '0' * (-len(bit_str) % 8)
+            payloads.append(int(bit_str, 2).to_bytes(len(bit_str) // 8, 'big') if bit_str else b'')
+        jump_table = b''.join(struct.pack('>I', len(p)) for p in payloads)
+        return header + jump_table + b''.join(payloads)
+
     def decode(self, data: bytes) -> bytes:
         bp = BlockProcessor()
 
@@ -60,6 +216,20 @@ class Huffman:
             freq = {}
             pos = 3
 
+            if padding & self.CANONICAL_FLAG:
+                padding &= ~self.CANONICAL_FLAG
+                lengths = {}
+                for _ in range(num_syms):
+                    lengths[block[pos]] = block[pos + 1]
+                    pos += 2
+                if padding & self.STREAMS_FLAG:
+                    decoded.extend(self._decode_streams(block, pos, lengths))
+                    continue
+                rev_codes = {format(code, f'0{length}b'): sym
+                             for sym, (code, length) in canonical_codes(lengths).items()}
+                self._decode_bits(block[pos:], padding, rev_codes, decoded)
+                continue
+
             for _ in range(num_syms):
                 sym = block[pos]
                 count = struct.unpack('>I', block[pos + 1:pos + 5])[0]
@@ -78,17 +248,81 @@ class Huffman:
                     pair[1] = '1' + pair[1]
                 heappush(heap, [lo[0] + hi[0]] + lo[1:] + hi[1:])
 
+            if len(freq) == 1:
+                # Единственный символ получает пустой код — восстанавливаем по счётчику
+                sym, count = next(iter(freq.items()))
+                decoded.extend(bytes([sym]) * count)
+                continue
+
             codes = {sym: code for sym, code in heap[0][1:]}
             rev_codes = {v: k for k, v in codes.items()}
+            self._decode_bits(block[pos:], padding, rev_codes, decoded)
+
+        return bytes(decoded)
+
+    @staticmethod
+    def _decode_bits(payload, padding, rev_codes, decoded):
+        bit_str = ''.join(f'{b:08b}' for b in payload)
+        bit_str = bit_str[:-padding] if padding else bit_str
+
+        current = ''
+        for bit in bit_str:
+            current += bit
+            if current in rev_codes:
+                decoded.append(rev_codes[current])
+                current = ''
+
+    @classmethod
+    def _decode_streams(cls, block, pos, lengths) -> bytes:
+        """
+        Декодирует все потоки блока разом: на каждом шаге каждая полоса NumPy
+        читает по одному символу через таблицу 2^max_len -> (символ, длина кода).
+        Меньше STREAMS_VECTOR_MIN потоков декодируются последовательно.
+        """
+        import numpy as np
+
+        streams, count = struct.unpack_from('>BI', block, pos)
+        pos += 5
+        sizes = struct.unpack_from(f'>{streams}I', block, pos)
+        pos += 4 * streams
+        if not count:
+            return b''
+        if streams < cls.STREAMS_VECTOR_MIN:
+            return cls._decode_streams_serial(block, pos, lengths, streams, count, sizes)
 
-            bit_str = ''.join(f'{b:08b}' for b in block[pos:])
-            bit_str = bit_str[:-padding] if padding else bit_str
+        max_len = max(lengths.values())
+        table_sym = np.zeros(1 << max_len, dtype=np.uint8)
+        table_len = np.zeros(1 << max_len, dtype=np.int64)
+        for sym, (code, length) in canonical_codes(lengths).items():
+            span = slice(code << (max_len - length), (code + 1) << (max_len - length))
+            table_sym[span] = sym
+            table_len[span] = length
 
-            current = ''
-            for bit in bit_str:
-                current += bit
-                if current in rev_codes:
-                    decoded.append(rev_codes[current])
-                    current = ''
+        # 4 байта запаса: полоса может заглянуть за конец потока на последнем шаге
+        buf = np.frombuffer(bytes(block[pos:pos + sum(sizes)]) + bytes(4), dtype=np.uint8).astype(np.int64)
+        cursors = np.concatenate(([0], np.cumsum(sizes[:-1]))).astype(np.int64) * 8
+        steps = -(-count // streams)
+        out = np.empty((steps, streams), dtype=np.uint8)
+        shift = 32 - max_len
+        mask = (1 << max_len) - 1
+        for step in range(steps):
+            byte = cursors >> 3
+            word = (buf[byte] << 24) | (buf[byte + 1] << 16) | (buf[byte + 2] << 8) | buf[byte + 3]
+            bits = (word >> (shift - (cursors & 7))) & mask
+            out[step] = table_sym[bits]
+            cursors += table_len[bits]
+        # Строка шага — символы step * streams .. step * streams + streams - 1
+        return out.reshape(-1)[:count].tobytes()
 
-        return bytes(decoded)
\ No newline at end of file
+    @classmethod
+    def _decode_streams_serial(cls, block, pos, lengths, streams, count, sizes) -> bytes:
+        """Потоки по очереди обычным декодером; символы потока lane встают на позиции lane::streams"""
+        rev_codes = {format(code, f'0{length}b'): sym for sym, (code, length) in canonical_codes(lengths).items()}
+        out = bytearray(count)
+        for lane, size in enumerate(sizes):
+            decoded = bytearray()
+            cls._decode_bits(block[pos:pos + size], 0, rev_codes, decoded)
+            pos += size
+            # Биты выравнивания могут дать лишние символы — число символов потока известно
+            out[lane::streams] = decoded[:len(range(lane, count, streams))]
+        return bytes(out)
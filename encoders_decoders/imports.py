@@ -1,8 +1,20 @@
-from .bwt import BWT
-from .huffman import Huffman
-from .lzw import LZW
-from .rle import RLE
-from .lzss import LZSS
-from .mtf import MTF
-
-__all__ = ['BWT', 'Huffman', 'LZW', 'RLE', 'LZSS', 'MTF']
\ No newline at end of file
+from . import __getattr__ as _package_getattr
+
+# Старый путь импорта кодеков: имена берутся через ленивый __getattr__ пакета,
+# поэтому импорт этого модуля не загружает кодеки и NumPy
+_NAMES = ('BWT', 'Huffman', 'LZW', 'RLE', 'LZSS', 'MTF', 'ZRLE', 'LZH', 'Predictor', 'BitPack', 'LDM', 'BlockCache',
+          'DictionaryStore', 'train_dictionary', 'Archive')
+
+__all__ = list(_NAMES)
+
+
+def __getattr__(name):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = _package_getattr(name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
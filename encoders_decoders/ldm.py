@@ -0,0 +1,147 @@
+from .blockProcessor import *
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+"""
+Поиск дальних совпадений (long distance matching) перед LZSS/LZH.
+Окно LZSS ограничено 15-битным смещением, поэтому повторы на расстоянии в мегабайты
+ему не видны. LDM проходит по окну window целиком и заменяет длинные повторы ссылками
+с 32-битным смещением, а остальное отдаёт следующей стадии литералами.
+
+Якоря выбираются по содержимому: хэш GRAM байт, начинающихся в позиции, считается для
+всех позиций сразу средствами NumPy, якорем становится позиция, у которой старшие
+anchor_bits бит хэша нулевые (в среднем одна на 2^anchor_bits байт). Одинаковые участки
+дают одинаковые якоря независимо от выравнивания, поэтому повтор находится поиском
+якоря в таблице, после чего совпадение расширяется в обе стороны.
+
+Блок: [число ссылок 4 байта][ссылки: (литералов перед ссылкой, смещение, длина) по 4 байта]
+      [литералы подряд].
+"""
+
+
+class LDM(BufferCodec):
+    # Весь вход окна — один блок: выборка блоков размера block_size ему не подходит
+    BLOCKWISE = False
+    GRAM = 32
+    SEGMENT = 1 << 20  # хэши считаются кусками, чтобы временные массивы не росли с окном
+    REF = struct.Struct('>III')
+    COUNT = struct.Struct('>I')
+    # Нечётные множители для смешивания четырёх 8-байтовых слов граммы
+    MIXERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93],
+                      dtype=np.uint64)
+
+    def __init__(self, block_size, window=8 << 20, min_match=64, anchor_bits=6):
+        if min_match < self.GRAM:
+            raise ValueError(f"min_match должен быть не меньше {self.GRAM}, получено: {min_match}")
+        self.block_size = block_size
+        # window — объём, внутри которого ищутся повторы; Archive.write подаёт пайплайну порции такого размера
+        self.window = window
+        self.min_match = min_match
+        self.anchor_bits = anchor_bits
+
+    def max_encoded_size(self, size: int) -> int:
+        blocks = BlockProcessor.block_count(size, self.window)
+        return size + blocks * (BlockProcessor.BLOCK_HEADER.size + self.COUNT.size)
+
+    def estimate_size(self, data) -> int:
+        # Поиск почти линейный, а выборка блоков потеряла бы дальние повторы
+        return len(self.encode(data))
+
+    def encode(self, data: bytes) -> bytes:
+        encoded = bytearray()
+        for block in BlockProcessor.split_blocks(data, self.window):
+            if block:
+                encoded.extend(BlockProcessor.add_block_header(self._encode_block(bytes(block))))
+        return bytes(encoded)
+
+    def anchors(self, data: bytes) -> tuple:
+        """Позиции якорей (по возрастанию) и их хэши"""
+        n = len(data) - self.GRAM + 1
+        if n <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+        values = np.frombuffer(data, dtype=np.uint8)
+        shift = np.uint64(64 - self.anchor_bits)
+        positions, hashes = [], []
+        for start in range(0, n, self.SEGMENT):
+            count = min(self.SEGMENT, n - start)
+            # 8-байтовое слово, начинающееся в каждой позиции куска
+            words = np.ascontiguousarray(
+                sliding_window_view(values[start:start + count + self.GRAM - 1], 8)).view('<u8').ravel()
+            h = words[:count] * self.MIXERS[0]
+            for i in range(1, self.GRAM // 8):
+                h ^= words[8 * i:8 * i + count] * self.MIXERS[i]
+            h ^= h >> np.uint64(29)
+            h *= self.MIXERS[0]
+            selected = np.flatnonzero((h >> shift) == 0)
+            positions.append(selected + start)
+            hashes.append(h[selected])
+        return np.concatenate(positions), np.concatenate(hashes)
+
+    def _encode_block(self, block: bytes) -> bytes:
+        positions, hashes = self.anchors(block)
+        n = len(block)
+        table = {}
+        refs = []
+        literals = bytearray()
+        cursor = 0  # всё до cursor уже покрыто литералами или ссылками
+
+        for pos, h in zip(positions.tolist(), hashes.tolist()):
+            candidate = table.get(h)
+            table[h] = pos
+            if pos < cursor or candidate is None or block[candidate:candidate + self.GRAM] != block[pos:pos + self.GRAM]:
+                continue
+
+            length = self.GRAM
+            limit = n - pos
+            while length + 256 <= limit and \
+                    block[candidate + length:candidate + length + 256] == block[pos + length:pos + length + 256]:
+                length += 256
+            while length < limit and block[candidate + length] == block[pos + length]:
+                length += 1
+            # Назад — до конца предыдущей ссылки
+            back = 0
+            while pos - back > cursor and candidate - back > 0 and block[pos - back - 1] == block[candidate - back - 1]:
+                back += 1
+            if length + back < self.min_match:
+                continue
+
+            start = pos - back
+            refs.append((start - cursor, pos - candidate, length + back))
+            literals.extend(block[cursor:start])
+            cursor = start + length + back
+
+        literals.extend(block[cursor:])
+        return self.COUNT.pack(len(refs)) + b''.join(self.REF.pack(*ref) for ref in refs) + literals
+
+    def decode(self, data: bytes) -> bytes:
+        decoded = bytearray()
+        ptr = 0
+        while ptr < len(data):
+            block, ptr = BlockProcessor.read_block(data, ptr)
+            if not block:
+                break
+            decoded.extend(self._decode_block(block))
+        return bytes(decoded)
+
+    def _decode_block(self, block) -> bytearray:
+        count = self.COUNT.unpack_from(block)[0]
+        pos = self.COUNT.size
+        literals = block[pos + count * self.REF.size:]
+        out = bytearray()
+        lit = 0
+        for _ in range(count):
+            lit_len, offset, length = self.REF.unpack_from(block, pos)
+            pos += self.REF.size
+            out.extend(literals[lit:lit + lit_len])
+            lit += lit_len
+            start = len(out) - offset
+            if offset <= 0 or start < 0:
+                raise ValueError(f"Некорректная ссылка LDM: смещение {offset}")
+            if offset >= length:
+                out.extend(out[start:start + length])
+            else:
+                # Перекрывающаяся ссылка повторяет период длины offset
+                period = bytes(out[start:])
+                out.extend((period * (length // offset + 1))[:length])
+        out.extend(literals[lit:])
+        return out
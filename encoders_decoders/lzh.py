@@ -0,0 +1,173 @@
+from .blockProcessor import *
+from .lzss import LZSS
+from .huffman import code_lengths, canonical_codes
+from collections import defaultdict
+
+"""
+LZ77 + Хаффман в стиле Deflate: разбор LZSS, затем два канонических кода —
+общий для литералов и длин совпадений и отдельный для смещений.
+Длины и смещения кодируются корзиной (номер старшего бита) и дополнительными битами.
+
+Блок: [число токенов 4 байта][таблица lit/len][таблица смещений][битовый поток].
+Таблица: битовая маска присутствующих символов, затем длины их кодов по байту.
+Со словарём (dictionary) ссылки могут указывать в последние window_size байт словаря, как в LZSS;
+окно в блоке не хранится, поэтому декодеру нужны тот же словарь и тот же window_size.
+"""
+
+
+class LZH(BufferCodec):
+    LITERALS = 256
+    LENGTH_CODES = 10  # (length - 3) занимает до 9 бит: корзины 0..9
+    LITLEN_SIZE = LITERALS + LENGTH_CODES
+    DIST_SIZE = 15     # смещение до 2^15 - 1: корзины 1..15
+
+    def __init__(self, block_size, window_size=2048, level=None, dictionary=None):
+        self.block_size = block_size
+        self.window_size = window_size
+        self.level = level
+        self._lz = LZSS(block_size, window_size=window_size, level=level, dictionary=dictionary)
+        self._prefix = self._lz.dictionary[-window_size:]
+
+    def max_encoded_size(self, size: int) -> int:
+        """
+        Коды Хаффмана не длиннее равномерных: литерал — до 9 бит, совпадение
+        от 3 байт — до 9 + 8 + 4 + 14 бит, то есть не больше 12 бит на байт входа.
+        """
+        blocks = BlockProcessor.block_count(size, self.block_size)
+        tables = (self.LITLEN_SIZE + 7) // 8 + self.LITLEN_SIZE + (self.DIST_SIZE + 7) // 8 + self.DIST_SIZE
+        return blocks * (BlockProcessor.BLOCK_HEADER.size + 4 + tables + 1) + (size * 12 + 7) // 8
+
+    def encode(self, data: bytes) -> bytes:
+        bp = BlockProcessor()
+        encoded = bytearray()
+
+        for block in bp.split_blocks(data, self.block_size):
+            tokens = self._lz.parse(block)
+
+            # Один проход по токенам: символы алфавитов, дополнительные биты и частоты
+            litlen_freq = defaultdict(int)
+            dist_freq = defaultdict(int)
+            symbols = []
+            for token in tokens:
+                if isinstance(token, tuple):
+                    offset, length = token
+                    len_sym, len_extra, len_bits = self._bucket(length - LZSS.MIN_MATCH)
+                    dist_sym, dist_extra, dist_bits = self._bucket(offset)
+                    len_sym += self.LITERALS
+                    dist_sym -= 1
+                    litlen_freq[len_sym] += 1
+                    dist_freq[dist_sym] += 1
+                    symbols.append((len_sym, len_extra, len_bits, dist_sym, dist_extra, dist_bits))
+                else:
+                    litlen_freq[token] += 1
+                    symbols.append((token,))
+
+            litlen_lengths = code_lengths(litlen_freq) if litlen_freq else {}
+            dist_lengths = code_lengths(dist_freq) if dist_freq else {}
+            litlen_codes = {sym: format(code, f'0{n}b') for sym, (code, n) in canonical_codes(litlen_lengths).items()}
+            dist_codes = {sym: format(code, f'0{n}b') for sym, (code, n) in canonical_codes(dist_lengths).items()}
+
+            parts = []
+            for item in symbols:
+                parts.append(litlen_codes[item[0]])
+                if len(item) > 1:
+                    _, len_extra, len_bits, dist_sym, dist_extra, dist_bits = item
+                    if len_bits:
+                        parts.append(format(len_extra, f'0{len_bits}b'))
+                    parts.append(dist_codes[dist_sym])
+                    if dist_bits:
+                        parts.append(format(dist_extra, f'0{dist_bits}b'))
+            bit_str = ''.join(parts)
+            bit_str += '0' * (-len(bit_str) % 8)
+
+            block_enc = bytearray(struct.pack('>I', len(tokens)))
+            block_enc.extend(self._write_table(litlen_lengths, self.LITLEN_SIZE))
+            block_enc.extend(self._write_table(dist_lengths, self.DIST_SIZE))
+            if bit_str:
+                block_enc.extend(int(bit_str, 2).to_bytes(len(bit_str) // 8, 'big'))
+            encoded.extend(bp.add_block_header(block_enc))
+
+        return bytes(encoded)
+
+    def decode(self, data: bytes) -> bytes:
+        bp = BlockProcessor()
+        decoded = bytearray()
+        ptr = 0
+
+        while ptr < len(data):
+            block, ptr = bp.read_block(data, ptr)
+            if not block:
+                break
+
+            token_count = struct.unpack('>I', block[:4])[0]
+            litlen_table, pos = self._read_table(block, 4, self.LITLEN_SIZE)
+            dist_table, pos = self._read_table(block, pos, self.DIST_SIZE)
+            payload = block[pos:]
+            bits = format(int.from_bytes(payload, 'big'), f'0{len(payload) * 8}b') if payload else ''
+
+            buf = bytearray(self._prefix)
+            i = 0
+            for _ in range(token_count):
+                sym, i = self._read_symbol(bits, i, litlen_table)
+                if sym < self.LITERALS:
+                    buf.append(sym)
+                    continue
+
+                length, i = self._read_extra(bits, i, sym - self.LITERALS)
+                dist_sym, i = self._read_symbol(bits, i, dist_table)
+                offset, i = self._read_extra(bits, i, dist_sym + 1)
+                length += LZSS.MIN_MATCH
+
+                start = len(buf) - offset
+                for j in range(length):
+                    buf.append(buf[start + j])
+            decoded.extend(buf[len(self._prefix):])
+
+        return bytes(decoded)
+
+    @staticmethod
+    def _bucket(value: int) -> tuple:
+        """value -> (номер корзины, дополнительные биты, их количество)"""
+        bucket = value.bit_length()
+        if bucket <= 1:
+            return bucket, 0, 0
+        return bucket, value - (1 << (bucket - 1)), bucket - 1
+
+    @staticmethod
+    def _read_extra(bits: str, i: int, bucket: int) -> tuple:
+        if bucket <= 1:
+            return bucket, i
+        n = bucket - 1
+        return (1 << n) + int(bits[i:i + n], 2), i + n
+
+    @staticmethod
+    def _read_symbol(bits: str, i: int, table: dict) -> tuple:
+        code = 0
+        length = 0
+        while True:
+            code = (code << 1) | (bits[i] == '1')
+            i += 1
+            length += 1
+            sym = table.get((length, code))
+            if sym is not None:
+                return sym, i
+
+    @staticmethod
+    def _write_table(lengths: dict, size: int) -> bytes:
+        mask = bytearray((size + 7) // 8)
+        for sym in lengths:
+            mask[sym >> 3] |= 0x80 >> (sym & 7)
+        return bytes(mask) + bytes(lengths[sym] for sym in sorted(lengths))
+
+    @staticmethod
+    def _read_table(block: bytes, pos: int, size: int) -> tuple:
+        mask_len = (size + 7) // 8
+        mask = block[pos:pos + mask_len]
+        pos += mask_len
+        lengths = {}
+        for sym in range(size):
+            if mask[sym >> 3] & (0x80 >> (sym & 7)):
+                lengths[sym] = block[pos]
+                pos += 1
+        table = {(n, code): sym for sym, (code, n) in canonical_codes(lengths).items()}
+        return table, pos
@@ -1,5 +1,6 @@
 from .blockProcessor import *
 import struct
+from itertools import chain
 
 """
 Update:
@@ -7,12 +8,66 @@ Update:
     2) флаг исправлен, теперь вместо дополнительного флага в виде байта используется битовый флаг
     3) find и вложенный цикл заменен на словарь, который хранит список позиций, где уже была эта последовательность
     4) Ограничение совпадения до 511 бит (9 байт)
+    5) Уровни сжатия (level 1..9): глубина поиска по цепочке позиций и стратегия разбора
+       (жадный, ленивый на один шаг, оптимальный по стоимости в битах). Формат токенов не меняется
+    6) Словарь (dictionary): последние window_size байт словаря считаются уже «выданными» перед
+       каждым блоком, ссылки могут указывать в них. Декодер должен получить тот же словарь
 """
 
-class LZSS:
-    def __init__(self, block_size, window_size=2048):
+class LZSS(BufferCodec):
+    GREEDY = 'greedy'
+    LAZY = 'lazy'
+    OPTIMAL = 'optimal'
+
+    # level: (глубина поиска по цепочке, достаточная длина совпадения, стратегия разбора)
+    # None в глубине — без ограничения; найдя совпадение не короче достаточной длины, поиск прекращается
+    LEVELS = {
+        1: (4, 16, GREEDY),
+        2: (8, 32, GREEDY),
+        3: (16, 64, GREEDY),
+        4: (16, 64, LAZY),
+        5: (64, 128, LAZY),
+        6: (None, 258, LAZY),
+        7: (64, 128, OPTIMAL),
+        8: (256, 258, OPTIMAL),
+        9: (None, 511, OPTIMAL),
+    }
+
+    MIN_MATCH = 3
+    MAX_MATCH = 511
+    # Стоимость токенов в битах с учётом бита флага
+    LITERAL_COST = 9
+    MATCH_COST = 25
+
+    def __init__(self, block_size, window_size=2048, level=None, dictionary=None):
         self.window_size = window_size
         self.block_size = block_size
+        self.level = level
+        self.dictionary = bytes(dictionary or b'')
+        # Позиции пар байт словаря строятся один раз и только читаются при разборе блоков
+        self._prefix = self.dictionary[-window_size:]
+        self._primed = {}
+        for pos in range(len(self._prefix)):
+            self._insert(self._prefix, pos, self._primed)
+        if level is None:
+            # Поведение по умолчанию: жадный разбор с полным перебором цепочки
+            self.max_chain, self.nice_length, self.strategy = None, self.MAX_MATCH, self.GREEDY
+        elif level in self.LEVELS:
+            self.max_chain, self.nice_length, self.strategy = self.LEVELS[level]
+        else:
+            raise ValueError(f"Неизвестный уровень сжатия LZSS: {level}")
+
+    def max_encoded_size(self, size: int) -> int:
+        # Худший случай — одни литералы: байт флагов на каждые 8 токенов
+        blocks = BlockProcessor.block_count(size, self.block_size)
+        return blocks * (BlockProcessor.BLOCK_HEADER.size + 4 + 1) + size + size // 8
+
+    def _estimate_block(self, block) -> int:
+        """Точный размер блока по разбору, без упаковки токенов"""
+        tokens = self.parse(block)
+        matches = sum(isinstance(token, tuple) for token in tokens)
+        return (BlockProcessor.BLOCK_HEADER.size + 4 + (len(tokens) + 7) // 8
+                + len(tokens) - matches + 3 * matches)
 
     def encode(self, data: bytes) -> bytes:
         bp = BlockProcessor()
@@ -20,61 +75,182 @@ class LZSS:
 
         for block in bp.split_blocks(data, self.block_size):
             block_enc = bytearray(struct.pack('>I', self.window_size))
-            i = 0
-            pos_dict = {}
-            while i < len(block):
-                flag = 0
-                tokens = bytearray()
-                token_count = 0
-                while token_count < 8 and i < len(block):
-                    window_start = max(0, i - self.window_size)
-                    best_length = 0
-                    best_offset = 0
-
-                    if i < len(block) - 1:
-                        key = block[i:i + 2]
-                        if key in pos_dict:
-                            for candidate in pos_dict[key]:
-                                if candidate < window_start:
-                                    continue
-                                length = 0
-                                while (i + length < len(block) and
-                                       candidate + length < len(block) and
-                                       block[candidate + length] == block[i + length]):
-                                    length += 1
-                                    if length >= min(511, len(block) - i):
-                                        break
-                                if length > best_length:
-                                    best_length = length
-                                    best_offset = i - candidate
-                                    if best_length == min(511, len(block) - i):
-                                        break
-
-                    if best_length >= 3:
-                        ref = (best_offset << 9) | best_length
-                        tokens.extend(ref.to_bytes(3, 'big'))
-                        flag |= (1 << token_count)
-                        # Обновляем словарь для всех позиций, покрытых ссылкой
-                        for j in range(best_length):
-                            if i + j < len(block) - 1:
-                                key = block[i + j:i + j + 2]
-                                pos_dict.setdefault(key, []).append(i + j)
-                        i += best_length
-                    else:
-                        # Литерал – записываем один байт
-                        tokens.append(block[i])
-                        if i < len(block) - 1:
-                            key = block[i:i + 2]
-                            pos_dict.setdefault(key, []).append(i)
-                        i += 1
-
-                    token_count += 1
-
-                block_enc.append(flag)
-                block_enc.extend(tokens)
+            block_enc.extend(self._pack_tokens(self.parse(block)))
             encoded.extend(bp.add_block_header(block_enc))
         return bytes(encoded)
 
+    def parse(self, block) -> list:
+        """Разбор блока на токены: байт-литерал (int) или ссылка (offset, length)"""
+        pos_dict = {}
+        start = len(self._prefix)
+        # Ключи индекса — срезы блока: у bytes они хэшируются и сравниваются быстрее, чем у memoryview
+        block = self._prefix + bytes(block)
+        if start:
+            # Блок разбирается как продолжение словаря; пара на стыке в готовый индекс не входит
+            self._insert(block, start - 1, pos_dict)
+        if self.strategy == self.OPTIMAL:
+            return self._parse_optimal(block, start, pos_dict)
+        if self.strategy == self.LAZY:
+            return self._parse_lazy(block, start, pos_dict)
+        return self._parse_greedy(block, start, pos_dict)
+
+    @staticmethod
+    def _insert(block, pos, pos_dict):
+        if pos < len(block) - 1:
+            pos_dict.setdefault(block[pos:pos + 2], []).append(pos)
+
+    def _longest_match(self, block, i, pos_dict):
+        limit = min(self.MAX_MATCH, len(block) - i)
+        if limit < 2:
+            return 0, 0
+
+        key = block[i:i + 2]
+        candidates = pos_dict.get(key, ())
+        primed = self._primed.get(key)
+        if primed:
+            # Позиции словаря меньше позиций блока: просматриваются после них
+            candidates = chain(reversed(candidates), reversed(primed))
+        elif candidates:
+            candidates = reversed(candidates)
+        else:
+            return 0, 0
+
+        window_start = i - self.window_size
+        best_length = 0
+        best_offset = 0
+        checked = 0
+        # Идём от ближайших позиций к дальним: списки отсортированы по возрастанию
+        for candidate in candidates:
+            if candidate < window_start:
+                break
+            if self.max_chain is not None and checked >= self.max_chain:
+                break
+            checked += 1
+
+            # Первые два байта совпадают по ключу словаря; дальше сравниваем срезами по 32 байта
+            length = 2
+            while (length + 32 <= limit and
+                   block[candidate + length:candidate + length + 32] == block[i + length:i + length + 32]):
+                length += 32
+            while length < limit and block[candidate + length] == block[i + length]:
+                length += 1
+            if length > best_length:
+                best_length = length
+                best_offset = i - candidate
+                if best_length >= min(limit, self.nice_length):
+                    break
+        return best_length, best_offset
+
+    def _parse_greedy(self, block, start, pos_dict) -> list:
+        tokens = []
+        i = start
+        while i < len(block):
+            length, offset = self._longest_match(block, i, pos_dict)
+            if length >= self.MIN_MATCH:
+                tokens.append((offset, length))
+                # Обновляем словарь для всех позиций, покрытых ссылкой
+                for j in range(length):
+                    self._insert(block, i + j, pos_dict)
+                i += length
+            else:
+                tokens.append(block[i])
+                self._insert(block, i, pos_dict)
+                i += 1
+        return tokens
+
+    def _parse_lazy(self, block, start, pos_dict) -> list:
+        tokens = []
+        pending = None
+        i = start
+        while i < len(block):
+            if pending is not None:
+                length, offset = pending
+                pending = None
+            else:
+                length, offset = self._longest_match(block, i, pos_dict)
+            self._insert(block, i, pos_dict)
+
+            if length < self.MIN_MATCH:
+                tokens.append(block[i])
+                i += 1
+                continue
+
+            # Если со следующей позиции совпадение длиннее — выгоднее отдать текущий байт литералом
+            if length < self.nice_length and i + 1 < len(block):
+                following = self._longest_match(block, i + 1, pos_dict)
+                if following[0] > length:
+                    tokens.append(block[i])
+                    pending = following
+                    i += 1
+                    continue
+
+            tokens.append((offset, length))
+            for j in range(1, length):
+                self._insert(block, i + j, pos_dict)
+            i += length
+        return tokens
+
+    def _parse_optimal(self, block, start, pos_dict) -> list:
+        n = len(block)
+        # price[j] — минимальная стоимость (в битах) кодирования префикса длины j
+        price = [float('inf')] * (n + 1)
+        price[start] = 0
+        # back[j] — (начало последнего токена, смещение, длина); длина 1 — литерал
+        back = [None] * (n + 1)
+
+        i = start
+        while i < n:
+            length, offset = self._longest_match(block, i, pos_dict)
+            self._insert(block, i, pos_dict)
+
+            if length >= self.nice_length:
+                # Длинное совпадение принимаем сразу, промежуточные позиции не рассматриваем
+                if price[i] + self.MATCH_COST < price[i + length]:
+                    price[i + length] = price[i] + self.MATCH_COST
+                    back[i + length] = (i, offset, length)
+                for j in range(1, length):
+                    self._insert(block, i + j, pos_dict)
+                i += length
+                continue
+
+            if price[i] + self.LITERAL_COST < price[i + 1]:
+                price[i + 1] = price[i] + self.LITERAL_COST
+                back[i + 1] = (i, 0, 1)
+            # Любой префикс найденного совпадения — тоже допустимая ссылка
+            match_price = price[i] + self.MATCH_COST
+            for l in range(self.MIN_MATCH, length + 1):
+                if match_price < price[i + l]:
+                    price[i + l] = match_price
+                    back[i + l] = (i, offset, l)
+            i += 1
+
+        tokens = []
+        j = n
+        while j > start:
+            prev, offset, length = back[j]
+            tokens.append(block[prev] if length == 1 else (offset, length))
+            j = prev
+        tokens.reverse()
+        return tokens
+
+    @staticmethod
+    def _pack_tokens(tokens) -> bytearray:
+        packed = bytearray()
+        for g in range(0, len(tokens), 8):
+            flag = 0
+            body = bytearray()
+            for bit, token in enumerate(tokens[g:g + 8]):
+                if isinstance(token, tuple):
+                    offset, length = token
+                    body.extend(((offset << 9) | length).to_bytes(3, 'big'))
+                    flag |= (1 << bit)
+                else:
+                    # Литерал – записываем один байт
+                    body.append(token)
+            packed.append(flag)
+            packed.extend(body)
+        return packed
+
     def decode(self, data: bytes) -> bytes:
         bp = BlockProcessor()
         decoded = bytearray()
@@ -85,9 +261,11 @@ class LZSS:
             if not block_enc:
                 break
 
-            _ = struct.unpack('>I', block_enc[:4])[0]
+            window_size = struct.unpack('>I', block_enc[:4])[0]
             i = 4
-            buf = bytearray()
+            # Окно кодировщика хранится в блоке: по нему берётся та же часть словаря
+            prefix = self.dictionary[-window_size:] if self.dictionary else b''
+            buf = bytearray(prefix)
 
             while i < len(block_enc):
                 flag = block_enc[i]
@@ -112,5 +290,5 @@ class LZSS:
                     else:
                         buf.append(block_enc[i])
                         i += 1
-            decoded.extend(buf)
+            decoded.extend(buf[len(prefix):])
         return bytes(decoded)
\ No newline at end of file
@@ -1,84 +1,225 @@
 from .blockProcessor import *
 
-
-class LZW:
-    def __init__(self, block_size):
+"""
+LZW с кодами переменной ширины: от 9 бит до max_bits, как в Unix compress.
+Ширина растёт вместе со словарём и на обеих сторонах вычисляется одинаково,
+поэтому в потоке не хранится. Код 256 (CLEAR) сбрасывает словарь.
+
+Когда словарь заполнен, поведение задаёт policy:
+  'freeze'   — словарь замораживается до конца блока;
+  'reset'    — сразу выдаётся CLEAR и словарь строится заново (по умолчанию:
+               на test.exe и color_image.raw из образцов заметно лучше 'adaptive');
+  'adaptive' — словарь заморожен, пока степень сжатия с последнего сброса
+               не начнёт падать (проверка каждые CHECK_GAP входных байт), затем CLEAR.
+               Выигрывает у 'reset' на однородных данных, где заполненный словарь
+               остаётся полезным: real_text.txt и gray_image.raw из образцов.
+
+Со словарём (dictionary) таблица в начале блока и после каждого CLEAR не пустая:
+в ней записи, которые кодировщик построил бы, пройдя по словарю (не больше половины
+кодов, чтобы осталось место для записей самого блока). Декодер строит те же записи.
+
+Блок: [max_bits 1 байт][число кодов 4 байта][коды, упакованные старшими битами вперёд].
+"""
+
+
+class LZW(BufferCodec):
+    CLEAR = 256
+    FIRST = 257
+    MIN_BITS = 9
+    MAX_BITS = 24
+    CHECK_GAP = 10000
+
+    FREEZE = 'freeze'
+    RESET = 'reset'
+    ADAPTIVE = 'adaptive'
+    POLICIES = (FREEZE, RESET, ADAPTIVE)
+
+    HEADER = struct.Struct('>BI')
+
+    def __init__(self, block_size, max_bits=16, policy=RESET, dictionary=None):
+        if not self.MIN_BITS <= max_bits <= self.MAX_BITS:
+            raise ValueError(f"max_bits должен быть от {self.MIN_BITS} до {self.MAX_BITS}, получено: {max_bits}")
+        if policy not in self.POLICIES:
+            raise ValueError(f"Неизвестная политика словаря LZW: {policy}")
         self.block_size = block_size
-        self.reset_dict()
-
-    def reset_dict(self):
-        self.dict_size = 256
-        self.dictionary = {bytes([i]): i for i in range(256)}
-        self.rev_dict = {i: bytes([i]) for i in range(256)}
+        self.max_bits = max_bits
+        self.policy = policy
+        self.dictionary = bytes(dictionary or b'')
+        # max_bits -> (таблица кодировщика, записи декодера); у декодера max_bits берётся из блока
+        self._primed = {}
+
+    def _prime(self, max_bits: int) -> tuple:
+        """Начальное состояние словаря: проход кодировщика по словарю без вывода кодов"""
+        if max_bits not in self._primed:
+            capacity = 1 << (max_bits - 1)
+            table = {}
+            entries = [bytes([i]) for i in range(256)] + [b'']
+            w = None
+            for c in self.dictionary:
+                if w is None:
+                    w = c
+                    continue
+                code = table.get((w, c))
+                if code is not None:
+                    w = code
+                    continue
+                if len(entries) >= capacity:
+                    break
+                table[(w, c)] = len(entries)
+                entries.append(entries[w] + bytes([c]))
+                w = c
+            self._primed[max_bits] = table, entries
+        return self._primed[max_bits]
+
+    @classmethod
+    def _width(cls, next_code: int) -> int:
+        """Ширина кода, когда следующий свободный код кодировщика — next_code"""
+        return max(cls.MIN_BITS, (next_code - 1).bit_length())
+
+    def max_encoded_size(self, size: int) -> int:
+        # Код съедает хотя бы байт входа; CLEAR — не чаще раза на 255 кодов (reset) или CHECK_GAP байт
+        blocks = BlockProcessor.block_count(size, self.block_size)
+        codes = size + size // 255 + blocks
+        return blocks * (BlockProcessor.BLOCK_HEADER.size + self.HEADER.size + 1) + (codes * self.max_bits + 7) // 8
 
     def encode(self, data: bytes) -> bytes:
-        bp = BlockProcessor()
-
-        encoded = bytearray()
-        for block in bp.split_blocks(data, self.block_size):
-            self.reset_dict()
-            w = b''
-            block_enc = bytearray()
-
-            for c in block:
-                wc = w + bytes([c])
-                if wc in self.dictionary:
-                    w = wc
-                else:
-                    block_enc.extend(struct.pack('>H', self.dictionary[w]))
-                    self.dictionary[wc] = self.dict_size
-                    self.dict_size += 1
-                    w = bytes([c])
+        encoded = bytearray(self.max_encoded_size(len(data)))
+        del encoded[self.encode_into(data, encoded):]
+        return bytes(encoded)
 
-            if w:
-                block_enc.extend(struct.pack('>H', self.dictionary[w]))
+    def encode_into(self, src, dst) -> int:
+        ensure_capacity(dst, self.max_encoded_size(len(src)))
+        pos = 0
+        for block in BlockProcessor.split_blocks(src, self.block_size):
+            if not block:
+                continue
+            start = pos
+            pos = self._encode_block(block, dst, BlockProcessor.reserve_header(pos))
+            BlockProcessor.close_block(dst, start, pos)
+        return pos
+
+    def _encode_block(self, block, dst, pos: int) -> int:
+        """Кодирует блок в dst с позиции pos, возвращает позицию за концом"""
+        limit = 1 << self.max_bits
+        header_pos = pos
+        pos += self.HEADER.size
+        acc = nbits = count = 0
+
+        def emit(code, next_code):
+            nonlocal acc, nbits, count, pos
+            width = self._width(next_code)
+            acc = (acc << width) | code
+            nbits += width
+            count += 1
+            while nbits >= 8:
+                nbits -= 8
+                dst[pos] = (acc >> nbits) & 0xFF
+                pos += 1
+            acc &= (1 << nbits) - 1
+            return width
+
+        # Словарь: (код префикса, следующий байт) -> код
+        primed_table, primed_entries = self._prime(self.max_bits)
+        table = primed_table.copy()
+        next_code = len(primed_entries)
+        # Для политики adaptive: байты входа и биты выхода с последнего сброса
+        in_count = out_bits = 0
+        checkpoint = self.CHECK_GAP
+        best_ratio = 0.0
+
+        w = None
+        for c in block:
+            in_count += 1
+            if w is None:
+                w = c
+                continue
+            code = table.get((w, c))
+            if code is not None:
+                w = code
+                continue
 
-            encoded.extend(bp.add_block_header(block_enc))
-
-        return bytes(encoded)
+            out_bits += emit(w, next_code)
+            clear = False
+            if next_code < limit:
+                table[(w, c)] = next_code
+                next_code += 1
+                clear = next_code == limit and self.policy == self.RESET
+            elif self.policy == self.ADAPTIVE and in_count >= checkpoint:
+                checkpoint = in_count + self.CHECK_GAP
+                ratio = in_count / out_bits
+                clear = ratio < best_ratio
+                best_ratio = max(best_ratio, ratio)
+
+            if clear:
+                emit(self.CLEAR, next_code)
+                table = primed_table.copy()
+                next_code = len(primed_entries)
+                in_count = 1
+                out_bits = 0
+                checkpoint = self.CHECK_GAP
+                best_ratio = 0.0
+            w = c
+
+        if w is not None:
+            emit(w, next_code)
+        if nbits:
+            dst[pos] = (acc << (8 - nbits)) & 0xFF
+            pos += 1
+        self.HEADER.pack_into(dst, header_pos, self.max_bits, count)
+        return pos
 
     def decode(self, data: bytes) -> bytes:
-        bp = BlockProcessor()
-
         decoded = bytearray()
-        ptr = 0
+        self.decode_into(data, decoded)
+        return bytes(decoded)
 
-        while ptr < len(data):
-            block_enc, ptr = bp.read_block(data, ptr)
-            if not block_enc:
+    def decode_into(self, src, dst) -> int:
+        """Размер результата заранее неизвестен: bytearray дорастает по ходу записи"""
+        pos = 0
+        ptr = 0
+        while ptr < len(src):
+            block, ptr = BlockProcessor.read_block(src, ptr)
+            if not block:
                 break
-
-            self.reset_dict()
-            idx = 0
-
-            if len(block_enc) < 2:
-                continue  # Пропустить неполные данные
-
-            # Обработка первого кода
-            code = struct.unpack('>H', block_enc[idx:idx+2])[0]
-            idx += 2
-            if code not in self.rev_dict:
+            pos = self._decode_block(block, dst, pos)
+        return pos
+
+    def _decode_block(self, block, dst, pos: int) -> int:
+        max_bits, count = self.HEADER.unpack_from(block)
+        limit = 1 << max_bits
+        # Индекс 256 занят кодом CLEAR; длина списка — следующий свободный код декодера
+        primed = self._prime(max_bits)[1]
+        entries = list(primed)
+        acc = nbits = 0
+        ptr = self.HEADER.size
+        prev = None
+
+        for _ in range(count):
+            # Декодер добавляет запись на шаг позже кодировщика
+            width = self._width(min(len(entries) + (prev is not None), limit))
+            while nbits < width:
+                acc = (acc << 8) | block[ptr]
+                ptr += 1
+                nbits += 8
+            nbits -= width
+            code = acc >> nbits
+            acc &= (1 << nbits) - 1
+
+            if code == self.CLEAR:
+                del entries[len(primed):]
+                prev = None
                 continue
-            prev = self.rev_dict[code]
-            decoded.extend(prev)
-
-            # Обработка оставшихся кодов
-            while idx < len(block_enc):
-                if idx + 2 > len(block_enc):
-                    break
-                code = struct.unpack('>H', block_enc[idx:idx+2])[0]
-                idx += 2
-
-                if code in self.rev_dict:
-                    entry = self.rev_dict[code]
-                elif code == self.dict_size:
-                    entry = prev + prev[0:1]
-                else:
-                    break  # Некорректный код
-
-                decoded.extend(entry)
-                self.rev_dict[self.dict_size] = prev + entry[0:1]
-                self.dict_size += 1
-                prev = entry
-
-        return bytes(decoded)
\ No newline at end of file
+            if code < len(entries):
+                entry = entries[code]
+            elif code == len(entries) and prev is not None:
+                entry = prev + prev[:1]
+            else:
+                raise ValueError(f"Некорректный код LZW: {code}")
+
+            dst[pos:pos + len(entry)] = entry
+            pos += len(entry)
+            if prev is not None and len(entries) < limit:
+                entries.append(prev + entry[:1])
+            prev = entry
+
+        return pos
@@ -1,45 +1,67 @@
 from .blockProcessor import *
 
 
-class MTF:
+class MTF(BufferCodec):
     def __init__(self, block_size):
         self.block_size = block_size
 
+    def max_encoded_size(self, size: int) -> int:
+        return size + BlockProcessor.BLOCK_HEADER.size * BlockProcessor.block_count(size, self.block_size)
+
+    def estimate_size(self, data) -> int:
+        # Ранг на каждый байт: размер известен без преобразования
+        return self.max_encoded_size(len(data))
+
     def encode(self, data: bytes) -> bytes:
-        bp = BlockProcessor()
+        encoded = bytearray(self.max_encoded_size(len(data)))
+        del encoded[self.encode_into(data, encoded):]
+        return bytes(encoded)
 
-        encoded = bytearray()
+    def encode_into(self, src, dst) -> int:
+        ensure_capacity(dst, self.max_encoded_size(len(src)))
+        pos = 0
         symbols = list(range(256))
-        for block in bp.split_blocks(data, self.block_size):
-            block_enc = bytearray()
+
+        for block in BlockProcessor.split_blocks(src, self.block_size):
+            if not block:
+                continue
+            start, pos = pos, BlockProcessor.reserve_header(pos)
             local_symbols = symbols.copy()
 
             for b in block:
                 idx = local_symbols.index(b)
-                block_enc.append(idx)
+                dst[pos] = idx
+                pos += 1
                 del local_symbols[idx]
                 local_symbols.insert(0, b)
 
-            encoded.extend(bp.add_block_header(block_enc))
+            BlockProcessor.close_block(dst, start, pos)
 
-        return bytes(encoded)
+        return pos
 
     def decode(self, data: bytes) -> bytes:
-        bp = BlockProcessor()
-
         decoded = bytearray()
-        ptr = 0
+        self.decode_into(data, decoded)
+        return bytes(decoded)
 
-        while ptr < len(data):
-            block_enc, ptr = bp.read_block(data, ptr)
+    def decode_into(self, src, dst) -> int:
+        blocks = []
+        ptr = 0
+        while ptr < len(src):
+            block_enc, ptr = BlockProcessor.read_block(src, ptr)
             if not block_enc:
                 break
+            blocks.append(block_enc)
 
+        ensure_capacity(dst, sum(len(block_enc) for block_enc in blocks))
+        pos = 0
+        for block_enc in blocks:
             symbols = list(range(256))
             for idx in block_enc:
                 b = symbols[idx]
-                decoded.append(b)
+                dst[pos] = b
+                pos += 1
                 del symbols[idx]
                 symbols.insert(0, b)
 
-        return bytes(decoded)
\ No newline at end of file
+        return pos
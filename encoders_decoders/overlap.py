@@ -0,0 +1,72 @@
+import queue
+import threading
+
+_DONE = object()
+
+
+def run_overlapped(source, task, sink, workers: int = 2, queue_size: int = 8, processes: bool = False):
+    """
+    Конвейер «чтение -> вычисление -> запись» с перекрытием ввода-вывода и счёта.
+
+    source — итератор заданий, обходится в отдельном потоке чтения;
+    task(item) выполняется в пуле (потоков или, при processes=True, процессов,
+    тогда task и item должны сериализоваться pickle);
+    sink(result) вызывается в потоке записи строго в порядке source.
+    Очереди ограничены queue_size, поэтому в памяти одновременно находится
+    ограниченное число заданий. Первая ошибка любой стадии пробрасывается наружу.
+    """
+    read_q = queue.Queue(queue_size)
+    write_q = queue.Queue(queue_size)
+    errors = []
+    stop = threading.Event()
+
+    def reader():
+        try:
+            for item in source:
+                if stop.is_set():
+                    break
+                read_q.put(item)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            read_q.put(_DONE)
+
+    def writer():
+        # Будущие результаты стоят в очереди в порядке заданий — ожидание по очереди и есть переупорядочивание
+        while (future := write_q.get()) is not _DONE:
+            if errors:
+                continue
+            try:
+                sink(future.result())
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+
+    threads = [threading.Thread(target=reader, daemon=True), threading.Thread(target=writer, daemon=True)]
+    for t in threads:
+        t.start()
+
+    # concurrent.futures тянет за собой multiprocessing: импорт только при реальном запуске пула
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+    pool_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    try:
+        with pool_cls(max_workers=workers) as pool:
+            while (item := read_q.get()) is not _DONE:
+                if errors:
+                    stop.set()
+                    continue
+                write_q.put(pool.submit(task, item))
+    finally:
+        stop.set()
+        write_q.put(_DONE)
+        # При ошибке здесь поток чтения может ждать места в полной read_q: разбираем её до его выхода
+        while threads[0].is_alive():
+            try:
+                read_q.get_nowait()
+            except queue.Empty:
+                threads[0].join(0.01)
+        for t in threads:
+            t.join()
+
+    if errors:
+        raise errors[0]
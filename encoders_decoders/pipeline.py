@@ -0,0 +1,305 @@
+import json
+import importlib
+from typing import Dict, List, Optional, Tuple
+
+from .cache import BlockCache
+from .blockProcessor import write_into, sample_blocks
+
+
+class CompressionAlgorithm:
+    """Базовый класс для алгоритмов сжатия"""
+
+    def __init__(self, block_size: int = 2048):
+        self.block_size = block_size
+
+    def encode(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+    def decode(self, data: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class CompressionPipeline:
+    """Класс для управления пайплайном сжатия"""
+    COMPRESSORS: Dict[str, Tuple[str, ...]] = {
+        "HA": ('Huffman',),
+        "RLE": ('RLE',),
+        "BWT+RLE": ('BWT', 'RLE'),
+        "BWT+MTF+HA": ('BWT', 'MTF', 'Huffman'),
+        "BWT+MTF+RLE+HA": ('BWT', 'MTF', 'RLE', 'Huffman'),
+        "BWT+MTF+ZRLE+HA": ('BWT', 'MTF', 'ZRLE', 'Huffman'),
+        "LZSS": ('LZSS',),
+        "LZSS+HA": ('LZSS', 'Huffman'),
+        "LZH": ('LZH',),
+        "PRED+HA": ('Predictor', 'Huffman'),
+        "PRED+LZH": ('Predictor', 'LZH'),
+        "PACK+BWT+MTF+RLE+HA": ('BitPack', 'BWT', 'MTF', 'RLE', 'Huffman'),
+        "PACK+LZH": ('BitPack', 'LZH'),
+        "LZW": ('LZW',),
+        "LZW+HA": ('LZW', 'Huffman'),
+        "LDM+LZSS+HA": ('LDM', 'LZSS', 'Huffman'),
+        "LDM+LZH": ('LDM', 'LZH')
+    }
+
+    # Уровни 1 (быстрее) .. 9 (сильнее): размер блока пайплайна и параметры стадий по имени класса
+    LEVEL_PRESETS: Dict[int, Dict] = {
+        1: {'block_size': 1024, 'stages': {
+            'BWT': {'block_size': 256},
+            'LZSS': {'window_size': 512, 'level': 1},
+            'LZH': {'window_size': 512, 'level': 1},
+            'LZW': {'max_bits': 12},
+            'Huffman': {'table': 'freq'}}},
+        2: {'block_size': 2048, 'stages': {
+            'BWT': {'block_size': 512},
+            'LZSS': {'window_size': 1024, 'level': 2},
+            'LZH': {'window_size': 1024, 'level': 2},
+            'LZW': {'max_bits': 12},
+            'Huffman': {'table': 'freq'}}},
+        3: {'block_size': 2048, 'stages': {
+            'BWT': {'block_size': 1024},
+            'LZSS': {'window_size': 2048, 'level': 3},
+            'LZH': {'window_size': 2048, 'level': 3},
+            'LZW': {'max_bits': 12},
+            'Huffman': {'table': 'freq'}}},
+        4: {'block_size': 4096, 'stages': {
+            'BWT': {'block_size': 1024},
+            'LZSS': {'window_size': 2048, 'level': 4},
+            'LZH': {'window_size': 2048, 'level': 4},
+            'LZW': {'max_bits': 14},
+            'Huffman': {'table': 'canonical'}}},
+        5: {'block_size': 4096, 'stages': {
+            'BWT': {'block_size': 2048},
+            'LZSS': {'window_size': 4096, 'level': 5},
+            'LZH': {'window_size': 4096, 'level': 5},
+            'LZW': {'max_bits': 14},
+            'Huffman': {'table': 'canonical'}}},
+        6: {'block_size': 8192, 'stages': {
+            'BWT': {'block_size': 2048},
+            'LZSS': {'window_size': 4096, 'level': 6},
+            'LZH': {'window_size': 4096, 'level': 6},
+            'LZW': {'max_bits': 14},
+            'Huffman': {'table': 'canonical'}}},
+        7: {'block_size': 16384, 'stages': {
+            'BWT': {'block_size': 4096},
+            'LZSS': {'window_size': 8192, 'level': 7},
+            'LZH': {'window_size': 8192, 'level': 7},
+            'LZW': {'max_bits': 16},
+            'Huffman': {'table': 'canonical'}}},
+        8: {'block_size': 32768, 'stages': {
+            'BWT': {'block_size': 4096},
+            'LZSS': {'window_size': 16384, 'level': 8},
+            'LZH': {'window_size': 16384, 'level': 8},
+            'LZW': {'max_bits': 16},
+            'Huffman': {'table': 'canonical'}}},
+        9: {'block_size': 32768, 'stages': {
+            'BWT': {'block_size': 8192},
+            'LZSS': {'window_size': 32767, 'level': 9},
+            'LZH': {'window_size': 32767, 'level': 9},
+            'LZW': {'max_bits': 16},
+            'Huffman': {'table': 'canonical'}}},
+    }
+
+    # Порог энтропии (бит/байт), выше которого блок считается несжимаемым
+    STORE_ENTROPY = 7.5
+
+    # Сколько блоков пайплайна прогоняется через стадии в estimate_size
+    ESTIMATE_BLOCKS = 16
+
+    # Порция Archive.write для пайплайнов с фильтрами, видящими вход целиком (см. chunk_size)
+    WHOLE_INPUT = 64 << 20
+
+    # Стадии, принимающие обученный словарь (см. dictionary.py)
+    DICTIONARY_STAGES = ('LZSS', 'LZH', 'LZW')
+
+    def __init__(self, encoder: str = 'BWT+MTF+RLE+HA', block_size: Optional[int] = None,
+                 cache: Optional[BlockCache] = None, level: Optional[int] = None,
+                 params: Optional[Dict[str, dict]] = None, dictionary: Optional[bytes] = None):
+        if level is not None and level not in self.LEVEL_PRESETS:
+            raise ValueError(f"Уровень сжатия должен быть от 1 до 9, получено: {level}")
+        self.encoder = encoder
+        self.level = level
+        preset = self.LEVEL_PRESETS.get(level, {})
+        self.block_size = block_size or preset.get('block_size', 2048)
+        # Параметры стадий по имени класса, например {'Predictor': {'width': 800}}; перекрывают пресет уровня
+        self.params = params or {}
+        # Словарь обучается на исходных данных, поэтому передаётся только первой стадии
+        self.dictionary = bytes(dictionary) if dictionary else None
+        if self.dictionary and self.COMPRESSORS[encoder][0] not in self.DICTIONARY_STAGES:
+            raise ValueError(f"Пайплайн {encoder} не поддерживает словарь: первая стадия должна быть "
+                             f"одной из {', '.join(self.DICTIONARY_STAGES)}")
+        self.cache = cache
+        self.components = self._init_components()
+        # Промежуточные буферы encode_into/decode_into: переиспользуются между вызовами
+        self._scratch = (bytearray(), bytearray())
+
+    def __getstate__(self):
+        # Пайплайн уходит в процессы пула с каждым заданием: промежуточные буферы не нужны,
+        # а кэш без диска в дочернем процессе бесполезен — его записи никто не увидит
+        state = self.__dict__.copy()
+        state['_scratch'] = None
+        if self.cache is not None and self.cache.cache_dir is None:
+            state['cache'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._scratch = (bytearray(), bytearray())
+
+    @property
+    def name(self) -> str:
+        """Имя пайплайна с учётом уровня и параметров стадий (используется, например, как ключ кэша)"""
+        name = self.encoder if self.level is None else f"{self.encoder}@{self.level}"
+        if self.params:
+            name += json.dumps(self.params, sort_keys=True)
+        if self.dictionary:
+            name += f"#{self.dictionary_id}"
+        return name
+
+    @property
+    def chunk_size(self) -> int:
+        """
+        Порция, которую Archive.write по умолчанию подаёт в encode: блок пайплайна или,
+        если есть стадия дальнего поиска (LDM), её окно — иначе дальние повторы не видны.
+        Фильтры, видящие вход целиком (BLOCKWISE = False: тег RAW и строки изображения
+        есть только в начале файла), получают до WHOLE_INPUT байт одной порцией.
+        """
+        sizes = [self.block_size]
+        for comp in self.components:
+            window = getattr(comp, 'window', None)
+            if window:
+                sizes.append(window)
+            elif not comp.BLOCKWISE:
+                sizes.append(self.WHOLE_INPUT)
+        return max(sizes)
+
+    @property
+    def dictionary_id(self) -> Optional[str]:
+        if not self.dictionary:
+            return None
+        from .dictionary import dictionary_id
+        return dictionary_id(self.dictionary)
+
+    def _init_components(self) -> List[CompressionAlgorithm]:
+        """Инициализация компонентов пайплайна; модули стадий импортируются только здесь"""
+        package = importlib.import_module(__package__)
+        stages = self.LEVEL_PRESETS.get(self.level, {}).get('stages', {})
+        components = []
+        for i, name in enumerate(self.COMPRESSORS[self.encoder]):
+            kwargs = {'block_size': self.block_size, **stages.get(name, {}), **self.params.get(name, {})}
+            if i == 0 and self.dictionary:
+                kwargs['dictionary'] = self.dictionary
+            components.append(getattr(package, name)(**kwargs))
+        return components
+
+    def encode(self, data: bytes) -> bytes:
+        """Последовательное применение кодировщиков (с учётом кэша блоков, если он задан)"""
+        if self.cache is None:
+            return self._encode(data)
+
+        key = self.cache.make_key(self.name, self.block_size, data)
+        encoded = self.cache.get(key)
+        if encoded is None:
+            encoded = self._encode(data)
+            self.cache.put(key, encoded)
+        return encoded
+
+    @staticmethod
+    def entropy(data: bytes) -> float:
+        """Энтропия нулевого порядка (бит/байт) по гистограмме байтов"""
+        # NumPy нужен только здесь: импортируем при первом обращении
+        from .entropy import entropy_order0
+        return entropy_order0(data)
+
+    def is_incompressible(self, data: bytes) -> bool:
+        """Дешёвая оценка до запуска стадий: почти случайные данные сжимать бессмысленно"""
+        return self.entropy(data) > self.STORE_ENTROPY
+
+    def _encode(self, data: bytes) -> bytes:
+        encoded = data
+        for comp in self.components:
+            encoded = comp.encode(encoded)
+        return encoded
+
+    def decode(self, data: bytes) -> bytes:
+        """Последовательное применение декодеров (в обратном порядке)"""
+        decoded = data
+        for comp in reversed(self.components):
+            decoded = comp.decode(decoded)
+        return decoded
+
+    def estimate_size(self, data) -> int:
+        """
+        Оценка размера encode(data) без кодирования всего входа (кэш не используется).
+        Стадии, кроме последней, честно прогоняются на выборке из ESTIMATE_BLOCKS блоков
+        пайплайна; их выходы склеиваются, как в потоке полного кодирования, и последняя
+        стадия оценивает склейку через estimate_size. Результат масштабируется на весь вход.
+        Ведущие стадии, видящие весь вход одним блоком (BLOCKWISE = False), векторизованы
+        и прогоняются целиком: их выход по выборке не восстановить.
+        Одностадийный пайплайн отдаёт оценку кодека как есть.
+        """
+        *transforms, last = self.components
+        while transforms and not transforms[0].BLOCKWISE:
+            data = transforms.pop(0).encode(bytes(data))
+        if not transforms:
+            return last.estimate_size(data)
+        if not data:
+            return 0
+        blocks = sample_blocks(data, self.block_size, self.ESTIMATE_BLOCKS)
+        sampled = sum(len(block) for block in blocks)
+        if sampled == len(data):
+            blocks = [data]
+        stream = bytearray()
+        for block in blocks:
+            for comp in transforms:
+                block = comp.encode(bytes(block))
+            stream.extend(block)
+        estimate = last.estimate_size(stream)
+        if sampled == len(data):
+            return estimate
+        return min(self.max_encoded_size(len(data)), round(estimate * len(data) / sampled))
+
+    def max_encoded_size(self, size: int) -> int:
+        """Худший случай размера закодированных данных для входа из size байт"""
+        for comp in self.components:
+            size = comp.max_encoded_size(size)
+        return size
+
+    def encode_into(self, src, dst) -> int:
+        """
+        Кодирует src (bytes или memoryview) в буфер dst, возвращает число записанных байт.
+        Стадии пишут друг другу в два внутренних буфера по очереди, поэтому в
+        установившемся режиме память не выделяется. Не потокобезопасно: у каждого
+        рабочего потока должен быть свой пайплайн.
+        """
+        if self.cache is not None:
+            return write_into(dst, self.encode(bytes(src)))
+        return self._run_into([comp.encode_into for comp in self.components], src, dst)
+
+    def decode_into(self, src, dst) -> int:
+        """Декодирует src в буфер dst, возвращает число записанных байт"""
+        return self._run_into([comp.decode_into for comp in reversed(self.components)], src, dst)
+
+    def _run_into(self, stages, src, dst) -> int:
+        current = src
+        held = []  # представления над буфером, который читает текущая стадия
+        try:
+            for i, stage in enumerate(stages):
+                last = i == len(stages) - 1
+                out = dst if last else self._scratch[i % 2]
+                size = stage(current, out)
+                # Вход прочитан: освобождаем буфер, чтобы следующая стадия могла в него писать (и расширять)
+                for view in reversed(held):
+                    view.release()
+                held = []
+                if not last:
+                    base = memoryview(out)
+                    current = base[:size]
+                    held = [base, current]
+            return size
+        finally:
+            for view in reversed(held):
+                view.release()
+
+
+class CompressionError(Exception):
+    pass
@@ -0,0 +1,161 @@
+from .blockProcessor import *
+import numpy as np
+
+"""
+Предсказывающий фильтр для RAW-изображений (как в PNG): для каждой строки
+выбирается один из фильтров None/Sub/Up/Paeth, вместо пикселей хранятся остатки.
+Для цветных изображений (тег CL) каналы раскладываются по отдельным плоскостям.
+
+Блок: [тег 2 байта][ширина 2 байта][каналы 1 байт][длина тела 4 байта]
+      [тип фильтра на каждую строку плоскостей][остатки][хвост неполной строки как есть]
+"""
+
+
+class Predictor(BufferCodec):
+    BLOCKWISE = False
+    HEADER = struct.Struct('>2sHBI')
+    TAGS = {b'BW': 1, b'GR': 1, b'CL': 3}
+    NO_TAG = b'\x00\x00'
+
+    NONE, SUB, UP, PAETH = range(4)
+
+    def __init__(self, block_size, width=800, channels=1):
+        self.block_size = block_size
+        self.width = width
+        self.channels = channels
+
+    def max_encoded_size(self, size: int) -> int:
+        # Весь вход — один блок: остатки той же длины плюс байт фильтра на строку каждой плоскости
+        if not size:
+            return 0
+        return size + size // self.width + BlockProcessor.BLOCK_HEADER.size + self.HEADER.size
+
+    def estimate_size(self, data) -> int:
+        """Точный размер: остатки той же длины плюс байт фильтра на строку каждой плоскости"""
+        if not data:
+            return 0
+        tag = bytes(data[:2])
+        channels, body_len = (self.TAGS[tag], len(data) - 2) if tag in self.TAGS else (self.channels, len(data))
+        rows = body_len // (self.width * channels)
+        return BlockProcessor.BLOCK_HEADER.size + self.HEADER.size + rows * channels + body_len
+
+    def encode(self, data: bytes) -> bytes:
+        if not data:
+            return b''
+
+        tag = bytes(data[:2])
+        if tag in self.TAGS:
+            channels = self.TAGS[tag]
+            body = data[2:]
+        else:
+            tag, channels, body = self.NO_TAG, self.channels, data
+
+        stride = self.width * channels
+        rows = len(body) // stride
+        tail = body[rows * stride:]
+
+        header = self.HEADER.pack(tag, self.width, channels, len(body))
+        if not rows:
+            return BlockProcessor.add_block_header(header + tail)
+
+        pixels = np.frombuffer(body, dtype=np.uint8, count=rows * stride)
+        # (каналы, строки, ширина): каждая плоскость фильтруется отдельно
+        planes = pixels.reshape(rows, self.width, channels).transpose(2, 0, 1).astype(np.int16)
+        left, up, up_left = self._neighbours(planes)
+
+        candidates = np.stack([
+            planes,
+            planes - left,
+            planes - up,
+            planes - self._paeth(left, up, up_left),
+        ])
+        residuals = (candidates & 0xFF).astype(np.uint8)
+        # Эвристика PNG: минимальная сумма модулей остатков как знаковых байтов
+        cost = np.abs(residuals.view(np.int8).astype(np.int32)).sum(axis=3)
+        filters = cost.argmin(axis=0).astype(np.uint8)
+        chosen = np.take_along_axis(residuals, filters[np.newaxis, :, :, np.newaxis], axis=0)[0]
+
+        return BlockProcessor.add_block_header(header + filters.tobytes() + chosen.tobytes() + tail)
+
+    def decode(self, data: bytes) -> bytes:
+        decoded = bytearray()
+        ptr = 0
+
+        while ptr < len(data):
+            block, ptr = BlockProcessor.read_block(data, ptr)
+            if not block:
+                break
+
+            tag, width, channels, body_len = self.HEADER.unpack_from(block)
+            pos = self.HEADER.size
+            if tag != self.NO_TAG:
+                decoded.extend(tag)
+
+            stride = width * channels
+            rows = body_len // stride
+            if rows:
+                filters = np.frombuffer(block, dtype=np.uint8, count=channels * rows, offset=pos)
+                pos += channels * rows
+                residuals = np.frombuffer(block, dtype=np.uint8, count=rows * stride, offset=pos)
+                pos += rows * stride
+                planes = self._unfilter(filters.reshape(channels, rows), residuals.reshape(channels, rows, width))
+                decoded.extend(planes.transpose(1, 2, 0).tobytes())
+            decoded.extend(block[pos:])
+
+        return bytes(decoded)
+
+    @staticmethod
+    def _neighbours(planes):
+        left = np.zeros_like(planes)
+        left[:, :, 1:] = planes[:, :, :-1]
+        up = np.zeros_like(planes)
+        up[:, 1:, :] = planes[:, :-1, :]
+        up_left = np.zeros_like(planes)
+        up_left[:, 1:, 1:] = planes[:, :-1, :-1]
+        return left, up, up_left
+
+    @staticmethod
+    def _paeth(a, b, c):
+        p = a + b - c
+        pa = np.abs(p - a)
+        pb = np.abs(p - b)
+        pc = np.abs(p - c)
+        return np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+
+    def _unfilter(self, filters, residuals):
+        channels, rows, width = residuals.shape
+        planes = np.empty_like(residuals)
+        zero = np.zeros(width, dtype=np.uint8)
+
+        for ch in range(channels):
+            prev = zero
+            for r in range(rows):
+                res = residuals[ch, r]
+                kind = filters[ch, r]
+                if kind == self.SUB:
+                    row = np.cumsum(res, dtype=np.uint8)
+                elif kind == self.UP:
+                    row = res + prev
+                elif kind == self.PAETH:
+                    row = self._unpaeth_row(res, prev)
+                else:
+                    row = res
+                planes[ch, r] = row
+                prev = planes[ch, r]
+        return planes
+
+    @staticmethod
+    def _unpaeth_row(res, prev):
+        # Зависимость от левого восстановленного пикселя не векторизуется внутри строки
+        row = bytearray(len(res))
+        up = prev.tolist()
+        left = up_left = 0
+        for x, r in enumerate(res.tolist()):
+            b = up[x]
+            p = left + b - up_left
+            pa, pb, pc = abs(p - left), abs(p - b), abs(p - up_left)
+            pred = left if pa <= pb and pa <= pc else b if pb <= pc else up_left
+            left = (r + pred) & 0xFF
+            row[x] = left
+            up_left = b
+        return np.frombuffer(bytes(row), dtype=np.uint8)
@@ -1,44 +1,89 @@
 from .blockProcessor import *
 
+# Готовые серии для decode_into: срез memoryview не копирует данные
+_RUNS = [memoryview(bytes([b]) * 255) for b in range(256)]
 
-class RLE:
+
+class RLE(BufferCodec):
     def __init__(self, block_size):
         self.block_size = block_size
 
+    def max_encoded_size(self, size: int) -> int:
+        # Худший случай — ни одного повтора: пара (1, байт) на каждый байт
+        return 2 * size + BlockProcessor.BLOCK_HEADER.size * BlockProcessor.block_count(size, self.block_size)
+
+    def estimate_size(self, data) -> int:
+        """Точный размер: пара байт на каждую серию (не длиннее 255) внутри блока"""
+        import numpy as np
+
+        if not data:
+            return 0
+        values = np.frombuffer(data, dtype=np.uint8)
+        # Начала серий: смена байта или начало блока
+        starts = np.empty(len(values), dtype=bool)
+        np.not_equal(values[1:], values[:-1], out=starts[1:])
+        starts[::self.block_size if BlockProcessor.use_header else len(values)] = True
+        runs = np.diff(np.append(np.flatnonzero(starts), len(values)))
+        pairs = int(((runs + 254) // 255).sum())
+        return 2 * pairs + BlockProcessor.BLOCK_HEADER.size * BlockProcessor.block_count(len(data), self.block_size)
+
     def encode(self, data: bytes) -> bytes:
-        encoded = bytearray()
+        encoded = bytearray(self.max_encoded_size(len(data)))
+        del encoded[self.encode_into(data, encoded):]
+        return bytes(encoded)
+
+    def encode_into(self, src, dst) -> int:
+        ensure_capacity(dst, self.max_encoded_size(len(src)))
+        pos = 0
 
-        for block in BlockProcessor.split_blocks(data, self.block_size):
-            block_enc = bytearray()
-            prev = block[0] if block else 0
+        for block in BlockProcessor.split_blocks(src, self.block_size):
+            if not block:
+                continue
+            start, pos = pos, BlockProcessor.reserve_header(pos)
+            prev = block[0]
             count = 1
 
             for b in block[1:]:
                 if b == prev and count < 255:
                     count += 1
                 else:
-                    block_enc.extend([count, prev])
+                    dst[pos] = count
+                    dst[pos + 1] = prev
+                    pos += 2
                     prev = b
                     count = 1
 
-            if count > 0:
-                block_enc.extend([count, prev])
+            dst[pos] = count
+            dst[pos + 1] = prev
+            pos += 2
+            BlockProcessor.close_block(dst, start, pos)
 
-            encoded.extend(BlockProcessor.add_block_header(block_enc))
-
-        return bytes(encoded)
+        return pos
 
     def decode(self, data: bytes) -> bytes:
         decoded = bytearray()
-        ptr = 0
+        self.decode_into(data, decoded)
+        return bytes(decoded)
 
-        while ptr < len(data):
-            block_enc, ptr = BlockProcessor.read_block(data, ptr)
+    def decode_into(self, src, dst) -> int:
+        blocks = []
+        ptr = 0
+        while ptr < len(src):
+            block_enc, ptr = BlockProcessor.read_block(src, ptr)
             if not block_enc:
                 break
+            blocks.append(block_enc)
 
+        # Размер результата известен заранее — сумма счётчиков
+        ensure_capacity(dst, sum(sum(block_enc[0::2]) for block_enc in blocks))
+        pos = 0
+        for block_enc in blocks:
             for i in range(0, len(block_enc), 2):
                 count, byte = block_enc[i], block_enc[i + 1]
-                decoded.extend([byte] * count)
+                if count == 1:
+                    dst[pos] = byte
+                else:
+                    dst[pos:pos + count] = _RUNS[byte][:count]
+                pos += count
 
-        return bytes(decoded)
\ No newline at end of file
+        return pos
@@ -0,0 +1,130 @@
+from .blockProcessor import *
+import numpy as np
+
+"""
+Кодирование серий нулей для выхода MTF (RUNA/RUNB, как в bzip2).
+Длина серии n записывается в биективной двоичной системе цифрами
+RUNA (=1) и RUNB (=2), младшая цифра первой: n = sum(d_i * 2^i).
+Ненулевые ранги проходят без изменений со сдвигом на единицу.
+
+Байты выхода: 0 — RUNA, 1 — RUNB, 2..254 — ранги 1..253,
+255 и следующий байт 0/1 — ранги 254/255.
+Блок: [символы] (длина блока — в заголовке BlockProcessor).
+"""
+
+
+class ZRLE(BufferCodec):
+    RUNA, RUNB = 0, 1
+    ESCAPE = 255
+    ESCAPED = 254  # ранги начиная с этого записываются через ESCAPE
+
+    def __init__(self, block_size):
+        self.block_size = block_size
+
+    def max_encoded_size(self, size: int) -> int:
+        # Худший случай — только ранги 254/255, по два байта на каждый
+        return 2 * size + BlockProcessor.BLOCK_HEADER.size * BlockProcessor.block_count(size, self.block_size)
+
+    def estimate_size(self, data) -> int:
+        """Точный размер: ранги по байту (254/255 — по два), серия нулей n — floor(log2(n + 1)) цифр"""
+        if not data:
+            return 0
+        values = np.frombuffer(data, dtype=np.uint8)
+        zero = values == 0
+        step = self.block_size if BlockProcessor.use_header else len(values)
+        # Серии нулей не переходят через границу блока
+        starts = zero.copy()
+        starts[1:] &= ~zero[:-1]
+        starts[::step] = zero[::step]
+        ends = zero.copy()
+        ends[:-1] &= ~zero[1:]
+        ends[step - 1::step] = zero[step - 1::step]
+        runs = np.flatnonzero(ends) - np.flatnonzero(starts) + 1
+        digits = int((np.frexp(runs + 1)[1] - 1).sum())
+        literals = len(values) - int(zero.sum()) + int((values >= self.ESCAPED).sum())
+        return literals + digits + BlockProcessor.BLOCK_HEADER.size * BlockProcessor.block_count(len(data), self.block_size)
+
+    def encode(self, data: bytes) -> bytes:
+        encoded = bytearray(self.max_encoded_size(len(data)))
+        del encoded[self.encode_into(data, encoded):]
+        return bytes(encoded)
+
+    def encode_into(self, src, dst) -> int:
+        ensure_capacity(dst, self.max_encoded_size(len(src)))
+        pos = 0
+        for block in BlockProcessor.split_blocks(src, self.block_size):
+            if not block:
+                continue
+            start = pos
+            pos = self._encode_block(block, dst, BlockProcessor.reserve_header(pos))
+            BlockProcessor.close_block(dst, start, pos)
+        return pos
+
+    def _encode_block(self, block, dst, pos: int) -> int:
+        """Кодирует блок прямо в dst с позиции pos, возвращает позицию за концом"""
+        values = np.frombuffer(block, dtype=np.uint8)
+        zero = values == 0
+        # Границы серий нулей: начала и концы (не включая)
+        edges = np.diff(np.concatenate(([False], zero, [False])).astype(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        runs = np.flatnonzero(edges == -1) - starts
+
+        # Цифры серии n — биты n + 1 без старшей единицы, младший первым: 0 -> RUNA, 1 -> RUNB
+        digits = np.frexp(runs + 1)[1].astype(np.int64) - 1
+        escaped = values >= self.ESCAPED
+        counts = np.where(zero, 0, 1 + escaped).astype(np.int64)
+        counts[starts] = digits
+        offsets = np.cumsum(counts) - counts
+        total = int(counts.sum())
+
+        out = np.frombuffer(dst, dtype=np.uint8, count=total, offset=pos)
+        literal = np.flatnonzero(~zero)
+        out[offsets[literal]] = np.where(escaped[literal], self.ESCAPE, values[literal] + 1)
+        escape_pos = np.flatnonzero(escaped)
+        out[offsets[escape_pos] + 1] = values[escape_pos] - self.ESCAPED
+
+        run_of_digit = np.repeat(np.arange(len(runs)), digits)
+        digit_index = np.arange(len(run_of_digit)) - np.repeat(np.cumsum(digits) - digits, digits)
+        out[offsets[starts[run_of_digit]] + digit_index] = ((runs[run_of_digit] + 1) >> digit_index) & 1
+        return pos + total
+
+    def decode(self, data: bytes) -> bytes:
+        decoded = bytearray()
+        self.decode_into(data, decoded)
+        return bytes(decoded)
+
+    def decode_into(self, src, dst) -> int:
+        pos = 0
+        ptr = 0
+        while ptr < len(src):
+            block, ptr = BlockProcessor.read_block(src, ptr)
+            if not block:
+                break
+            values = self._decode_block(block)
+            dst[pos:pos + len(values)] = memoryview(values)
+            pos += len(values)
+        return pos
+
+    def _decode_block(self, block) -> np.ndarray:
+        symbols = np.frombuffer(block, dtype=np.uint8)
+        # Байт после ESCAPE — младшая часть ранга, а не цифра серии
+        payload = np.zeros(len(symbols), dtype=bool)
+        payload[1:] = symbols[:-1] == self.ESCAPE
+        digit = (symbols <= self.RUNB) & ~payload
+
+        # Группы подряд идущих цифр — одна серия; номер цифры внутри группы — степень двойки
+        starts = digit & ~np.concatenate(([False], digit[:-1]))
+        digit_pos = np.flatnonzero(digit)
+        group_start = np.flatnonzero(starts)
+        group_of_digit = np.cumsum(starts[digit_pos]) - 1
+        power = digit_pos - group_start[group_of_digit]
+        weights = (symbols[digit_pos].astype(np.int64) + 1) << power
+        runs = np.bincount(group_of_digit, weights=weights, minlength=len(group_start)).astype(np.int64)
+
+        lengths = np.where(digit | payload, 0, 1).astype(np.int64)
+        lengths[group_start] = runs
+        values = symbols.astype(np.int64) - 1
+        values[group_start] = 0
+        escape_pos = np.flatnonzero(symbols == self.ESCAPE)
+        values[escape_pos] = self.ESCAPED + symbols[escape_pos + 1]
+        return np.repeat(values.astype(np.uint8), lengths)
@@ -0,0 +1,61 @@
+import os
+import sys
+from collections import defaultdict
+
+import matplotlib.pyplot as plt
+
+from supplement.scaling import ScalingBenchmark, DEFAULT_SIZES, KB, MB
+
+
+def plot_series(series, xlabel, ylabel, title, filename, logx=False):
+    plt.figure(figsize=(8, 6))
+    for name, points in series.items():
+        xs, ys = zip(*sorted(points))
+        plt.plot(xs, ys, marker="o", label=name)
+    if logx:
+        plt.xscale("log", base=2)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.title(title)
+    plt.grid(True)
+    plt.legend(fontsize="small")
+    plt.savefig(filename, dpi=300)
+
+
+def main():
+    # Аргументы: максимальный размер входа в МБ (по умолчанию 1024) и число вычислителей (по умолчанию — все ядра)
+    max_mb = float(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count() or 1
+
+    sizes = [s for s in DEFAULT_SIZES if s <= max_mb * MB]
+    workers = sorted({1, max_workers} | {2 ** i for i in range(1, max_workers.bit_length()) if 2 ** i <= max_workers})
+
+    # Точки сохраняются по мере готовности; размеры, на которые последовательно уйдёт больше 10 минут, пропускаются
+    bench = ScalingBenchmark(sizes=sizes, workers=workers, results_path="scaling.jsonl", max_seconds=600)
+    results = bench.run()
+    ScalingBenchmark.save_csv(results, "scaling.csv")
+
+    largest = defaultdict(int)
+    for r in results:
+        largest[r['encoder']] = max(largest[r['encoder']], r['size'])
+
+    throughput, efficiency, by_size = defaultdict(list), defaultdict(list), defaultdict(list)
+    for r in results:
+        if r['size'] == largest[r['encoder']]:
+            throughput[r['encoder']].append((r['workers'], r['mbps']))
+            efficiency[r['encoder']].append((r['workers'], r['efficiency']))
+        if r['workers'] == max(workers):
+            by_size[r['encoder']].append((r['size'] // KB, r['mbps']))
+
+    plot_series(throughput, "Число вычислителей", "Пропускная способность (МБ/с)",
+                "Масштабирование по ядрам (наибольший посчитанный размер)", "scaling_throughput.png")
+    plot_series(efficiency, "Число вычислителей", "Эффективность (ускорение / ядра)",
+                "Эффективность масштабирования", "scaling_efficiency.png")
+    plot_series(by_size, "Размер входа (КБ)", "Пропускная способность (МБ/с)",
+                f"Пропускная способность от размера входа ({max(workers)} вычислителей)", "scaling_size.png",
+                logx=True)
+    plt.show()
+
+
+if __name__ == "__main__":
+    main()
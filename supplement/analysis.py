@@ -0,0 +1,91 @@
+import csv
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from encoders_decoders import BWT, MTF, BlockProcessor
+from encoders_decoders.entropy import entropy_order0, entropy_order1, block_entropies
+from supplement.shared import SharedInput, shared_input
+
+
+def bwt_mtf_transform(data: bytes, block_size: int) -> bytes:
+    """
+    BWT и MTF над данными, разбитыми на блоки block_size.
+    Каждый блок BWT (с его заголовком) попадает в MTF целиком и обрабатывается независимо.
+    """
+    transformed = BWT(block_size).encode(data)
+    # 4 байта заголовка BlockProcessor + 8 байт (индекс, длина) от BWT
+    return MTF(block_size + 12).encode(transformed)
+
+
+# Служебные байты блока после bwt_mtf_transform: заголовки BlockProcessor от MTF и BWT, (индекс, длина) BWT
+BLOCK_OVERHEAD = 2 * BlockProcessor.BLOCK_HEADER.size + 8
+
+
+def strip_block_headers(encoded: bytes, block_size: int) -> bytes:
+    """
+    Данные блоков из выхода bwt_mtf_transform без заголовков, подряд:
+    блок i занимает байты [i * block_size, (i + 1) * block_size).
+    Закодированный блок длиннее block_size на BLOCK_OVERHEAD, шаг по потоку — с их учётом.
+    """
+    arr = np.frombuffer(encoded, dtype=np.uint8)
+    stride = block_size + BLOCK_OVERHEAD
+    full = len(arr) // stride
+    body = arr[:full * stride].reshape(full, stride)[:, BLOCK_OVERHEAD:].ravel()
+    return np.concatenate([body, arr[full * stride + BLOCK_OVERHEAD:]]).tobytes()
+
+
+def analyze_block_size(data: bytes, block_size: int, transform: bool = True) -> Dict:
+    """
+    Энтропия данных (после BWT+MTF, если transform) и распределение энтропии по блокам.
+    Энтропия блока считается по его собственному выходу, без заголовков.
+    """
+    encoded = bwt_mtf_transform(data, block_size) if transform else data
+    per_block = block_entropies(strip_block_headers(encoded, block_size) if transform else encoded, block_size)
+    return {
+        'block_size': block_size,
+        'size': len(encoded),
+        'entropy': entropy_order0(encoded),
+        'entropy_order1': entropy_order1(encoded),
+        'block_mean': float(per_block.mean()) if len(per_block) else 0.0,
+        'block_std': float(per_block.std()) if len(per_block) else 0.0,
+        'block_min': float(per_block.min()) if len(per_block) else 0.0,
+        'block_p50': float(np.percentile(per_block, 50)) if len(per_block) else 0.0,
+        'block_p90': float(np.percentile(per_block, 90)) if len(per_block) else 0.0,
+        'block_max': float(per_block.max()) if len(per_block) else 0.0,
+        'block_entropies': per_block.tolist(),
+    }
+
+
+def _analyze_shared(args):
+    return analyze_block_size(shared_input(), *args)
+
+
+def run_study(data: bytes, block_sizes: Iterable[int], transform: bool = True,
+              workers: Optional[int] = None) -> List[Dict]:
+    """
+    Оценивает каждый размер блока в отдельном процессе.
+    Данные не пересылаются в каждое задание: процессы читают их из общей памяти.
+    workers=1 — последовательно в текущем процессе.
+    """
+    if workers == 1:
+        return [analyze_block_size(data, bs, transform) for bs in block_sizes]
+    with SharedInput(data) as shared, shared.pool(workers) as pool:
+        return list(pool.map(_analyze_shared, [(bs, transform) for bs in block_sizes]))
+
+
+def save_results(results: List[Dict], csv_path=None, json_path=None):
+    """
+    CSV — сводка по размерам блоков (для графиков), JSON — полный результат
+    вместе с энтропией каждого блока.
+    """
+    if csv_path:
+        fields = [k for k in results[0] if k != 'block_entropies'] if results else []
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
+    if json_path:
+        Path(json_path).write_text(json.dumps(results, ensure_ascii=False), encoding='utf-8')
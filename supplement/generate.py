@@ -1,7 +1,6 @@
 import os
 import numpy as np
 from PIL import Image
-import random
 
 
 def convert_to_raw(image_path, output_path, image_type):
@@ -30,81 +29,200 @@ class DataGenerator:
 
 
 class ImageGenerator:
+    RAW_TAGS = {'bw': b'BW', 'gray': b'GR', 'color': b'CL'}
+
     @staticmethod
-    def generate_images(path):
+    def generate_images(path, size=(800, 600)):
         # Генерация всех изображений
-        ImageGenerator.generate_bw_image(path)
-        ImageGenerator.generate_gray_image(path)
-        ImageGenerator.generate_color_image(path)
+        ImageGenerator.generate_bw_image(path, size)
+        ImageGenerator.generate_gray_image(path, size)
+        ImageGenerator.generate_color_image(path, size)
+
+    @staticmethod
+    def pattern(image_type, width, rows, row_offset=0):
+        """Пиксели узора для строк [row_offset, row_offset + rows) через broadcasting координат"""
+        y, x = np.ogrid[row_offset:row_offset + rows, 0:width]
+        if image_type == 'bw':
+            return (x + y) % 100 < 50
+        if image_type == 'gray':
+            return ((x + y) % 256).astype(np.uint8)
+        if image_type == 'color':
+            planes = np.broadcast_arrays(x % 256, y % 256, (x + y) % 256)
+            return np.stack(planes, axis=-1).astype(np.uint8)
+        raise ValueError(f"Неизвестный тип изображения: {image_type}")
 
     @staticmethod
     def generate_bw_image(path, size=(800, 600)):
-        img = Image.new('1', size, 0)
-        pixels = np.array(img)
-        for y in range(size[1]):
-            for x in range(size[0]):
-                pixels[y, x] = (x + y) % 100 < 50
-        img = Image.fromarray(pixels)
+        img = Image.fromarray(ImageGenerator.pattern('bw', *size))
         img.save(os.path.join(path, 'bw_image.png'))
 
     @staticmethod
     def generate_gray_image(path, size=(800, 600)):
-        img = Image.new('L', size, 128)
-        pixels = np.array(img)
-        for y in range(size[1]):
-            for x in range(size[0]):
-                pixels[y, x] = (x + y) % 256
-        img = Image.fromarray(pixels)
+        img = Image.fromarray(ImageGenerator.pattern('gray', *size))
         img.save(os.path.join(path, 'gray_image.png'))
 
     @staticmethod
     def generate_color_image(path, size=(800, 600)):
-        img = Image.new('RGB', size, (255, 0, 0))
-        pixels = np.array(img)
-        for y in range(size[1]):
-            for x in range(size[0]):
-                pixels[y, x] = (x % 256, y % 256, (x + y) % 256)
-        img = Image.fromarray(pixels)
+        img = Image.fromarray(ImageGenerator.pattern('color', *size))
         img.save(os.path.join(path, 'color_image.png'))
 
+    @staticmethod
+    def generate_raw_image(path, image_type, size=(800, 600), chunk_rows=1024):
+        """
+        Пишет RAW-изображение (тег + пиксели, как RawConverter) напрямую, порциями строк,
+        без PNG-посредника — годится для изображений в несколько гигабайт.
+        """
+        width, height = size
+        filename = os.path.join(path, f'{image_type}_image_{width}x{height}.raw')
+        with open(filename, 'wb') as f:
+            f.write(ImageGenerator.RAW_TAGS[image_type])
+            for row in range(0, height, chunk_rows):
+                rows = min(chunk_rows, height - row)
+                pixels = ImageGenerator.pattern(image_type, width, rows, row).astype(np.uint8)
+                if image_type == 'bw':
+                    # Как у RawConverter: ч/б пиксели хранятся байтами 0/255
+                    pixels *= 255
+                f.write(pixels.tobytes())
+        return filename
+
+
+class CorpusGenerator:
+    """Воспроизводимые (по seed) корпуса произвольного размера, записываемые на диск порциями"""
+    CHUNK_SIZE = 4 * 1024 * 1024
 
-class TextGenerator:
     @staticmethod
-    def generate_realistic_text(path, size_mb=5):
-        filename = os.path.join(path, 'realistic_text.txt')
-        chunks = []
-
-        # Пример текста с разной структурой
-        templates = [
-            "В чащах юга жил бы цитрус? Да, но фальшивый экземпляр! ",
-            "Съешь же ещё этих мягких французских булок, да выпей чаю. ",
-            "Широкая электрификация южных губерний даст мощный толчок подъёму сельского хозяйства. ",
-            "Летают ли коровы над радугой? Это философский вопрос. ",
-            "Размышления о смысле жизни приводят к неожиданным выводам. "
+    def stream_to_file(filename, size, make_chunk, chunk_size=CHUNK_SIZE):
+        """
+        Записывает ровно size байт: make_chunk(n) возвращает очередную порцию байтов (не меньше 1),
+        лишнее в конце последней порции отбрасывается.
+        """
+        written = 0
+        with open(filename, 'wb') as f:
+            while written < size:
+                chunk = make_chunk(min(chunk_size, size - written))
+                chunk = chunk[:size - written]
+                f.write(chunk)
+                written += len(chunk)
+        return filename
+
+    @staticmethod
+    def generate_random_bytes(path, size, seed=0, chunk_size=CHUNK_SIZE):
+        rng = np.random.default_rng(seed)
+        return CorpusGenerator.stream_to_file(
+            os.path.join(path, 'random.bin'), size, rng.bytes, chunk_size)
+
+    @staticmethod
+    def generate_logs(path, size, seed=0, chunk_size=CHUNK_SIZE):
+        """Логи с низкой энтропией: монотонное время, несколько уровней, повторяющиеся поля"""
+        rng = np.random.default_rng(seed)
+        levels = np.array(['INFO', 'INFO', 'INFO', 'DEBUG', 'WARN', 'ERROR'])
+        paths = np.array(['/api/items', '/api/users', '/health', '/api/orders'])
+        state = {'time': 1700000000, 'id': 0}
+
+        def make_chunk(n):
+            lines = max(1, n // 80)
+            times = state['time'] + np.cumsum(rng.integers(0, 3, lines))
+            ids = state['id'] + np.arange(lines)
+            level = levels[rng.integers(0, len(levels), lines)]
+            route = paths[rng.integers(0, len(paths), lines)]
+            worker = rng.integers(0, 8, lines)
+            latency = rng.geometric(0.05, lines)
+            status = np.where(level == 'ERROR', 500, 200)
+            state['time'] = int(times[-1])
+            state['id'] = int(ids[-1]) + 1
+            return ''.join(
+                f"{t} {lv} [worker-{w}] id={i:08d} GET {r} status={st} latency={lat}ms\n"
+                for t, lv, w, i, r, st, lat in zip(
+                    times.tolist(), level.tolist(), worker.tolist(), ids.tolist(),
+                    route.tolist(), status.tolist(), latency.tolist())
+            ).encode()
+
+        return CorpusGenerator.stream_to_file(os.path.join(path, 'logs.txt'), size, make_chunk, chunk_size)
+
+    @staticmethod
+    def generate_structured_binary(path, size, seed=0, chunk_size=CHUNK_SIZE):
+        """Массив записей фиксированной длины: счётчик, время, медленно меняющееся значение, флаги, выравнивание"""
+        rng = np.random.default_rng(seed)
+        record = np.dtype([('id', '<u4'), ('timestamp', '<u8'), ('value', '<f4'),
+                           ('flags', 'u1'), ('pad', 'u1', 3)])
+        state = {'id': 0, 'value': 0.0}
+
+        def make_chunk(n):
+            count = max(1, -(-n // record.itemsize))
+            records = np.zeros(count, dtype=record)
+            records['id'] = state['id'] + np.arange(count)
+            records['timestamp'] = 1700000000000 + records['id'].astype(np.uint64) * 1000
+            records['value'] = state['value'] + np.cumsum(rng.normal(0, 0.1, count))
+            records['flags'] = rng.random(count) < 0.01
+            state['id'] += count
+            state['value'] = float(records['value'][-1])
+            return records.tobytes()
+
+        return CorpusGenerator.stream_to_file(os.path.join(path, 'structured.bin'), size, make_chunk, chunk_size)
+
+    @staticmethod
+    def generate_all(path, size, seed=0):
+        return [
+            TextGenerator.generate_realistic_text(path, size=size, seed=seed),
+            CorpusGenerator.generate_logs(path, size, seed),
+            CorpusGenerator.generate_random_bytes(path, size, seed),
+            CorpusGenerator.generate_structured_binary(path, size, seed),
         ]
 
-        # Рассчитываем необходимое количество данных
-        target_size = size_mb * 1024 * 1024
-        current_size = 0
 
-        with open(filename, 'w', encoding='utf-8') as f:
-            while current_size < target_size:
-                # Случайно выбираем шаблон и модифицируем его
-                chunk = random.choice(templates)
-                chunk = chunk * random.randint(1, 5)
+class TextGenerator:
+    TEMPLATES = [
+        "В чащах юга жил бы цитрус? Да, но фальшивый экземпляр! ",
+        "Съешь же ещё этих мягких французских булок, да выпей чаю. ",
+        "Широкая электрификация южных губерний даст мощный толчок подъёму сельского хозяйства. ",
+        "Летают ли коровы над радугой? Это философский вопрос. ",
+        "Размышления о смысле жизни приводят к неожиданным выводам. "
+    ]
 
-                # Добавляем случайные числа
-                chunk += ''.join(str(random.randint(0, 9)) * random.randint(0, 5))
+    @staticmethod
+    def generate_realistic_text(path, size_mb=5, seed=0, size=None, chunk_size=CorpusGenerator.CHUNK_SIZE):
+        """
+        Текст из шаблонов со случайными повторами, числами, знаками препинания и переносами строк.
+        size (в байтах) перекрывает size_mb; размер файла равен ему точно.
+        При одинаковом seed результат одинаков.
+        """
+        filename = os.path.join(path, 'realistic_text.txt')
+        rng = np.random.default_rng(seed)
+        templates = [t.encode('utf-8') for t in TextGenerator.TEMPLATES]
+        digits = [str(d).encode() for d in range(10)]
+        marks = [b'!', b'?', b'.', b',']
 
-                # Добавляем случайные знаки препинания
-                chunk += random.choice(['!', '?', '.', ',']) * random.randint(0, 3)
+        def make_chunk(n):
+            # Средний фрагмент ~200 байт: параметры всех фрагментов порции выбираются разом
+            pieces = max(1, n // 200)
+            tpl, reps = rng.integers(0, len(templates), pieces), rng.integers(1, 6, pieces)
+            digit, digit_reps = rng.integers(0, 10, pieces), rng.integers(0, 6, pieces)
+            mark, mark_reps = rng.integers(0, 4, pieces), rng.integers(0, 4, pieces)
+            newlines = rng.integers(0, 4, pieces)
+            return b''.join(
+                templates[t] * r + digits[d] * dr + marks[m] * mr + b'\n' * nl
+                for t, r, d, dr, m, mr, nl in zip(
+                    tpl.tolist(), reps.tolist(), digit.tolist(), digit_reps.tolist(),
+                    mark.tolist(), mark_reps.tolist(), newlines.tolist())
+            )
 
-                # Добавляем переносы строк
-                chunk += '\n' * random.randint(0, 3)
+        target_size = size if size is not None else size_mb * 1024 * 1024
+        CorpusGenerator.stream_to_file(filename, target_size, make_chunk, chunk_size)
 
-                # Записываем и считаем размер
-                f.write(chunk)
-                current_size += len(chunk.encode('utf-8'))
+        # Обрезка могла разрезать многобайтовый символ в конце: его начало заменяется пробелами,
+        # чтобы файл остался корректным UTF-8 и ровно target_size байт
+        with open(filename, 'rb+') as f:
+            base = max(0, target_size - 4)
+            f.seek(base)
+            tail = f.read()
+            start = len(tail) - 1
+            while start > 0 and 0x80 <= tail[start] < 0xC0:
+                start -= 1
+            lead = tail[start] if tail else 0
+            need = 1 if lead < 0xC0 else 2 if lead < 0xE0 else 3 if lead < 0xF0 else 4
+            if len(tail) - start < need:
+                f.seek(base + start)
+                f.write(b' ' * (len(tail) - start))
 
         return filename
 
@@ -1,71 +1,47 @@
 import os
-import json
 import time
 import random
 import string
 import shutil
 from pathlib import Path
-from typing import Dict, List, Tuple, Type
+from typing import Dict, List, Optional, Tuple
 from tqdm import tqdm
 
-from encoders_decoders import (
-    Huffman, RLE, BWT, MTF, LZSS, LZW
-)
+from encoders_decoders import BlockCache, Archive
+# CompressionAlgorithm раньше объявлялся здесь: main.py и тесты получают его отсюда через import *
+from encoders_decoders.pipeline import CompressionAlgorithm, CompressionPipeline, CompressionError
 from supplement.generate import (
     DataGenerator, ImageGenerator,
     TextGenerator, RawConverter
 )
+from supplement.shared import SharedInput, shared_input
 
 
-class CompressionAlgorithm:
-    """Базовый класс для алгоритмов сжатия"""
-
-    def __init__(self, block_size: int = 2048):
-        self.block_size = block_size
-
-    def encode(self, data: bytes) -> bytes:
-        raise NotImplementedError
-
-    def decode(self, data: bytes) -> bytes:
-        raise NotImplementedError
+def measure_pipeline(pipeline: CompressionPipeline, data) -> Tuple[int, int, float, float, float, float]:
+    """Кодирование, декодирование и проверка: (вход, выход, степень, время кодирования, декодирования, сумма)"""
+    start = time.perf_counter()
+    encoded = pipeline.encode(data)
+    enc_time = time.perf_counter() - start
 
+    start = time.perf_counter()
+    decoded = pipeline.decode(encoded)
+    dec_time = time.perf_counter() - start
 
-class CompressionPipeline:
-    """Класс для управления пайплайном сжатия"""
-    COMPRESSORS: Dict[str, Tuple[Type[CompressionAlgorithm], ...]] = {
-        "HA": (Huffman,),
-        "RLE": (RLE,),
-        "BWT+RLE": (BWT, RLE),
-        "BWT+MTF+HA": (BWT, MTF, Huffman),
-        "BWT+MTF+RLE+HA": (BWT, MTF, RLE, Huffman),
-        "LZSS": (LZSS,),
-        "LZSS+HA": (LZSS, Huffman),
-        "LZW": (LZW,),
-        "LZW+HA": (LZW, Huffman)
-    }
+    assert decoded == data, "Декодирование не соответствует оригиналу"
 
-    def __init__(self, encoder: str = 'BWT+MTF+RLE+HA', block_size: int = 2048):
-        self.encoder = encoder
-        self.block_size = block_size
-        self.components = self._init_components()
+    return (
+        len(data),
+        len(encoded),
+        len(data) / len(encoded),
+        enc_time,
+        dec_time,
+        enc_time + dec_time
+    )
 
-    def _init_components(self) -> List[CompressionAlgorithm]:
-        """Инициализация компонентов пайплайна"""
-        return [cls(self.block_size) for cls in self.COMPRESSORS[self.encoder]]
 
-    def encode(self, data: bytes) -> bytes:
-        """Последовательное применение кодировщиков"""
-        encoded = data
-        for comp in self.components:
-            encoded = comp.encode(encoded)
-        return encoded
-
-    def decode(self, data: bytes) -> bytes:
-        """Последовательное применение декодеров (в обратном порядке)"""
-        decoded = data
-        for comp in reversed(self.components):
-            decoded = comp.decode(decoded)
-        return decoded
+def _measure_shared(name: str, level: Optional[int], cache: Optional[BlockCache] = None) -> Tuple:
+    """Задание пула: вход — общая память процесса, проверка — здесь же, обратно уходят только метрики"""
+    return measure_pipeline(CompressionPipeline(name, cache=cache, level=level), shared_input())
 
 
 class FileProcessor:
@@ -103,28 +79,42 @@ class FileProcessor:
 class CompressionManager:
     """Основной класс для управления процессами сжатия"""
 
-    def __init__(self):
+    def __init__(self, cache: Optional[BlockCache] = None, dictionaries=None):
         self.results: Dict[str, Tuple[int, int, float, float, float, float]] = {}
-
-    def process_file(self, input_path: Path, encoder: str) -> Tuple[List[int], Path]:
+        self.cache = cache
+        # Словари по идентификатору для распаковки (dict или DictionaryStore)
+        self.dictionaries = {} if dictionaries is None else dictionaries
+
+    def process_file(self, input_path: Path, encoder: str, dedup: bool = False,
+                     level: Optional[int] = None,
+                     params: Optional[Dict[str, dict]] = None,
+                     bypass: bool = False, workers: int = 0,
+                     read_size: Optional[int] = None,
+                     dictionary: Optional[bytes] = None) -> Tuple[List[int], Path]:
         """
         Кодирует файл.
         Выходной файл имеет то же имя, что и исходный, и сохраняется в папке с именем <random>_encoded.
+        При dedup=True одинаковые блоки кодируются один раз, а повторы записываются ссылками.
+        При bypass=True несжимаемые блоки (высокая энтропия или рост после кодирования) хранятся как есть.
+        level (1..9) выбирает пресет скорость/степень сжатия, params задаёт параметры стадий;
+        оба сохраняются в метаданных.
+        workers > 0 включает перекрытие чтения, кодирования и записи (см. Archive.write),
+        read_size — объём одного чтения с диска.
+        dictionary — обученный словарь для первой стадии; в метаданных хранится только его
+        идентификатор, сам словарь запоминается в self.dictionaries для decode_file.
         Возвращает кортеж: (список размеров блоков, путь к папке с закодированным файлом)
         """
-        pipeline = CompressionPipeline(encoder)
+        pipeline = CompressionPipeline(encoder, cache=self.cache, level=level, params=params,
+                                       dictionary=dictionary)
+        if pipeline.dictionary:
+            self.dictionaries[pipeline.dictionary_id] = pipeline.dictionary
         output_dir = FileProcessor.get_encoded_output_dir()
         output_file = output_dir / input_path.name
 
         try:
             with open(input_path, 'rb') as f_in, open(output_file, 'wb') as f_out:
-                metadata = json.dumps({'encoder': encoder}).encode()
-                f_out.write(len(metadata).to_bytes(4, 'big'))
-                f_out.write(metadata)
-
-                while chunk := f_in.read(pipeline.block_size):
-                    encoded = pipeline.encode(chunk)
-                    f_out.write(encoded)
+                Archive.write(f_in, f_out, pipeline, dedup=dedup, bypass=bypass,
+                              workers=workers, read_size=read_size)
 
             block_count = (os.path.getsize(input_path) // pipeline.block_size) + 1
             return [pipeline.block_size] * block_count, output_dir
@@ -132,39 +122,61 @@ class CompressionManager:
         except Exception as e:
             raise CompressionError(f"Ошибка обработки файла: {str(e)}")
 
-    def benchmark(self, data: bytes) -> Dict[str, Tuple]:
+    def append_file(self, encoded_dir: Path, new_data) -> Path:
         """
-        In-memory benchmark для всех алгоритмов (файлы не создаются).
+        Дописывает new_data (bytes или путь к файлу) в архив из папки <random>_encoded:
+        кодируются только новые байты, decode_file вернёт склейку старого и нового.
+        Возвращает путь к архиву.
         """
-        for name in tqdm(CompressionPipeline.COMPRESSORS.keys(), desc="Benchmarking"):
-            try:
-                pipeline = CompressionPipeline(name)
-
-                start = time.perf_counter()
-                encoded = pipeline.encode(data)
-                enc_time = time.perf_counter() - start
-
-                start = time.perf_counter()
-                decoded = pipeline.decode(encoded)
-                dec_time = time.perf_counter() - start
-
-                assert decoded == data, "Декодирование не соответствует оригиналу"
-
-                self.results[name] = (
-                    len(data),
-                    len(encoded),
-                    len(data) / len(encoded),
-                    enc_time,
-                    dec_time,
-                    enc_time + dec_time
-                )
+        encoded_files = list(encoded_dir.glob("*"))
+        if not encoded_files:
+            raise CompressionError("В указанной директории нет закодированного файла.")
+        encoded_file = encoded_files[0]
 
-            except Exception as e:
-                print(f"Ошибка в {name}: {str(e)}")
-                self.results[name] = (0, 0, 0, 0, 0, 0)
+        try:
+            if isinstance(new_data, Path):
+                with open(new_data, 'rb') as f_in:
+                    Archive.append(encoded_file, f_in, dictionaries=self.dictionaries)
+            else:
+                Archive.append(encoded_file, new_data, dictionaries=self.dictionaries)
+        except CompressionError:
+            raise
+        except Exception as e:
+            raise CompressionError(f"Ошибка дописывания в архив: {str(e)}")
+        return encoded_file
 
+    def benchmark(self, data: bytes, level: Optional[int] = None, workers: int = 0,
+                  use_cache: bool = False) -> Dict[str, Tuple]:
+        """
+        In-memory benchmark для всех алгоритмов (файлы не создаются).
+        По умолчанию кэш блоков (self.cache) не используется: повторный замер показывал бы
+        время попаданий в кэш вместо кодирования. use_cache=True включает его — например,
+        чтобы повторные прогоны main.py --cache-dir не кодировали те же данные заново.
+        workers > 0 — пайплайны считаются в пуле процессов: data один раз кладётся в общую
+        память (см. supplement.shared), процессы читают её без копирования и сами проверяют
+        декодирование. Процессам доступен только дисковый уровень кэша.
+        """
+        names = list(CompressionPipeline.COMPRESSORS)
+        cache = self.cache if use_cache else None
+        if workers:
+            disk_cache = cache if cache is not None and cache.cache_dir else None
+            with SharedInput(data) as shared, shared.pool(workers) as pool:
+                futures = {name: pool.submit(_measure_shared, name, level, disk_cache) for name in names}
+                for name in tqdm(names, desc="Benchmarking"):
+                    self._record(name, futures[name].result)
+            return self.results
+
+        for name in tqdm(names, desc="Benchmarking"):
+            self._record(name, lambda: measure_pipeline(CompressionPipeline(name, cache=cache, level=level), data))
         return self.results
 
+    def _record(self, name: str, measure):
+        try:
+            self.results[name] = measure()
+        except Exception as e:
+            print(f"Ошибка в {name}: {str(e)}")
+            self.results[name] = (0, 0, 0, 0, 0, 0)
+
     def print_benchmark_results(self):
         """Вывод результатов бенчмарка"""
         print("\n{:<25} | {:<10} | {:<10} | {:<10} | {:<10} | {:<10} | {:<10}".format(
@@ -187,17 +199,9 @@ class CompressionManager:
         encoded_file = encoded_files[0]
 
         with open(encoded_file, 'rb') as f:
-            meta_len_bytes = f.read(4)
-            meta_len = int.from_bytes(meta_len_bytes, 'big')
-            meta_json = f.read(meta_len)
-            metadata = json.loads(meta_json)
-            encoder = metadata.get("encoder")
-            if encoder is None:
-                raise CompressionError("В метаданных отсутствует информация о кодировщике.")
-            encoded_data = f.read()
-
-        pipeline = CompressionPipeline(encoder)
-        decoded_data = pipeline.decode(encoded_data)
+            metadata = Archive.read_header(f)
+            pipeline = Archive.pipeline_for(metadata, dictionaries=self.dictionaries)
+            decoded_data = Archive.decode_body(pipeline, metadata, f.read())
 
         decoded_dir_name = encoded_dir.name.replace("_encoded", "_decoded")
         decoded_dir = encoded_dir.parent / decoded_dir_name
@@ -257,7 +261,3 @@ class CompressionManager:
                         print(f"  Удалена папка: {decoded_dir}")
                     except Exception as e:
                         print(f"  Ошибка при удалении папки {decoded_dir}: {e}")
-
-
-class CompressionError(Exception):
-    pass
\ No newline at end of file
@@ -0,0 +1,192 @@
+import os
+import csv
+import json
+import time
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from encoders_decoders import Archive
+from encoders_decoders.pipeline import CompressionPipeline
+from supplement.generate import CorpusGenerator, TextGenerator
+
+try:
+    import resource
+except ImportError:  # нет на Windows: пиковая память не измеряется
+    resource = None
+
+KB = 1024
+MB = 1024 * KB
+# 64 КБ -> 1 ГБ с шагом x4
+DEFAULT_SIZES = [64 * KB * 4 ** i for i in range(8)]
+
+CORPORA = {
+    'text': lambda path, size, seed: TextGenerator.generate_realistic_text(path, size=size, seed=seed),
+    'logs': CorpusGenerator.generate_logs,
+    'structured': CorpusGenerator.generate_structured_binary,
+    'random': CorpusGenerator.generate_random_bytes,
+}
+
+
+def _peak_rss_mb(who) -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss на Linux — в килобайтах
+    return resource.getrusage(who).ru_maxrss / 1024
+
+
+def run_point(encoder: str, data_path: str, workers: int, level: Optional[int] = None) -> Dict:
+    """
+    Сжатие файла в архив: workers=1 — последовательно в текущем процессе,
+    иначе конвейер Archive.write с workers процессами-вычислителями.
+    Выполняется в отдельном процессе, поэтому пиковая память относится только к этой точке.
+    """
+    pipeline = CompressionPipeline(encoder, level=level)
+    out_path = f"{data_path}.{os.getpid()}.enc"
+    size = os.path.getsize(data_path)
+
+    start = time.perf_counter()
+    with open(data_path, 'rb') as f_in, open(out_path, 'wb') as f_out:
+        Archive.write(f_in, f_out, pipeline, workers=0 if workers == 1 else workers, processes=True)
+    seconds = time.perf_counter() - start
+    encoded = os.path.getsize(out_path)
+    os.remove(out_path)
+
+    return {
+        'encoder': encoder,
+        'input_bytes': size,
+        'workers': workers,
+        'seconds': seconds,
+        'mbps': size / MB / seconds if seconds else 0.0,
+        'ratio': size / encoded if encoded else 0.0,
+        'peak_rss_mb': _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        # Для процессов-вычислителей — максимум по одному процессу
+        'worker_rss_mb': _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource and workers > 1 else None,
+    }
+
+
+class ScalingBenchmark:
+    """
+    Масштабирование пайплайнов по размеру входа и числу вычислителей.
+    Вход каждого размера генерируется на диск и удаляется после замеров.
+    Точки дописываются в results_path (JSON Lines), повторный запуск считает только недостающие.
+    max_seconds — пропускать размеры, для которых последовательное сжатие по
+    экстраполяции с предыдущего размера займёт дольше.
+    """
+
+    def __init__(self, encoders: Optional[Iterable[str]] = None, sizes: Iterable[int] = DEFAULT_SIZES,
+                 workers: Iterable[int] = (1, 2, 4), corpus: str = 'text', results_path='scaling.jsonl',
+                 work_dir=None, level: Optional[int] = None, max_seconds: Optional[float] = None, seed: int = 0):
+        if corpus not in CORPORA:
+            raise ValueError(f"Неизвестный корпус: {corpus}")
+        self.encoders = list(encoders or CompressionPipeline.COMPRESSORS)
+        self.sizes = sorted(sizes)
+        self.workers = sorted(workers)
+        self.corpus = corpus
+        self.results_path = Path(results_path)
+        self.work_dir = work_dir
+        self.level = level
+        self.max_seconds = max_seconds
+        self.seed = seed
+
+    def point_key(self, encoder: str, size: int, workers: int) -> str:
+        return json.dumps([encoder, self.corpus, self.level, size, workers])
+
+    def load_done(self) -> Dict[str, Dict]:
+        done = {}
+        if not self.results_path.exists():
+            return done
+        with open(self.results_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('corpus') == self.corpus and record.get('level') == self.level:
+                    done[self.point_key(record['encoder'], record['size'], record['workers'])] = record
+        return done
+
+    def run(self, progress=print) -> List[Dict]:
+        done = self.load_done()
+        work_dir = Path(self.work_dir or tempfile.mkdtemp(prefix='scaling_'))
+        work_dir.mkdir(parents=True, exist_ok=True)
+        # Последнее последовательное время пайплайна: (размер, секунды) — для экстраполяции
+        serial: Dict[str, tuple] = {}
+        try:
+            for size in self.sizes:
+                points = [(e, w) for e in self.encoders for w in self.workers
+                          if self.point_key(e, size, w) not in done and not self._too_slow(serial, e, size)]
+                for e in self.encoders:
+                    record = done.get(self.point_key(e, size, self.workers[0]))
+                    if record:
+                        serial[e] = (size, record['seconds'])
+                if not points:
+                    continue
+
+                data_path = Path(CORPORA[self.corpus](str(work_dir), size, self.seed))
+                try:
+                    for encoder, workers in points:
+                        if self._too_slow(serial, encoder, size):
+                            continue
+                        # Отдельный процесс на точку: пиковая память не накапливается между точками
+                        with ProcessPoolExecutor(max_workers=1) as pool:
+                            record = pool.submit(run_point, encoder, str(data_path), workers, self.level).result()
+                        # Текстовый корпус может быть на пару байт короче запрошенного (целые символы UTF-8)
+                        record.update(size=size, corpus=self.corpus, level=self.level)
+                        self._append(record)
+                        done[self.point_key(encoder, size, workers)] = record
+                        if workers == self.workers[0]:
+                            serial[encoder] = (size, record['seconds'])
+                        if progress:
+                            progress(f"{encoder:<22} {size // KB:>8} КБ x{workers:<3} "
+                                     f"{record['mbps']:8.3f} МБ/с  ratio {record['ratio']:.3f}")
+                finally:
+                    data_path.unlink(missing_ok=True)
+        finally:
+            if self.work_dir is None:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        results = [done[k] for k in (self.point_key(e, s, w) for e in self.encoders
+                                     for s in self.sizes for w in self.workers) if k in done]
+        return self.add_efficiency(results)
+
+    def _too_slow(self, serial: Dict[str, tuple], encoder: str, size: int) -> bool:
+        if self.max_seconds is None or encoder not in serial:
+            return False
+        prev_size, prev_seconds = serial[encoder]
+        return prev_size < size and prev_seconds * size / prev_size > self.max_seconds
+
+    def _append(self, record: Dict):
+        self.results_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.results_path, 'a', encoding='utf-8') as out:
+            if out.tell() and not self.results_path.read_bytes().endswith(b'\n'):
+                out.write('\n')
+            out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            os.fsync(out.fileno())
+
+    @staticmethod
+    def add_efficiency(results: List[Dict]) -> List[Dict]:
+        """
+        speedup — пропускная способность относительно наименьшего числа вычислителей
+        для того же пайплайна и размера; efficiency — speedup на единицу добавленных вычислителей.
+        """
+        base = {}
+        for r in sorted(results, key=lambda r: r['workers']):
+            base.setdefault((r['encoder'], r['size']), r)
+        for r in results:
+            b = base[(r['encoder'], r['size'])]
+            r['speedup'] = r['mbps'] / b['mbps'] if b['mbps'] else 0.0
+            r['efficiency'] = r['speedup'] * b['workers'] / r['workers']
+        return results
+
+    @staticmethod
+    def save_csv(results: List[Dict], csv_path):
+        fields = ['encoder', 'corpus', 'level', 'size', 'input_bytes', 'workers', 'seconds', 'mbps', 'speedup',
+                  'efficiency', 'ratio', 'peak_rss_mb', 'worker_rss_mb']
+        with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(results)
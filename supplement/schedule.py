@@ -0,0 +1,124 @@
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from encoders_decoders.pipeline import CompressionPipeline
+from supplement.process import CompressionManager
+
+MB = 1024 * 1024
+
+
+class DeadlineScheduler:
+    """
+    Сжатие очереди файлов к сроку поверх CompressionManager.process_file.
+    ladder — пайплайны из COMPRESSORS от дешёвого к сильному. Перед каждым файлом
+    выбирается самый сильный пайплайн, который при своей измеренной скорости успеет
+    сжать весь остаток очереди в оставшееся время; если не успевает никто — самый дешёвый.
+    Скорость пайплайна (секунд на байт) сначала замеряется на начале файла
+    (PROBE_SIZE байт), затем уточняется по каждому сжатому файлу. Запас, накопленный на
+    быстрых файлах, позволяет следующим взять пайплайн сильнее, отставание — наоборот.
+    Срок задаётся либо временем deadline (секунды от начала run), либо целевой
+    пропускной способностью throughput (МБ/с на всю очередь).
+    """
+    DEFAULT_LADDER = ('HA', 'LZW', 'LZH', 'BWT+MTF+ZRLE+HA')
+    PROBE_SIZE = 16 * 1024
+    # Вес нового замера в скользящей оценке скорости
+    SMOOTHING = 0.5
+
+    def __init__(self, manager: Optional[CompressionManager] = None,
+                 ladder: Sequence[str] = DEFAULT_LADDER, deadline: Optional[float] = None,
+                 throughput: Optional[float] = None, level: Optional[int] = None, **options):
+        if (deadline is None) == (throughput is None):
+            raise ValueError("Нужно задать ровно одно из: deadline (с) или throughput (МБ/с)")
+        unknown = [name for name in ladder if name not in CompressionPipeline.COMPRESSORS]
+        if not ladder or unknown:
+            raise ValueError(f"Неизвестные пайплайны: {', '.join(unknown) or '(пустая лестница)'}")
+        self.manager = manager or CompressionManager()
+        self.ladder = list(ladder)
+        self.deadline = deadline
+        self.throughput = throughput
+        self.level = level
+        # Остальные параметры process_file (dedup, bypass, workers, ...)
+        self.options = options
+        self.rates: Dict[str, float] = {}  # секунд на байт
+
+    def budget(self, total: int) -> float:
+        """Время на всю очередь из total байт"""
+        if self.deadline is not None:
+            return self.deadline
+        return total / MB / self.throughput
+
+    def probe(self, path: Path):
+        """Замер скорости ещё не измеренных пайплайнов на начале файла"""
+        with open(path, 'rb') as f:
+            sample = f.read(self.PROBE_SIZE)
+        if not sample:
+            return
+        for name in self.ladder:
+            if name in self.rates:
+                continue
+            pipeline = CompressionPipeline(name, level=self.level)
+            start = time.perf_counter()
+            pipeline.encode(sample)
+            self.rates[name] = (time.perf_counter() - start) / len(sample)
+
+    def choose(self, remaining_bytes: int, remaining_time: float) -> str:
+        """Самый сильный пайплайн, успевающий сжать остаток; иначе самый дешёвый"""
+        for name in reversed(self.ladder):
+            if self.rates.get(name, float('inf')) * remaining_bytes <= remaining_time:
+                return name
+        return self.ladder[0]
+
+    def update(self, name: str, size: int, seconds: float):
+        if not size:
+            return
+        rate = seconds / size
+        old = self.rates.get(name)
+        self.rates[name] = rate if old is None else old + self.SMOOTHING * (rate - old)
+
+    def run(self, paths: Sequence) -> List[Dict]:
+        """
+        Сжимает файлы по порядку; возвращает по записи на файл: пайплайн, размеры,
+        время, папку архива и запас времени после файла (отрицательный — отставание).
+        """
+        paths = [Path(p) for p in paths]
+        sizes = [os.path.getsize(p) for p in paths]
+        remaining = sum(sizes)
+        budget = self.budget(remaining)
+        start = time.perf_counter()
+        report = []
+
+        for path, size in zip(paths, sizes):
+            if len(self.rates) < len(self.ladder):
+                self.probe(path)
+            left = budget - (time.perf_counter() - start)
+            name = self.choose(remaining, left)
+
+            file_start = time.perf_counter()
+            _, encoded_dir = self.manager.process_file(path, name, level=self.level, **self.options)
+            seconds = time.perf_counter() - file_start
+            self.update(name, size, seconds)
+            remaining -= size
+
+            report.append({
+                'file': str(path),
+                'encoder': name,
+                'size': size,
+                'encoded': sum(f.stat().st_size for f in encoded_dir.iterdir()),
+                'seconds': seconds,
+                'encoded_dir': encoded_dir,
+                'slack': budget - (time.perf_counter() - start),
+            })
+        return report
+
+    @staticmethod
+    def format_report(report: List[Dict]) -> str:
+        """Таблица: какой пайплайн получил каждый файл"""
+        lines = ["{:<30} | {:<18} | {:>10} | {:>10} | {:>8} | {:>9}".format(
+            "File", "Algorithm", "Input", "Output", "Time", "Slack")]
+        lines.append("-" * 100)
+        for r in report:
+            lines.append("{:<30} | {:<18} | {:>10} | {:>10} | {:>8.3f} | {:>9.3f}".format(
+                Path(r['file']).name, r['encoder'], f"{r['size']}B", f"{r['encoded']}B", r['seconds'], r['slack']))
+        return '\n'.join(lines)
@@ -0,0 +1,68 @@
+import sys
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+"""
+Общий вход для пулов процессов: данные один раз кладутся в multiprocessing.shared_memory,
+а процессы-вычислители при старте подключаются к сегменту по имени и видят вход как
+memoryview без копирования. В задания уходят только параметры, обратно — только метрики,
+поэтому память не растёт с числом процессов.
+"""
+
+_segment = None
+_view = None
+
+
+def _attach(name: str, size: int):
+    global _segment, _view
+    # С Python 3.13 подключение не регистрируется в resource_tracker: удаляет сегмент только владелец
+    kwargs = {'track': False} if sys.version_info >= (3, 13) else {}
+    _segment = shared_memory.SharedMemory(name=name, **kwargs)
+    # Только для чтения: вход общий для всех процессов
+    _view = _segment.buf[:size].toreadonly()
+    atexit.register(_detach)
+
+
+def _detach():
+    global _segment, _view
+    if _view is not None:
+        _view.release()
+        _segment.close()
+    _segment = _view = None
+
+
+def shared_input() -> memoryview:
+    """Общий вход в процессе пула, созданного SharedInput.pool"""
+    if _view is None:
+        raise RuntimeError("Процесс не подключён к общему входу: пул должен создаваться через SharedInput.pool")
+    return _view
+
+
+class SharedInput:
+    """
+    Сегмент общей памяти с копией data; закрывается и удаляется при выходе из with.
+    pool(workers) — пул процессов, в каждом из которых shared_input() возвращает вход.
+    """
+
+    def __init__(self, data):
+        self.size = len(data)
+        self._segment = shared_memory.SharedMemory(create=True, size=max(1, self.size))
+        self._segment.buf[:self.size] = data
+
+    @property
+    def name(self) -> str:
+        return self._segment.name
+
+    def pool(self, workers=None) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=workers, initializer=_attach, initargs=(self.name, self.size))
+
+    def close(self):
+        self._segment.close()
+        self._segment.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import itertools
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from encoders_decoders.pipeline import CompressionPipeline
+
+
+def build_codec(target: Union[str, type], point: Dict):
+    """
+    Кодек для точки сетки.
+    target — имя пайплайна из COMPRESSORS или класс кодека (например, LZSS).
+    Для пайплайна ключи block_size и level передаются пайплайну, а ключи вида
+    'LZSS.window_size' — параметрам соответствующей стадии.
+    """
+    if not isinstance(target, str):
+        return target(**{'block_size': 2048, **point})
+
+    kwargs = {}
+    params: Dict[str, dict] = {}
+    for key, value in point.items():
+        if '.' in key:
+            stage, name = key.split('.', 1)
+            params.setdefault(stage, {})[name] = value
+        else:
+            kwargs[key] = value
+    return CompressionPipeline(target, params=params, **kwargs)
+
+
+def target_name(target: Union[str, type]) -> str:
+    return target if isinstance(target, str) else target.__name__
+
+
+def run_point(target: Union[str, type], point: Dict, data_path: str) -> Dict:
+    """Одна точка сетки: кодирование, декодирование, проверка и метрики"""
+    data = Path(data_path).read_bytes()
+    codec = build_codec(target, point)
+
+    start = time.perf_counter()
+    encoded = codec.encode(data)
+    enc_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    decoded = codec.decode(encoded)
+    dec_time = time.perf_counter() - start
+
+    mb = len(data) / (1024 * 1024)
+    return {
+        'target': target_name(target),
+        'point': point,
+        'size': len(data),
+        'encoded': len(encoded),
+        'ratio': len(data) / len(encoded) if encoded else 0.0,
+        'enc_time': enc_time,
+        'dec_time': dec_time,
+        'enc_mbps': mb / enc_time if enc_time else 0.0,
+        'dec_mbps': mb / dec_time if dec_time else 0.0,
+        'ok': decoded == data,
+    }
+
+
+class ParameterSweep:
+    """
+    Перебор сетки параметров кодека или пайплайна в пуле процессов.
+    Каждая завершённая точка сразу дописывается строкой JSON в results_path,
+    поэтому после падения повторный запуск считает только недостающие точки.
+    """
+
+    def __init__(self, target: Union[str, type], grid: Dict[str, list], results_path,
+                 workers: Optional[int] = None):
+        self.target = target
+        self.grid = grid
+        self.results_path = Path(results_path)
+        self.workers = workers
+
+    def points(self) -> List[Dict]:
+        keys = list(self.grid)
+        return [dict(zip(keys, values)) for values in itertools.product(*(self.grid[k] for k in keys))]
+
+    def point_key(self, point: Dict, data_path) -> str:
+        return json.dumps([target_name(self.target), str(data_path), point], sort_keys=True)
+
+    def load_done(self, data_path) -> Dict[str, Dict]:
+        """Уже посчитанные точки; оборванная последняя строка игнорируется"""
+        done = {}
+        if not self.results_path.exists():
+            return done
+        with open(self.results_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('data') == str(data_path) and record.get('target') == target_name(self.target):
+                    done[self.point_key(record['point'], data_path)] = record
+        return done
+
+    def run(self, data_path) -> List[Dict]:
+        data_path = Path(data_path)
+        done = self.load_done(data_path)
+        pending = [p for p in self.points() if self.point_key(p, data_path) not in done]
+
+        if pending:
+            self.results_path.parent.mkdir(parents=True, exist_ok=True)
+            with ProcessPoolExecutor(max_workers=self.workers) as pool, \
+                    open(self.results_path, 'a', encoding='utf-8') as out:
+                # Оборванная при падении строка не должна склеиться со следующей записью
+                if out.tell() and not self.results_path.read_bytes().endswith(b'\n'):
+                    out.write('\n')
+                futures = [pool.submit(run_point, self.target, p, str(data_path)) for p in pending]
+                for future in as_completed(futures):
+                    record = future.result()
+                    record['data'] = str(data_path)
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                    # Контрольная точка: запись должна пережить падение процесса
+                    out.flush()
+                    os.fsync(out.fileno())
+                    done[self.point_key(record['point'], data_path)] = record
+
+        return [done[self.point_key(p, data_path)] for p in self.points()]
+
+    @staticmethod
+    def format_table(results: List[Dict]) -> str:
+        """Таблица коэффициента сжатия и пропускной способности по точкам сетки"""
+        if not results:
+            return ''
+        keys = list(results[0]['point'])
+        header = keys + ['ratio', 'enc MB/s', 'dec MB/s', 'ok']
+        rows = [[str(r['point'][k]) for k in keys] +
+                [f"{r['ratio']:.3f}", f"{r['enc_mbps']:.3f}", f"{r['dec_mbps']:.3f}", str(r['ok'])]
+                for r in results]
+        widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(header)]
+        lines = [' | '.join(h.ljust(w) for h, w in zip(header, widths)),
+                 '-+-'.join('-' * w for w in widths)]
+        lines += [' | '.join(c.rjust(w) for c, w in zip(row, widths)) for row in rows]
+        return '\n'.join(lines)
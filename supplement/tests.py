@@ -9,6 +9,8 @@ from io import StringIO
 import sys
 from unittest.mock import patch
 
+import numpy as np
+
 # Предполагаем, что основной код находится в модуле compression.py
 from main import (
     CompressionAlgorithm,
@@ -17,6 +19,14 @@ from main import (
     CompressionManager,
     CompressionError
 )
+from supplement.generate import ImageGenerator, TextGenerator, CorpusGenerator, RawConverter
+from supplement.analysis import run_study, save_results
+from supplement.sweep import ParameterSweep
+from supplement.scaling import ScalingBenchmark
+from supplement.schedule import DeadlineScheduler
+from encoders_decoders.entropy import entropy_order0, entropy_order1, block_entropies
+from encoders_decoders import (BlockCache, LZSS, LZH, LZW, ZRLE, Huffman, Predictor, BitPack, LDM, Archive,
+                               DictionaryStore, train_dictionary)
 
 # Тесты для CompressionPipeline
 class TestCompressionPipeline(unittest.TestCase):
@@ -31,6 +41,716 @@ class TestCompressionPipeline(unittest.TestCase):
                 decoded = pipeline.decode(encoded)
                 self.assertEqual(decoded, data, f"Ошибка для пайплайна {encoder}")
 
+    def test_level_presets_roundtrip(self):
+        """Пресеты уровней меняют параметры стадий, но не искажают данные."""
+        data = b"level preset data, level preset data! " * 60
+        for level in (1, 5, 9):
+            for encoder in ('BWT+MTF+RLE+HA', 'LZSS+HA'):
+                with self.subTest(level=level, encoder=encoder):
+                    pipeline = CompressionPipeline(encoder, level=level)
+                    self.assertEqual(pipeline.block_size, CompressionPipeline.LEVEL_PRESETS[level]['block_size'])
+                    self.assertEqual(pipeline.decode(pipeline.encode(data)), data)
+        with self.assertRaises(ValueError):
+            CompressionPipeline('HA', level=0)
+
+    def test_cache_reuses_encoded_blocks(self):
+        """Повторное кодирование того же блока берётся из кэша и даёт тот же результат."""
+        data = b"\x00" * 512
+        cache = BlockCache()
+        pipeline = CompressionPipeline('BWT+RLE', block_size=64, cache=cache)
+        first = pipeline.encode(data)
+        second = pipeline.encode(data)
+        self.assertEqual(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(pipeline.decode(second), data)
+
+    def test_encode_into_reuses_buffers(self):
+        """encode_into/decode_into совпадают с encode/decode, укладываются в оценку и не растят буферы повторно."""
+        data = b"buffer reuse, buffer reuse! " * 80 + bytes(range(256))
+        for encoder in CompressionPipeline.COMPRESSORS:
+            with self.subTest(encoder=encoder):
+                pipeline = CompressionPipeline(encoder, block_size=512)
+                dst, out = bytearray(), bytearray()
+                size = pipeline.encode_into(memoryview(data), dst)
+                self.assertEqual(bytes(dst[:size]), pipeline.encode(data))
+                self.assertLessEqual(size, pipeline.max_encoded_size(len(data)))
+                capacity = len(dst), len(pipeline._scratch[0]), len(pipeline._scratch[1])
+                self.assertEqual(pipeline.encode_into(data, dst), size)
+                self.assertEqual((len(dst), len(pipeline._scratch[0]), len(pipeline._scratch[1])), capacity)
+                self.assertEqual(bytes(out[:pipeline.decode_into(memoryview(dst)[:size], out)]), data)
+        with self.assertRaises(ValueError):
+            CompressionPipeline('RLE').encode_into(data, memoryview(bytearray(16)))
+
+
+# Тесты для Huffman
+class TestHuffman(unittest.TestCase):
+    def test_table_strategies_roundtrip(self):
+        """Обе стратегии таблиц, включая блоки из одного символа."""
+        for table in (Huffman.FREQ, Huffman.CANONICAL):
+            for data in (b"mississippi river " * 30, b"\x07" * 100):
+                with self.subTest(table=table, data=data[:8]):
+                    codec = Huffman(256, table=table)
+                    self.assertEqual(codec.decode(codec.encode(data)), data)
+
+    def test_canonical_table_is_smaller(self):
+        data = bytes(range(200)) * 3
+        self.assertLess(len(Huffman(1024, table=Huffman.CANONICAL).encode(data)),
+                        len(Huffman(1024).encode(data)))
+
+    def test_interleaved_streams(self):
+        """Многопоточные блоки (в том числе неполный последний шаг и длинные коды) восстанавливаются."""
+        rng = np.random.default_rng(0)
+        skewed = rng.zipf(1.2, 5000).clip(0, 255).astype(np.uint8).tobytes()
+        for streams in (2, 4, 64):
+            for data in (b"mississippi river " * 31, b"\x07" * 5, skewed):
+                with self.subTest(streams=streams, size=len(data)):
+                    codec = Huffman(4096, streams=streams)
+                    self.assertEqual(codec.decode(codec.encode(data)), data)
+        pipeline = CompressionPipeline('BWT+MTF+ZRLE+HA', params={'Huffman': {'streams': 8}})
+        self.assertEqual(pipeline.decode(pipeline.encode(skewed)), skewed)
+
+    def test_no_padding_byte_when_aligned(self):
+        """Выровненный по байту поток кодов не получает лишнего байта выравнивания."""
+        data = b"abababab"  # два символа по 1 биту — ровно один байт кодов
+        for table in (Huffman.FREQ, Huffman.CANONICAL):
+            with self.subTest(table=table):
+                codec = Huffman(2048, table=table)
+                encoded = codec.encode(data)
+                table_size = 5 * 2 if table == Huffman.FREQ else 2 * 2
+                self.assertEqual(len(encoded), 4 + 3 + table_size + 1)
+                self.assertEqual(codec.estimate_size(data), len(encoded))
+                self.assertEqual(codec.decode(encoded), data)
+
+
+# Тесты для уровней LZSS
+class TestLZSSLevels(unittest.TestCase):
+    def test_levels_roundtrip(self):
+        """Все уровни дают поток, который разбирает неизменённый LZSS.decode."""
+        data = b"abracadabra, abracadabra! cadabra abra " * 40 + bytes(range(200))
+        decoder = LZSS(512)
+        sizes = {}
+        for level in [None] + list(LZSS.LEVELS):
+            with self.subTest(level=level):
+                encoded = LZSS(512, level=level).encode(data)
+                self.assertEqual(decoder.decode(encoded), data)
+                sizes[level] = len(encoded)
+        self.assertLessEqual(sizes[9], sizes[1])
+
+    def test_unknown_level(self):
+        with self.assertRaises(ValueError):
+            LZSS(512, level=10)
+
+
+# Тесты для LZH
+class TestLZH(unittest.TestCase):
+    def test_roundtrip_and_ratio(self):
+        """LZH восстанавливает данные и сжимает лучше цепочки LZSS+HA."""
+        data = b"".join(b"record %05d: status=ok latency=%dms\n" % (i, i % 97) for i in range(300))
+        for level in (None, 1, 5, 9):
+            with self.subTest(level=level):
+                codec = LZH(2048, level=level)
+                self.assertEqual(codec.decode(codec.encode(data)), data)
+        lzss_ha = CompressionPipeline('LZSS+HA').encode(data)
+        self.assertLess(len(LZH(2048).encode(data)), len(lzss_ha))
+
+
+# Тесты для LZW
+class TestLZW(unittest.TestCase):
+    def test_policies_roundtrip_large_block(self):
+        """Блок, переполняющий словарь, восстанавливается при любой политике и ширине кода."""
+        rng = np.random.default_rng(0)
+        words = [bytes(rng.integers(97, 107, size=n, dtype=np.uint8)) for n in rng.integers(2, 8, 300)]
+        data = b" ".join(words[i] for i in rng.integers(0, 300, 20000)) + bytes(rng.integers(0, 256, 20000, dtype=np.uint8))
+        for max_bits in (9, 12):
+            for policy in LZW.POLICIES:
+                with self.subTest(max_bits=max_bits, policy=policy):
+                    codec = LZW(len(data), max_bits=max_bits, policy=policy)
+                    self.assertEqual(codec.decode(codec.encode(data)), data)
+
+    def test_default_policy_on_samples(self):
+        """Политика по умолчанию на исполняемом файле из образцов не хуже сброса и adaptive."""
+        path = Path(__file__).resolve().parent.parent / 'compression_test_data' / 'test.exe'
+        if not path.exists():
+            self.skipTest("Нет образца test.exe")
+        data = path.read_bytes()[:256 * 1024]
+        sizes = {policy: len(LZW(len(data), max_bits=12, policy=policy).encode(data)) for policy in LZW.POLICIES}
+        default = len(LZW(len(data), max_bits=12).encode(data))
+        self.assertLessEqual(default, sizes[LZW.RESET])
+        self.assertLessEqual(default, sizes[LZW.ADAPTIVE])
+
+    def test_adaptive_wins_on_uniform_samples(self):
+        """На тексте и полутоновом изображении adaptive сохраняет полезный словарь и выигрывает у сброса."""
+        root = Path(__file__).resolve().parent.parent / 'compression_test_data'
+        for name in ('real_text.txt', 'gray_image.raw'):
+            path = root / name
+            if not path.exists():
+                continue
+            with self.subTest(sample=name):
+                data = path.read_bytes()[:256 * 1024]
+                reset = len(LZW(len(data), max_bits=12, policy=LZW.RESET).encode(data))
+                adaptive = len(LZW(len(data), max_bits=12, policy=LZW.ADAPTIVE).encode(data))
+                self.assertLess(adaptive, reset * 0.95)
+
+    def test_variable_width_is_smaller(self):
+        """Коды переменной ширины короче прежних 16-битных (по 2 байта на код)."""
+        data = b"".join(b"record %05d: status=ok\n" % (i % 50) for i in range(200))
+        codec = LZW(2048)
+        encoded = codec.encode(data)
+        self.assertEqual(codec.decode(encoded), data)
+        self.assertLess(len(encoded), len(data) * 0.5)
+        with self.assertRaises(ValueError):
+            LZW(2048, max_bits=8)
+
+
+# Тесты для ZRLE
+class TestZRLE(unittest.TestCase):
+    def test_roundtrip_and_run_digits(self):
+        """Серии нулей кодируются цифрами RUNA/RUNB, ранги 254/255 — через escape."""
+        codec = ZRLE(4096)
+        self.assertEqual(codec.encode(bytes(4))[4:], bytes([ZRLE.RUNB, ZRLE.RUNA]))
+        rng = np.random.default_rng(0)
+        samples = [b'\x00', b'\xfe\x00\xff\x01\x00\x00',
+                   rng.choice([0, 0, 0, 0, 1, 2, 254, 255], size=20000).astype(np.uint8).tobytes()]
+        for data in samples:
+            with self.subTest(size=len(data)):
+                self.assertEqual(codec.decode(codec.encode(data)), data)
+
+    def test_pipeline_beats_rle(self):
+        """На тексте после BWT+MTF ZRLE даёт Хаффману меньше данных, чем обычный RLE."""
+        rng = np.random.default_rng(0)
+        words = [bytes(rng.integers(97, 110, size=n, dtype=np.uint8)) for n in rng.integers(2, 9, 200)]
+        data = b" ".join(words[i] for i in rng.zipf(1.5, 3000) % 200)
+        zrle = CompressionPipeline('BWT+MTF+ZRLE+HA')
+        encoded = zrle.encode(data)
+        self.assertEqual(zrle.decode(encoded), data)
+        self.assertLess(len(encoded), len(CompressionPipeline('BWT+MTF+RLE+HA').encode(data)))
+
+
+# Тесты для Predictor
+class TestPredictor(unittest.TestCase):
+    def test_roundtrip_tagged_and_untagged(self):
+        """Изображения с тегами BW/GR/CL, шум (все фильтры) и данные без тега восстанавливаются."""
+        rng = np.random.default_rng(0)
+        y, x = np.mgrid[0:12, 0:10]
+        gradient = ((x * 3 + y * 5) % 256).astype(np.uint8)
+        noise = rng.integers(0, 256, size=(12, 10), dtype=np.uint8)
+        color = np.dstack([gradient, noise, gradient[::-1]])
+        samples = [
+            b'GR' + gradient.tobytes(),
+            b'GR' + noise.tobytes() + b'tail',
+            b'CL' + color.tobytes(),
+            b'BW' + (gradient > 100).astype(np.uint8).tobytes(),
+            b'plain bytes without tag' * 3,
+        ]
+        codec = Predictor(2048, width=10)
+        for data in samples:
+            with self.subTest(data=data[:2]):
+                self.assertEqual(codec.decode(codec.encode(data)), data)
+
+    def test_pipeline_params(self):
+        """Ширина передаётся через параметры стадий и уменьшает размер для градиента."""
+        data = b'GR' + bytes((x + y) % 256 for y in range(64) for x in range(64))
+        plain = CompressionPipeline('HA', block_size=len(data)).encode(data)
+        pipeline = CompressionPipeline('PRED+HA', block_size=len(data), params={'Predictor': {'width': 64}})
+        encoded = pipeline.encode(data)
+        self.assertEqual(pipeline.components[0].width, 64)
+        self.assertLess(len(encoded), len(plain) // 4)
+        self.assertEqual(pipeline.decode(encoded), data)
+
+    def test_file_path_keeps_whole_image(self):
+        """process_file подаёт фильтру RAW целиком: PRED+* сжимает лучше пайплайна без фильтра."""
+        with tempfile.TemporaryDirectory() as tmp:
+            for image_type in ('gray', 'color'):
+                input_path = Path(ImageGenerator.generate_raw_image(tmp, image_type, (800, 60)))
+                for encoder, plain in (('PRED+HA', 'HA'), ('PRED+LZH', 'LZH')):
+                    with self.subTest(image_type=image_type, encoder=encoder):
+                        sizes = {}
+                        for name in (encoder, plain):
+                            encoded_dir = Path(tmp) / f"{name}_encoded"
+                            encoded_dir.mkdir()
+                            with patch.object(FileProcessor, 'get_encoded_output_dir', return_value=encoded_dir):
+                                CompressionManager().process_file(input_path, name)
+                            sizes[name] = (encoded_dir / input_path.name).stat().st_size
+                            shutil.rmtree(encoded_dir)
+                        self.assertLess(sizes[encoder], sizes[plain] // 2)
+
+
+# Тесты для BitPack
+class TestBitPack(unittest.TestCase):
+    def test_roundtrip_and_size(self):
+        """Двухуровневые данные упаковываются в 8 раз, остальные проходят без изменений."""
+        pattern = (np.add.outer(np.arange(40), np.arange(64)) % 10 < 5).astype(np.uint8)
+        codec = BitPack(2048)
+        for data in (b'BW' + pattern.tobytes(), b'BW' + (pattern * 255).tobytes(), pattern.tobytes()):
+            with self.subTest(data=data[:2]):
+                encoded = codec.encode(data)
+                self.assertLess(len(encoded), len(data) // 7)
+                self.assertEqual(codec.decode(encoded), data)
+        for data in (b'GR' + bytes(range(50)), b'text with many symbols', b'BW'):
+            with self.subTest(data=data[:2]):
+                self.assertEqual(codec.decode(codec.encode(data)), data)
+
+    def test_archive_path_keeps_whole_image(self):
+        """Archive.write подаёт BitPack ч/б RAW целиком: PACK+LZH сжимает лучше LZH."""
+        from io import BytesIO
+        with tempfile.TemporaryDirectory() as tmp:
+            data = Path(ImageGenerator.generate_raw_image(tmp, 'bw', (800, 60))).read_bytes()
+        sizes = {}
+        for name in ('PACK+LZH', 'LZH'):
+            out = BytesIO()
+            Archive.write(BytesIO(data), out, CompressionPipeline(name))
+            self.assertEqual(Archive.read(BytesIO(out.getvalue())), data)
+            sizes[name] = len(out.getvalue())
+        self.assertLess(sizes['PACK+LZH'], sizes['LZH'])
+
+
+class TestLDM(unittest.TestCase):
+    def test_long_distance_repeats(self):
+        """Повтор дальше окна LZSS заменяется ссылкой, перекрывающиеся ссылки восстанавливаются."""
+        rng = np.random.default_rng(0)
+        part = rng.integers(0, 256, 50_000, dtype=np.uint8).tobytes()
+        data = part + rng.integers(0, 256, 100_000, dtype=np.uint8).tobytes() + part[1:]
+        codec = LDM(2048)
+        encoded = codec.encode(data)
+        self.assertLess(len(encoded), len(data) - 45_000)
+        self.assertEqual(codec.decode(encoded), data)
+        for data in (b'', b'short', b'x' + b'ab' * 5000):
+            with self.subTest(size=len(data)):
+                self.assertEqual(codec.decode(codec.encode(data)), data)
+
+    def test_archive_uses_window_as_chunk(self):
+        """Archive.write подаёт пайплайну с LDM порции размером в окно, и дальний повтор сжимается."""
+        from io import BytesIO
+        rng = np.random.default_rng(1)
+        part = rng.integers(0, 256, 20_000, dtype=np.uint8).tobytes()
+        data = part + bytes(rng.integers(0, 4, 40_000, dtype=np.uint8)) + part
+        pipeline = CompressionPipeline("LDM+LZSS+HA", params={'LDM': {'window': 1 << 16}})
+        self.assertEqual(pipeline.chunk_size, 1 << 16)
+        out = BytesIO()
+        Archive.write(BytesIO(data), out, pipeline)
+        plain = BytesIO()
+        Archive.write(BytesIO(data), plain, CompressionPipeline("LZSS+HA"))
+        self.assertLess(len(out.getvalue()), len(plain.getvalue()) - 15_000)
+        self.assertEqual(Archive.read(BytesIO(out.getvalue())), data)
+
+
+# Тесты для генераторов тестовых данных
+class TestGenerators(unittest.TestCase):
+    def test_corpora_are_seeded_and_sized(self):
+        """Одинаковый seed даёт одинаковые файлы заданного размера, другой seed — другие."""
+        generators = (CorpusGenerator.generate_logs, CorpusGenerator.generate_random_bytes,
+                      CorpusGenerator.generate_structured_binary)
+        with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+            for generate in generators:
+                with self.subTest(generate=generate.__name__):
+                    first = Path(generate(a, 10_001, seed=5, chunk_size=4096)).read_bytes()
+                    second = Path(generate(b, 10_001, seed=5, chunk_size=4096)).read_bytes()
+                    other = Path(generate(b, 10_001, seed=6, chunk_size=4096)).read_bytes()
+                    self.assertEqual(len(first), 10_001)
+                    self.assertEqual(first, second)
+                    self.assertNotEqual(first, other)
+
+            # Часть размеров режет многобайтовый символ в конце: размер всё равно точный
+            for size in range(5_001, 5_009):
+                with self.subTest(size=size):
+                    text = Path(TextGenerator.generate_realistic_text(a, size=size, seed=1)).read_bytes()
+                    self.assertEqual(len(text), size)
+                    text.decode('utf-8')
+
+    def test_raw_image_matches_converter(self):
+        """Потоковая генерация RAW совпадает с путём PNG -> RawConverter."""
+        with tempfile.TemporaryDirectory() as tmp:
+            for image_type in ('bw', 'gray', 'color'):
+                with self.subTest(image_type=image_type):
+                    getattr(ImageGenerator, f'generate_{image_type}_image')(tmp, (40, 30))
+                    RawConverter.convert_to_raw(os.path.join(tmp, f'{image_type}_image.png'),
+                                                os.path.join(tmp, 'converted.raw'), image_type)
+                    streamed = ImageGenerator.generate_raw_image(tmp, image_type, (40, 30), chunk_rows=7)
+                    self.assertEqual(Path(streamed).read_bytes(),
+                                     Path(tmp, 'converted.raw').read_bytes())
+
+
+# Тесты для анализа энтропии
+class TestEntropyAnalysis(unittest.TestCase):
+    def test_entropy_values(self):
+        self.assertEqual(entropy_order0(b""), 0.0)
+        self.assertAlmostEqual(entropy_order0(bytes(range(256)) * 4), 8.0)
+        self.assertAlmostEqual(entropy_order0(b"ab" * 100), 1.0)
+        # Чередование полностью предсказуемо по предыдущему байту
+        self.assertAlmostEqual(entropy_order1(b"ab" * 100), 0.0)
+        per_block = block_entropies(b"a" * 8 + b"ab" * 4 + b"abcd", 8)
+        np.testing.assert_allclose(per_block, [0.0, 1.0, 2.0])
+
+    def test_block_entropies_follow_real_blocks(self):
+        """Энтропия блока считается по его собственному выходу BWT+MTF, без заголовков и соседних блоков."""
+        from supplement.analysis import analyze_block_size, bwt_mtf_transform, BLOCK_OVERHEAD
+        data = b"a" * 64 + bytes(range(64)) + b"tail"
+        result = analyze_block_size(data, 64)
+        expected = [entropy_order0(bwt_mtf_transform(data[i:i + 64], 64)[BLOCK_OVERHEAD:])
+                    for i in range(0, len(data), 64)]
+        np.testing.assert_allclose(result['block_entropies'], expected)
+        self.assertLess(result['block_entropies'][0], result['block_entropies'][1])
+
+    def test_study_results(self):
+        data = b"entropy study sample text " * 40
+        results = run_study(data, [64, 128], workers=1)
+        self.assertEqual([r['block_size'] for r in results], [64, 128])
+        for r in results:
+            self.assertEqual(len(r['block_entropies']), -(-len(data) // r['block_size']))
+        with tempfile.TemporaryDirectory() as tmp:
+            save_results(results, csv_path=Path(tmp) / "r.csv", json_path=Path(tmp) / "r.json")
+            self.assertIn("entropy_order1", (Path(tmp) / "r.csv").read_text(encoding='utf-8'))
+            self.assertEqual(json.loads((Path(tmp) / "r.json").read_text(encoding='utf-8')), results)
+
+
+# Тесты для перебора параметров
+class TestParameterSweep(unittest.TestCase):
+    def test_resume_runs_only_missing_points(self):
+        """Повторный запуск берёт готовые точки из файла результатов."""
+        with tempfile.TemporaryDirectory() as tmp:
+            data_path = Path(tmp) / "data.txt"
+            data_path.write_bytes(b"sweep sample, sweep sample " * 50)
+            results_path = Path(tmp) / "results.jsonl"
+
+            first = ParameterSweep('LZSS', {'block_size': [256], 'LZSS.window_size': [64, 128]},
+                                   results_path, workers=2).run(data_path)
+            self.assertEqual(len(first), 2)
+            self.assertTrue(all(r['ok'] for r in first))
+
+            # Обрыв записи при падении не мешает продолжению
+            with open(results_path, 'a', encoding='utf-8') as f:
+                f.write('{"target": "LZSS", "po')
+            sweep = ParameterSweep('LZSS', {'block_size': [256], 'LZSS.window_size': [64, 128, 256]},
+                                   results_path, workers=2)
+            self.assertEqual(len(sweep.load_done(data_path)), 2)
+            results = sweep.run(data_path)
+            self.assertEqual([r['point']['LZSS.window_size'] for r in results], [64, 128, 256])
+            self.assertEqual(results[:2], first)
+            self.assertIn("ratio", ParameterSweep.format_table(results))
+
+
+# Тесты для бенчмарка масштабирования
+class TestScalingBenchmark(unittest.TestCase):
+    def test_points_efficiency_and_resume(self):
+        """Каждая точка (размер, вычислители) замеряется один раз; эффективность считается от одного вычислителя."""
+        with tempfile.TemporaryDirectory() as tmp:
+            results_path = Path(tmp) / "scaling.jsonl"
+            bench = ScalingBenchmark(['RLE'], sizes=[8 * 1024, 16 * 1024], workers=[1, 2], corpus='logs',
+                                     results_path=results_path, work_dir=tmp)
+            results = bench.run(progress=None)
+            self.assertEqual([(r['size'], r['workers']) for r in results],
+                             [(8192, 1), (8192, 2), (16384, 1), (16384, 2)])
+            for r in results:
+                self.assertGreater(r['mbps'], 0)
+                self.assertAlmostEqual(r['efficiency'], r['speedup'] / r['workers'])
+            self.assertEqual([r['efficiency'] for r in results if r['workers'] == 1], [1.0, 1.0])
+
+            lines = results_path.read_text(encoding='utf-8').count('\n')
+            self.assertEqual(len(bench.run(progress=None)), 4)
+            self.assertEqual(results_path.read_text(encoding='utf-8').count('\n'), lines)
+            self.assertEqual(sorted(os.listdir(tmp)), ['scaling.jsonl'])
+
+
+# Тесты для планировщика сжатия к сроку
+class TestDeadlineScheduler(unittest.TestCase):
+    def run_queue(self, **kwargs):
+        """Три файла через планировщик; архивы проверяются распаковкой"""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for i in range(3):
+                path = Path(tmp) / f"file{i}.txt"
+                path.write_bytes(b"deadline scheduler queue " * 200 + bytes([i]))
+                paths.append(path)
+            dirs = (Path(tmp) / f"{i}_encoded" for i in range(len(paths)))
+
+            def make_dir():
+                directory = next(dirs)
+                directory.mkdir()
+                return directory
+
+            manager = CompressionManager()
+            with patch.object(FileProcessor, 'get_encoded_output_dir', side_effect=make_dir):
+                report = DeadlineScheduler(manager, **kwargs).run(paths)
+            for record, path in zip(report, paths):
+                _, decoded_dir = manager.decode_file(record['encoded_dir'])
+                self.assertEqual((decoded_dir / path.name).read_bytes(), path.read_bytes())
+        return report
+
+    def test_pipeline_follows_budget(self):
+        """С запасом времени файлы получают самый сильный пайплайн, при отставании — самый дешёвый."""
+        ladder = ('RLE', 'LZSS+HA', 'BWT+MTF+ZRLE+HA')
+        relaxed = self.run_queue(ladder=ladder, deadline=3600)
+        self.assertEqual([r['encoder'] for r in relaxed], ['BWT+MTF+ZRLE+HA'] * 3)
+        self.assertTrue(all(r['slack'] > 0 for r in relaxed))
+        rushed = self.run_queue(ladder=ladder, throughput=1e6)
+        self.assertEqual([r['encoder'] for r in rushed], ['RLE'] * 3)
+        self.assertIn('BWT+MTF+ZRLE+HA', DeadlineScheduler.format_report(relaxed))
+
+    def test_requires_single_target(self):
+        with self.assertRaises(ValueError):
+            DeadlineScheduler(deadline=1, throughput=1)
+        with self.assertRaises(ValueError):
+            DeadlineScheduler(ladder=('NOPE',), deadline=1)
+
+
+# Тесты для командной строки
+class TestCLI(unittest.TestCase):
+    def test_compress_decompress(self):
+        from encoders_decoders.__main__ import main as cli
+        data = b"command line roundtrip " * 100
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / "input.txt"
+            src.write_bytes(data)
+            self.assertEqual(cli(['compress', str(src), '-e', 'LZH', '-l', '3', '--dedup']), 0)
+            src.unlink()
+            self.assertEqual(cli(['decompress', str(src) + '.enc']), 0)
+            self.assertEqual(src.read_bytes(), data)
+
+    def test_compress_with_cache_dir(self):
+        """Повторное сжатие с --cache-dir берёт блоки из дискового кэша и даёт тот же архив."""
+        from encoders_decoders.__main__ import main as cli
+        data = b"cached command line data " * 200
+        with tempfile.TemporaryDirectory() as tmp:
+            src = Path(tmp) / "input.txt"
+            src.write_bytes(data)
+            cache_dir = Path(tmp) / "cache"
+            self.assertEqual(cli(['compress', str(src), '-e', 'LZSS', '--cache-dir', str(cache_dir)]), 0)
+            first = Path(str(src) + '.enc').read_bytes()
+            self.assertTrue(any(cache_dir.iterdir()))
+            self.assertEqual(cli(['compress', str(src), '-e', 'LZSS', '--cache-dir', str(cache_dir)]), 0)
+            self.assertEqual(Path(str(src) + '.enc').read_bytes(), first)
+
+    def test_unknown_encoder(self):
+        """Неизвестный пайплайн — ошибка разбора аргументов, а не KeyError."""
+        from encoders_decoders.__main__ import main as cli
+        for command in ('compress', 'bench', 'estimate'):
+            with self.subTest(command=command), patch('sys.stderr', new_callable=StringIO) as err:
+                with self.assertRaises(SystemExit) as ctx:
+                    cli([command, 'input.bin', '-e', 'NOPE'])
+                self.assertEqual(ctx.exception.code, 2)
+                self.assertIn('NOPE', err.getvalue())
+
+    def test_lazy_imports(self):
+        """Сжатие из командной строки без NumPy-стадий и пула не загружает numpy, PIL, tqdm, pandas и multiprocessing."""
+        import subprocess
+        code = ("import sys, tempfile, os; from encoders_decoders.__main__ import main; "
+                "import encoders_decoders.imports; "
+                "from encoders_decoders import CompressionPipeline; CompressionPipeline('LZSS').encode(b'abc' * 10); "
+                "tmp = tempfile.mkdtemp(); src = os.path.join(tmp, 'in.txt'); open(src, 'wb').write(b'abc' * 100); "
+                "main(['compress', src, '-e', 'LZSS']); "
+                "print(sorted(m for m in ('numpy', 'PIL', 'tqdm', 'pandas', 'multiprocessing', 'concurrent.futures') "
+                "if m in sys.modules))")
+        root = Path(__file__).resolve().parent.parent
+        out = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True)
+        self.assertEqual(out.stdout.strip(), '[]')
+
+
+# Тесты для BlockCache
+class TestBlockCache(unittest.TestCase):
+    def test_lru_eviction_by_size(self):
+        """При превышении бюджета вытесняется давно не использованная запись."""
+        cache = BlockCache(max_bytes=10)
+        cache.put(('a', 1, '1'), b"12345")
+        cache.put(('a', 1, '2'), b"12345")
+        cache.get(('a', 1, '1'))
+        cache.put(('a', 1, '3'), b"12345")
+        self.assertIsNotNone(cache.get(('a', 1, '1')))
+        self.assertIsNone(cache.get(('a', 1, '2')))
+        self.assertLessEqual(cache.size, 10)
+
+    def test_disk_tier(self):
+        """Записи на диске доступны новому экземпляру кэша."""
+        with tempfile.TemporaryDirectory() as tmp:
+            key = BlockCache.make_key('HA', 2048, b"block")
+            BlockCache(cache_dir=tmp).put(key, b"encoded")
+            cache = BlockCache(cache_dir=tmp)
+            self.assertEqual(cache.get(key), b"encoded")
+            self.assertEqual(cache.disk_hits, 1)
+
+
+# Тесты для Archive
+class TestArchive(unittest.TestCase):
+    def test_overlapped_write_matches_serial(self):
+        """Перекрытый конвейер (потоки и процессы) даёт тот же архив, что и последовательная запись."""
+        from io import BytesIO
+        data = (b"overlapped io " * 300 + bytes(range(256)) * 4) * 5
+        pipeline = CompressionPipeline('LZSS+HA', block_size=512)
+        serial = BytesIO()
+        Archive.write(BytesIO(data), serial, pipeline, dedup=True, bypass=True)
+        for processes in (False, True):
+            with self.subTest(processes=processes):
+                out = BytesIO()
+                Archive.write(BytesIO(data), out, pipeline, dedup=True, bypass=True,
+                              read_size=2048, workers=2, queue_size=2, processes=processes)
+                self.assertEqual(out.getvalue(), serial.getvalue())
+                out.seek(0)
+                self.assertEqual(Archive.read(out), data)
+
+    def test_write_records_unique_count(self):
+        """write сохраняет число уникальных блоков, и append не сканирует записи."""
+        from io import BytesIO
+        block = bytes(range(256))
+        out = BytesIO()
+        metadata = Archive.write(BytesIO(block * 3 + b"tail"), out, CompressionPipeline('RLE', block_size=256),
+                                 dedup=True)
+        self.assertEqual(metadata['unique'], 2)
+        out.seek(0)
+        self.assertEqual(Archive.read_header(out), metadata)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "archive.enc"
+            path.write_bytes(out.getvalue())
+            with patch.object(Archive, 'count_unique', side_effect=AssertionError("scan")):
+                self.assertEqual(Archive.append(path, block + b"more")['unique'], 3)
+            with path.open('rb') as f:
+                self.assertEqual(Archive.read(f), block * 3 + b"tail" + block + b"more")
+
+    def test_overlapped_write_propagates_errors(self):
+        """Ошибка потока записи не подвешивает конвейер и пробрасывается вызывающему."""
+        from io import BytesIO
+
+        class BrokenOutput(BytesIO):
+            def write(self, b):
+                if self.tell() > 100:
+                    raise OSError("disk full")
+                return super().write(b)
+
+        data = b"x" * 100000
+        with self.assertRaises(OSError):
+            Archive.write(BytesIO(data), BrokenOutput(), CompressionPipeline('RLE', block_size=256),
+                          read_size=256, workers=2, queue_size=1)
+
+
+    def test_overlapped_submit_error_does_not_hang(self):
+        """Ошибка в основном цикле при полной очереди чтения не подвешивает join потока чтения."""
+        import threading
+        from io import BytesIO
+        from concurrent.futures import ThreadPoolExecutor
+        errors = []
+
+        def run():
+            try:
+                Archive.write(BytesIO(b"y" * 100000), BytesIO(), CompressionPipeline('RLE', block_size=256),
+                              read_size=256, workers=2, queue_size=1)
+            except RuntimeError as e:
+                errors.append(e)
+
+        with patch.object(ThreadPoolExecutor, 'submit', side_effect=RuntimeError("pool broken")):
+            thread = threading.Thread(target=run, daemon=True)
+            thread.start()
+            thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(errors), 1)
+
+    def test_pipeline_pickles_without_cache_contents(self):
+        """Задания пула процессов не везут содержимое кэша и промежуточные буферы."""
+        import pickle
+        data = bytes(range(256)) * 64
+        with tempfile.TemporaryDirectory() as tmp:
+            for cache in (BlockCache(), BlockCache(cache_dir=tmp)):
+                pipeline = CompressionPipeline('RLE', block_size=256, cache=cache)
+                pipeline.encode(data)
+                pipeline.encode_into(memoryview(data), bytearray())
+                copy = pickle.loads(pickle.dumps(pipeline))
+                self.assertLess(len(pickle.dumps(pipeline)), 4096)
+                self.assertEqual(copy.decode(copy.encode(data)), data)
+                if cache.cache_dir is None:
+                    self.assertIsNone(copy.cache)
+                else:
+                    # Копия видит запись исходного кэша через диск
+                    self.assertEqual(copy.cache.disk_hits, 1)
+                self.assertEqual(len(cache._entries), 1)
+
+# Тесты для оценки размера без кодирования
+class TestEstimateSize(unittest.TestCase):
+    def test_codecs_exact_when_all_blocks_sampled(self):
+        """Оценка кодека совпадает с encode, если все блоки попали в выборку."""
+        from encoders_decoders import RLE, MTF, BWT
+        rnd = np.random.default_rng(0)
+        samples = [b"", b"\x00" * 3000 + b"ab" * 700, bytes([0, 0, 1, 255, 254, 0]) * 300,
+                   bytes(rnd.zipf(1.5, 5000).clip(0, 255).astype(np.uint8))]
+        codecs = [RLE(512), MTF(512), BWT(256), ZRLE(512), Huffman(512), Huffman(512, table='canonical'),
+                  Huffman(512, streams=4), LZSS(512), LZH(512), LZW(512), Predictor(512, width=40), BitPack(512)]
+        for codec in codecs:
+            for data in samples:
+                with self.subTest(codec=type(codec).__name__, size=len(data)):
+                    self.assertEqual(codec.estimate_size(data), len(codec.encode(data)))
+
+    def test_pipeline_estimate_is_close(self):
+        """Оценка пайплайна по выборке блоков близка к реальному размеру и не выходит за худший случай."""
+        words = [b"alpha ", b"beta ", b"gamma ", b"delta ", b"epsilon\n"]
+        rnd = np.random.default_rng(1)
+        data = b"".join(words[i] for i in rnd.zipf(1.7, 40000).clip(1, 5) - 1)
+        for encoder in ('HA', 'LZSS+HA', 'LZW+HA'):
+            with self.subTest(encoder=encoder):
+                pipeline = CompressionPipeline(encoder, block_size=512)
+                estimate = pipeline.estimate_size(data)
+                self.assertLessEqual(estimate, pipeline.max_encoded_size(len(data)))
+                self.assertAlmostEqual(estimate / len(pipeline.encode(data)), 1.0, delta=0.15)
+
+    def test_estimate_is_cheaper_than_encode(self):
+        """Оценка Хаффмана по выборке блоков заметно быстрее полного кодирования."""
+        import time
+        rnd = np.random.default_rng(2)
+        data = bytes(rnd.zipf(1.3, 300000).clip(0, 255).astype(np.uint8))
+        for table in (Huffman.FREQ, Huffman.CANONICAL):
+            with self.subTest(table=table):
+                pipeline = CompressionPipeline('HA', params={'Huffman': {'table': table}})
+                start = time.perf_counter()
+                estimate = pipeline.estimate_size(data)
+                estimate_time = time.perf_counter() - start
+                start = time.perf_counter()
+                size = len(pipeline.encode(data))
+                encode_time = time.perf_counter() - start
+                self.assertLess(estimate_time * 5, encode_time)
+                self.assertAlmostEqual(estimate / size, 1.0, delta=0.05)
+
+
+# Тесты для обучаемых словарей
+class TestDictionary(unittest.TestCase):
+    @staticmethod
+    def records(count, seed):
+        rnd = np.random.default_rng(seed)
+        return [json.dumps({"user_id": int(rnd.integers(10 ** 6)),
+                            "event": ["login", "logout", "purchase"][int(rnd.integers(3))],
+                            "status": ["ok", "error"][int(rnd.integers(2))]}).encode()
+                for _ in range(count)]
+
+    def test_small_records_ratio(self):
+        """Словарь даёт настоящее сжатие маленьких записей без роста блока (LZH мешают таблицы кодов)."""
+        dictionary = train_dictionary(self.records(200, 0), size=2048)
+        self.assertTrue(0 < len(dictionary) <= 2048)
+        test = self.records(50, 1)
+        total = sum(map(len, test))
+        for encoder, min_ratio in (('LZSS', 1.5), ('LZH', 0.0), ('LZW', 1.2)):
+            with self.subTest(encoder=encoder):
+                plain = CompressionPipeline(encoder)
+                primed = CompressionPipeline(encoder, dictionary=dictionary)
+                encoded = [primed.encode(r) for r in test]
+                self.assertEqual([primed.decode(e) for e in encoded], test)
+                self.assertGreater(total / sum(map(len, encoded)), min_ratio)
+                self.assertLess(sum(map(len, encoded)), sum(len(plain.encode(r)) for r in test))
+
+    def test_archive_references_dictionary_by_id(self):
+        """В архиве только идентификатор словаря; без словаря распаковка явно отказывает."""
+        from io import BytesIO
+        dictionary = train_dictionary(self.records(100, 0), size=1024)
+        data = b''.join(self.records(20, 2))
+        out = BytesIO()
+        metadata = Archive.write(BytesIO(data), out, CompressionPipeline('LZSS+HA', block_size=256,
+                                                                         dictionary=dictionary), dedup=True)
+        self.assertNotIn(dictionary, out.getvalue())
+        with tempfile.TemporaryDirectory() as tmp:
+            store = DictionaryStore(tmp)
+            self.assertEqual(store.save(dictionary), metadata['dictionary'])
+            out.seek(0)
+            self.assertEqual(Archive.read(out, dictionaries=store), data)
+        out.seek(0)
+        with self.assertRaises(CompressionError):
+            Archive.read(out)
+        with self.assertRaises(ValueError):
+            CompressionPipeline('BWT+RLE', dictionary=dictionary)
+
+
 # Тесты для FileProcessor
 class TestFileProcessor(unittest.TestCase):
     def test_generate_name(self):
@@ -92,6 +812,58 @@ class TestCompressionManager(unittest.TestCase):
             self.assertIsInstance(value[5], float)
             self.assertEqual(value[0], len(sample_data))
 
+    def test_benchmark_bypasses_cache(self):
+        """Бенчмарк не читает и не пополняет кэш блоков менеджера."""
+        cache = BlockCache()
+        manager = CompressionManager(cache=cache)
+        manager.benchmark(b"Benchmark cache data " * 50)
+        manager.benchmark(b"Benchmark cache data " * 50)
+        self.assertEqual(cache.stats()['entries'], 0)
+        self.assertEqual(cache.hits, 0)
+
+    def test_benchmark_uses_cache_on_request(self):
+        """С use_cache=True бенчмарк пополняет кэш, и повторный прогон берёт результаты из него."""
+        cache = BlockCache()
+        manager = CompressionManager(cache=cache)
+        manager.benchmark(b"Benchmark cache data " * 50, use_cache=True)
+        misses = cache.misses
+        manager.benchmark(b"Benchmark cache data " * 50, use_cache=True)
+        self.assertGreater(cache.stats()['entries'], 0)
+        self.assertEqual(cache.misses, misses)
+        self.assertGreater(cache.hits, 0)
+
+    def test_benchmark_shared_memory(self):
+        """Пул процессов читает вход из общей памяти и даёт те же размеры; сегмент удаляется после запуска."""
+        from multiprocessing import shared_memory
+        from supplement.shared import SharedInput
+        sample_data = b"Shared memory benchmark " * 40
+        serial = dict(CompressionManager().benchmark(sample_data))
+        created = []
+        original_init = SharedInput.__init__
+
+        def remember(shared, data):
+            original_init(shared, data)
+            created.append(shared.name)
+
+        with patch.object(SharedInput, '__init__', remember):
+            parallel = CompressionManager().benchmark(sample_data, workers=2)
+        self.assertEqual({k: v[:3] for k, v in parallel.items()}, {k: v[:3] for k, v in serial.items()})
+        self.assertEqual(len(created), 1)
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=created[0])
+
+    def test_benchmark_shared_memory_raw(self):
+        """Стадии с тегом RAW (Predictor, BitPack) принимают вход из общей памяти."""
+        pattern = (np.add.outer(np.arange(40), np.arange(64)) % 10 < 5).astype(np.uint8) * 255
+        gradient = np.add.outer(np.arange(40), np.arange(64)).astype(np.uint8)
+        for sample_data in (b'BW' + pattern.tobytes(), b'GR' + gradient.tobytes()):
+            with self.subTest(tag=sample_data[:2]):
+                serial = CompressionManager().benchmark(sample_data)
+                parallel = CompressionManager().benchmark(sample_data, workers=2)
+                for name in ('PRED+HA', 'PRED+LZH', 'PACK+BWT+MTF+RLE+HA', 'PACK+LZH'):
+                    self.assertGreater(parallel[name][1], 0, name)
+                    self.assertEqual(parallel[name][:3], serial[name][:3])
+
     def test_print_benchmark_results(self):
         """Проверяем, что метод печатает результаты бенчмарка (захватываем stdout)."""
         sample_data = b"Benchmark test data " * 50
@@ -136,6 +908,73 @@ class TestCompressionManager(unittest.TestCase):
         finally:
             tmp_file_path.unlink()
 
+    def test_process_file_dedup(self):
+        """Повторяющиеся блоки хранятся ссылками и восстанавливаются при декодировании."""
+        block = bytes(range(256)) * 8
+        sample_data = block * 6 + b"tail"
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = Path(tmp) / "sample.raw"
+            input_path.write_bytes(sample_data)
+            encoded_dir = Path(tmp) / "dedup_encoded"
+            encoded_dir.mkdir()
+            manager = CompressionManager()
+            with patch.object(FileProcessor, 'get_encoded_output_dir', return_value=encoded_dir):
+                manager.process_file(input_path, 'RLE', dedup=True)
+            encoded_size = (encoded_dir / "sample.raw").stat().st_size
+            self.assertLess(encoded_size, len(sample_data) // 2)
+            _, decoded_dir = manager.decode_file(encoded_dir)
+            self.assertEqual((decoded_dir / "sample.raw").read_bytes(), sample_data)
+
+    def test_append_file(self):
+        """Дописанные данные кодируются отдельно, метаданные обновляются на месте, decode_file отдаёт склейку."""
+        block = bytes(range(256)) * 8
+        sample_data = block * 3
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = Path(tmp) / "sample.log"
+            input_path.write_bytes(sample_data)
+            encoded_dir = Path(tmp) / "append_encoded"
+            encoded_dir.mkdir()
+            manager = CompressionManager()
+            with patch.object(FileProcessor, 'get_encoded_output_dir', return_value=encoded_dir):
+                manager.process_file(input_path, 'RLE', dedup=True)
+            archive = encoded_dir / "sample.log"
+            with archive.open('rb') as f:
+                header_size = len(json.dumps(Archive.read_header(f)))
+
+            manager.append_file(encoded_dir, block * 2 + b"new tail")
+            added = Path(tmp) / "more.log"
+            added.write_bytes(b"more" * 100)
+            manager.append_file(encoded_dir, added)
+
+            with archive.open('rb') as f:
+                metadata = Archive.read_header(f)
+            # Уникальные блоки: один из исходного файла, первый блок и хвост, затем "more"
+            self.assertEqual(metadata['unique'], 4)
+            self.assertLessEqual(len(json.dumps(metadata)), header_size + Archive.META_SLACK)
+            _, decoded_dir = manager.decode_file(encoded_dir)
+            self.assertEqual((decoded_dir / "sample.log").read_bytes(),
+                             sample_data + block * 2 + b"new tail" + b"more" * 100)
+
+    def test_process_file_bypass(self):
+        """Несжимаемые блоки хранятся как есть, сжимаемые кодируются, файл восстанавливается."""
+        noise = np.random.default_rng(1).integers(0, 256, 4096, dtype=np.uint8).tobytes()
+        sample_data = noise + b"compressible text " * 200
+        with tempfile.TemporaryDirectory() as tmp:
+            input_path = Path(tmp) / "mixed.bin"
+            input_path.write_bytes(sample_data)
+            encoded_dir = Path(tmp) / "mixed_encoded"
+            encoded_dir.mkdir()
+            manager = CompressionManager()
+            with patch.object(FileProcessor, 'get_encoded_output_dir', return_value=encoded_dir):
+                manager.process_file(input_path, 'BWT+MTF+RLE+HA', bypass=True)
+            with open(encoded_dir / "mixed.bin", 'rb') as f:
+                Archive.read_header(f)
+                kinds = [kind for kind, _, _ in Archive.iter_records(f.read())]
+            self.assertEqual(kinds[:2], [Archive.STORED, Archive.STORED])
+            self.assertIn(Archive.ENCODED, kinds)
+            _, decoded_dir = manager.decode_file(encoded_dir)
+            self.assertEqual((decoded_dir / "mixed.bin").read_bytes(), sample_data)
+
     def test_process_file_error(self):
         """Проверяем, что при попытке обработки несуществующего файла генерируется CompressionError."""
         manager = CompressionManager()